@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk history downloads against the one-symbol-at-a-time loop
+The loop is what the apps and fetch scripts do today: one history request per symbol
+plus a rate-limit sleep. The bulk path makes the same one request per symbol, like
+yfinance does, but runs a few chunks at once with a few requests of each chunk in
+flight, paced by an AdaptiveRateLimiter that starts cold (http_pool.DEFAULT_RATE), and
+writes every symbol into the history store.
+
+Upstream is simulated (see bench_history_store.SimulatedYahoo): every symbol pays its
+own round trip, and the simulator never answers 429, so a real run is slower whenever
+Yahoo pushes the limiter below its ceiling. The loop is timed on a sample of symbols
+and extrapolated, since 500 sequential round trips take minutes.
+
+Usage: python bench_bulk_history.py [--symbols 500] [--latency-ms 250] [--per-bar-us 40]
+                                    [--chunk-size 100] [--workers 4] [--threads 4] [--loop-sample 20]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+from bench_history_store import SimulatedYahoo
+from bulk_history import SYMBOL_THREADS, BulkHistoryDownloader, download_each
+from history_store import HistoryStore
+from http_pool import AdaptiveRateLimiter
+from negative_cache import NegativeCache
+
+class SimulatedBulkYahoo(SimulatedYahoo):
+    """
+    SimulatedYahoo that also answers chunks the way yahoo_download() does: one round
+    trip per symbol, threads at a time, each waiting for limiter when there is one
+    chunks lists the symbols of every chunk asked for; calls has one entry per symbol
+    """
+
+    def __init__(self, latency_ms=0.0, per_bar_us=0.0, years=30, threads=SYMBOL_THREADS, limiter=None):
+        super().__init__(latency_ms, per_bar_us, years)
+        self.threads = threads
+        self.limiter = limiter
+        self.chunks = []
+
+    def download_chunk(self, symbols, period):
+        self.chunks.append(tuple(symbols))
+        return download_each(symbols, lambda symbol: self.request(symbol, period), self.threads)
+
+    def request(self, symbol, period):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        hist = self.download(symbol, period=period)
+        if self.limiter is not None:
+            self.limiter.on_success()
+        return hist
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=500, help='symbols to fetch (default: 500)')
+    parser.add_argument('--latency-ms', type=float, default=250.0, help='simulated round trip (default: 250)')
+    parser.add_argument('--per-bar-us', type=float, default=40.0, help='simulated transfer per bar (default: 40)')
+    parser.add_argument('--loop-sleep-ms', type=float, default=100.0, help='rate-limit sleep per symbol in the loop (default: 100)')
+    parser.add_argument('--chunk-size', type=int, default=100, help='symbols per bulk request (default: 100)')
+    parser.add_argument('--workers', type=int, default=4, help='chunks in flight (default: 4)')
+    parser.add_argument('--threads', type=int, default=SYMBOL_THREADS,
+                        help=f'requests in flight per chunk (default: {SYMBOL_THREADS})')
+    parser.add_argument('--loop-sample', type=int, default=20, help='symbols the loop is timed on (default: 20)')
+    parser.add_argument('--period', default='1y', help='history period (default: 1y)')
+    parser.add_argument('--years', type=int, default=2, help='years of synthetic bars per symbol (default: 2)')
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    directory = tempfile.mkdtemp()
+    try:
+        upstream = SimulatedBulkYahoo(args.latency_ms, args.per_bar_us, years=args.years, threads=args.threads,
+                                      limiter=AdaptiveRateLimiter())
+        for symbol in symbols:
+            upstream.bars(symbol)  # Generate the synthetic series outside the timings
+
+        print(f"📊 {args.symbols} symbols, period {args.period}, "
+              f"upstream {args.latency_ms:.0f} ms + {args.per_bar_us:.0f} µs/bar")
+        print("-" * 90)
+
+        # Today: one request per symbol, then a rate-limit sleep
+        sample = symbols[:min(args.loop_sample, len(symbols))]
+        start = time.perf_counter()
+        for symbol in sample:
+            upstream.download(symbol, period=args.period)
+            time.sleep(args.loop_sleep_ms / 1000)
+        loop_seconds = (time.perf_counter() - start) / len(sample) * len(symbols)
+        print(f"{'Sequential loop (estimated)':<30} {loop_seconds:8.1f} s   requests {len(symbols):>5}"
+              f"   (timed on {len(sample)} symbols)")
+
+        # Bulk: chunks of per-symbol requests, several in flight, written into the store
+        def downloader_in(subdirectory):
+            return BulkHistoryDownloader(upstream.download_chunk, store=HistoryStore(f"{directory}/{subdirectory}"),
+                                         negative_cache=NegativeCache(f"{directory}/{subdirectory}/negative.json"),
+                                         chunk_size=args.chunk_size, max_workers=args.workers)
+
+        def scenario(label, downloader):
+            requests = len(upstream.calls)
+            start = time.perf_counter()
+            panel = downloader.download(symbols, args.period)
+            seconds = time.perf_counter() - start
+            print(f"{label:<30} {seconds:8.1f} s   requests {len(upstream.calls) - requests:>5}   bars {len(panel):,}")
+            return seconds
+
+        downloader = downloader_in('cold')
+        bulk_seconds = scenario("Bulk download + store", downloader)
+        warm_seconds = scenario("Bulk again (warm store)", downloader)
+        # A long-running app's limiter has already ramped up; only the store is empty
+        ramped_seconds = scenario(f"Bulk, limiter at {upstream.limiter.rate:.0f}/s", downloader_in('ramped'))
+
+        print("-" * 90)
+        print(f"🚀 Bulk is {loop_seconds / bulk_seconds:.0f}x faster than the loop from a cold start, "
+              f"{loop_seconds / ramped_seconds:.0f}x once the rate limit has ramped up "
+              f"({loop_seconds / warm_seconds:.0f}x once the store is warm)")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
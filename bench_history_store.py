@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the on-disk history store against downloading every time
+Times a cold fetch (full download + save), a warm hit (read the Parquet file), and a
+warm refresh (read + one-bar delta download + append) for a year of daily bars.
+
+Upstream is simulated with a fixed round trip plus a per-bar transfer cost, so the
+numbers don't depend on the network; pass --latency-ms/--per-bar-us to match yours.
+
+Usage: python bench_history_store.py [--symbols 20] [--latency-ms 250] [--per-bar-us 40]
+"""
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from history_store import HistoryStore, period_start
+
+class SimulatedYahoo:
+    """
+    Deterministic daily bars ending today, served like yf.Ticker(symbol).history()
+    Each call sleeps latency + per-bar cost and is counted in calls / bars_sent
+    """
+
+    def __init__(self, latency_ms=0.0, per_bar_us=0.0, years=30):
+        self.latency = latency_ms / 1000
+        self.per_bar = per_bar_us / 1e6
+        self.years = years
+        self.calls = []
+        self.bars_sent = 0
+        self._frames = {}
+
+    def bars(self, symbol):
+        """Full history for symbol (generated once)"""
+        if symbol not in self._frames:
+            end = pd.Timestamp.now(tz='America/New_York').normalize()
+            index = pd.bdate_range(end - pd.DateOffset(years=self.years), end, tz='America/New_York', name='Date')
+            rng = np.random.default_rng(sum(map(ord, symbol)))
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+            self._frames[symbol] = pd.DataFrame({
+                'Open': close * 0.995, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+                'Volume': rng.integers(1_000_000, 5_000_000, len(index)),
+                'Dividends': 0.0, 'Stock Splits': 0.0,
+            }, index=index)
+        return self._frames[symbol]
+
+    def download(self, symbol, period=None, start=None):
+        bars = self.bars(symbol)
+        if start is not None:
+            bars = bars.loc[bars.index >= pd.Timestamp(start, tz=bars.index.tz)]
+        elif period_start(period) is not None:
+            bars = bars.loc[bars.index >= period_start(period, pd.Timestamp.now(tz=bars.index.tz)).normalize()]
+        self.calls.append((symbol, period, start))
+        self.bars_sent += len(bars)
+        time.sleep(self.latency + self.per_bar * len(bars))
+        return bars.copy()
+
+def time_calls(function, symbols):
+    """Milliseconds per call, one call per symbol"""
+    times = []
+    for symbol in symbols:
+        start = time.perf_counter()
+        function(symbol)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def report(label, times, calls, bars):
+    print(f"{label:<28} median {statistics.median(times):8.2f} ms   max {max(times):8.2f} ms"
+          f"   upstream calls {calls:>3}   bars sent {bars:>7,}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=20, help='symbols per scenario (default: 20)')
+    parser.add_argument('--latency-ms', type=float, default=250.0, help='simulated round trip (default: 250)')
+    parser.add_argument('--per-bar-us', type=float, default=40.0, help='simulated transfer per bar (default: 40)')
+    parser.add_argument('--period', default='1y', help='history period (default: 1y)')
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    directory = tempfile.mkdtemp()
+    try:
+        upstream = SimulatedYahoo(args.latency_ms, args.per_bar_us)
+        store = HistoryStore(directory)
+        for symbol in symbols:
+            upstream.bars(symbol)  # Generate the synthetic series outside the timings
+        print(f"📊 {args.symbols} symbols, period {args.period}, "
+              f"upstream {args.latency_ms:.0f} ms + {args.per_bar_us:.0f} µs/bar")
+        print("-" * 100)
+
+        def scenario(label, function):
+            calls, bars = len(upstream.calls), upstream.bars_sent
+            times = time_calls(function, symbols)
+            report(label, times, len(upstream.calls) - calls, upstream.bars_sent - bars)
+
+        scenario("No store (download always)", lambda s: upstream.download(s, period=args.period))
+        scenario("Cold store (download+save)", lambda s: store.history(s, args.period, upstream.download))
+        scenario("Warm hit (read file)", lambda s: store.history(s, args.period, upstream.download))
+
+        store.refresh_seconds = 0  # Every read is now stale: one delta request each
+        scenario("Warm refresh (delta+append)", lambda s: store.history(s, args.period, upstream.download))
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
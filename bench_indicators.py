@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy indicator engine against the pandas code it replaced
+pandas_indicators() is calculate_technical_indicators() as it was before indicators.py:
+one pandas Series per intermediate result. Both run on the same synthetic OHLC bars
+for 1, 10 and 30 years of trading days, and the engine's output is checked against
+pandas before anything is timed. The lazy graph is also timed the way the views use
+it: one chart's columns (RSI) and only the last value of every indicator.
+
+Usage: python bench_indicators.py [--years 1 10 30] [--repeat 20]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicators import CHART_FIELDS, COLUMNS, add_indicator_columns, from_history, graph_for
+
+TRADING_DAYS = 252
+
+def synthetic_bars(bars, seed=7):
+    """Random-walk OHLC bars with a realistic intraday range"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, bars)))
+    spread = np.abs(rng.normal(0, 0.01, bars))
+    index = pd.bdate_range(end=pd.Timestamp('2026-01-02'), periods=bars, name='Date')
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.003, bars)),
+        'High': close * (1 + spread), 'Low': close * (1 - spread), 'Close': close,
+        'Volume': rng.integers(1_000_000, 5_000_000, bars),
+    }, index=index)
+
+def pandas_indicators(hist):
+    """The pandas implementation the engine replaced (reference for results and timings)"""
+    # Moving averages
+    hist['SMA_9'] = hist['Close'].rolling(window=9).mean()
+    hist['SMA_50'] = hist['Close'].rolling(window=50).mean()
+    hist['SMA_200'] = hist['Close'].rolling(window=200).mean()
+
+    # RSI
+    delta = hist['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    hist['RSI'] = 100 - (100 / (1 + rs))
+
+    # MACD
+    exp1 = hist['Close'].ewm(span=12).mean()
+    exp2 = hist['Close'].ewm(span=26).mean()
+    hist['MACD'] = exp1 - exp2
+    hist['MACD_Signal'] = hist['MACD'].ewm(span=9).mean()
+
+    # Bollinger Bands
+    hist['BB_Middle'] = hist['Close'].rolling(window=20).mean()
+    bb_std = hist['Close'].rolling(window=20).std()
+    hist['BB_Upper'] = hist['BB_Middle'] + (bb_std * 2)
+    hist['BB_Lower'] = hist['BB_Middle'] - (bb_std * 2)
+
+    # Ichimoku Cloud
+    high_9 = hist['High'].rolling(window=9).max()
+    low_9 = hist['Low'].rolling(window=9).min()
+    hist['Tenkan_sen'] = (high_9 + low_9) / 2
+
+    high_26 = hist['High'].rolling(window=26).max()
+    low_26 = hist['Low'].rolling(window=26).min()
+    hist['Kijun_sen'] = (high_26 + low_26) / 2
+
+    hist['Senkou_span_A'] = ((hist['Tenkan_sen'] + hist['Kijun_sen']) / 2).shift(26)
+
+    high_52 = hist['High'].rolling(window=52).max()
+    low_52 = hist['Low'].rolling(window=52).min()
+    hist['Senkou_span_B'] = ((high_52 + low_52) / 2).shift(26)
+
+    hist['Chikou_span'] = hist['Close'].shift(-26)
+
+    # Stochastic Oscillator
+    lowest_low_5 = hist['Low'].rolling(window=5).min()
+    highest_high_5 = hist['High'].rolling(window=5).max()
+    hist['Stoch_K'] = 100 * ((hist['Close'] - lowest_low_5) / (highest_high_5 - lowest_low_5))
+    hist['Stoch_D'] = hist['Stoch_K'].rolling(window=3).mean()
+
+    return hist
+
+def max_difference(hist):
+    """Largest relative difference between the engine and pandas over every indicator"""
+    expected = pandas_indicators(hist.copy())
+    result = from_history(hist)
+    worst = 0.0
+    for name, column in COLUMNS.items():
+        actual, reference = getattr(result, name), expected[column].to_numpy()
+        assert np.array_equal(np.isnan(actual), np.isnan(reference)), f"{column}: NaN positions differ"
+        finite = ~np.isnan(reference)
+        scale = np.maximum(np.abs(reference[finite]), 1.0)
+        worst = max(worst, float(np.max(np.abs(actual[finite] - reference[finite]) / scale, initial=0.0)))
+    return worst
+
+def best_ms(function, hist, repeat):
+    timings = []
+    for _ in range(repeat):
+        frame = hist.copy()
+        start = time.perf_counter()
+        function(frame)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 10, 30], help='series lengths in years (default: 1 10 30)')
+    parser.add_argument('--repeat', type=int, default=20, help='runs per timing, best is reported (default: 20)')
+    args = parser.parse_args()
+
+    print(f"{'Series':<18} {'pandas':>10} {'engine':>10} {'arrays only':>12} {'speedup':>9} "
+          f"{'RSI chart':>10} {'last values':>12} {'max rel diff':>13}")
+    print("-" * 102)
+    for years in args.years:
+        hist = synthetic_bars(years * TRADING_DAYS)
+        difference = max_difference(hist)
+        pandas_ms = best_ms(pandas_indicators, hist, args.repeat)
+        engine_ms = best_ms(add_indicator_columns, hist, args.repeat)
+        arrays_ms = best_ms(from_history, hist, args.repeat)
+        chart_ms = best_ms(lambda frame: add_indicator_columns(frame, CHART_FIELDS['rsi']), hist, args.repeat)
+        latest_ms = best_ms(lambda frame: graph_for(frame).latest(), hist, args.repeat)
+        print(f"{years:>3}y ({len(hist):>5} bars) {pandas_ms:>8.2f}ms {engine_ms:>8.2f}ms {arrays_ms:>10.2f}ms "
+              f"{pandas_ms / engine_ms:>8.1f}x {chart_ms:>8.2f}ms {latest_ms:>10.2f}ms {difference:>13.1e}")
+    print("\n✅ engine = every indicator written back as DataFrame columns; arrays only = the Indicators struct;")
+    print("   RSI chart = only the columns that chart plots; last values = latest() of every indicator")
+
+if __name__ == "__main__":
+    main()
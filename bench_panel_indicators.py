@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark indicators over a symbols x days panel against one symbol at a time
+A universe scan used to mean one DataFrame and one calculate_technical_indicators()
+call per symbol. Here a synthetic universe (5,000 symbols x 1 year of trading days by
+default) gets every indicator from IndicatorPanel, with some symbols listed partway
+through the year and a few missing closes. The per-symbol loops (the pandas code the
+engine replaced, and the engine itself) are timed on a sample of symbols and scaled
+up to the whole universe. Every sampled symbol's panel results are checked against
+the engine run on that symbol's own bars before anything is timed.
+
+Usage: python bench_panel_indicators.py [--symbols 5000] [--days 252] [--sample 200] [--repeat 5]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bench_indicators import pandas_indicators
+from indicators import COLUMNS, IndicatorPanel, from_history
+
+TARGET_SECONDS = 1.0
+
+def synthetic_panel(symbols, days, listed_late=0.2, gaps=0.0005, seed=7):
+    """
+    (close, high, low) dates x symbols frames of random walks; a listed_late share of the
+    symbols start partway through (NaN before), and a gaps share of closes are missing
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, (days, symbols)), axis=0))
+    spread = np.abs(rng.normal(0, 0.01, (days, symbols)))
+    high, low = close * (1 + spread), close * (1 - spread)
+    late = rng.random(symbols) < listed_late
+    first = np.where(late, rng.integers(1, days, symbols), 0)
+    before_listing = np.arange(days)[:, None] < first
+    for values in (close, high, low):
+        values[before_listing] = np.nan
+    close[rng.random((days, symbols)) < gaps] = np.nan
+    index = pd.bdate_range(end=pd.Timestamp('2026-01-02'), periods=days, name='Date')
+    columns = pd.Index([f"S{number:05d}" for number in range(symbols)], name='Symbol')
+    return tuple(pd.DataFrame(values, index=index, columns=columns) for values in (close, high, low))
+
+def symbol_history(close, high, low, symbol):
+    """One symbol's own bars, from its listing on, as an OHLC DataFrame"""
+    hist = pd.DataFrame({'Close': close[symbol], 'High': high[symbol], 'Low': low[symbol]})
+    first = hist['High'].first_valid_index()
+    return hist.loc[first:] if first is not None else hist.iloc[:0]
+
+def max_difference(panel, histories):
+    """Largest relative difference between the panel and each sampled symbol computed alone"""
+    arrays = panel.arrays()
+    worst = 0.0
+    for symbol, hist in histories.items():
+        row = panel.symbols.get_loc(symbol)
+        alone = from_history(hist)
+        for name in COLUMNS:
+            actual, reference = arrays[name][row, len(panel.dates) - len(hist):], getattr(alone, name)
+            assert np.array_equal(np.isnan(actual), np.isnan(reference)), f"{symbol} {name}: NaN positions differ"
+            finite = ~np.isnan(reference)
+            scale = np.maximum(np.abs(reference[finite]), 1.0)
+            worst = max(worst, float(np.max(np.abs(actual[finite] - reference[finite]) / scale, initial=0.0)))
+    return worst
+
+def best_seconds(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5000, help='symbols in the universe (default: 5000)')
+    parser.add_argument('--days', type=int, default=252, help='trading days per symbol (default: 252)')
+    parser.add_argument('--sample', type=int, default=200, help='symbols timed one at a time (default: 200)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per timing, best is reported (default: 5)')
+    args = parser.parse_args()
+
+    close, high, low = synthetic_panel(args.symbols, args.days)
+    sample = list(close.columns[::max(1, args.symbols // args.sample)][:args.sample])
+    histories = {symbol: symbol_history(close, high, low, symbol) for symbol in sample}
+    difference = max_difference(IndicatorPanel(close, high, low), histories)
+    scale = args.symbols / len(sample)
+
+    pandas_s = best_seconds(lambda: [pandas_indicators(hist.copy()) for hist in histories.values()],
+                            max(1, args.repeat // 2)) * scale
+    engine_s = best_seconds(lambda: [from_history(hist) for hist in histories.values()], args.repeat) * scale
+    panel_s = best_seconds(lambda: IndicatorPanel(close, high, low).arrays(), args.repeat)
+    latest_s = best_seconds(lambda: IndicatorPanel(close, high, low).latest(), args.repeat)
+
+    print(f"📊 {args.symbols} symbols x {args.days} days, every indicator "
+          f"({high.iloc[0].isna().sum()} symbols listed partway through)")
+    print(f"   {'pandas, one symbol at a time':<34} {pandas_s * 1000:>9.0f} ms  (scaled from {len(sample)} symbols)")
+    print(f"   {'engine, one symbol at a time':<34} {engine_s * 1000:>9.0f} ms  (scaled from {len(sample)} symbols)")
+    print(f"   {'IndicatorPanel, every bar':<34} {panel_s * 1000:>9.0f} ms  {pandas_s / panel_s:>6.1f}x")
+    print(f"   {'IndicatorPanel, last values':<34} {latest_s * 1000:>9.0f} ms  {pandas_s / latest_s:>6.1f}x")
+    print(f"   max rel diff vs each symbol alone: {difference:.1e}")
+    mark = "✅" if panel_s < TARGET_SECONDS else "⚠️"
+    print(f"\n{mark} Panel: {panel_s * 1000:.0f} ms for every indicator (target: well under {TARGET_SECONDS:.0f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark ticker autocomplete on an SEC-sized universe
+Compares the old per-keystroke linear scan with the shared StockSearchIndex
+
+Usage: python bench_search.py [--size 15000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import string
+import time
+
+from stock_search import StockSearchIndex
+from test_stock_search import linear_search
+
+WORDS = ['Apple', 'Micro', 'Energy', 'Fuels', 'Global', 'Holdings', 'Capital', 'Bank', 'Trust',
+         'Technologies', 'Systems', 'Pharmaceuticals', 'Uranium', 'Lithium', 'Resources', 'Group',
+         'Financial', 'Therapeutics', 'Industries', 'Partners', 'Realty', 'Mining', 'Bio', 'Solar']
+SUFFIXES = ['Inc', 'Corp', 'Co', 'Ltd', 'PLC', 'LP', 'ETF', 'Trust']
+
+def make_synthetic_universe(size, seed=42):
+    """Real stock_data.csv rows plus random SEC-style symbols up to the requested size"""
+    rng = random.Random(seed)
+    rows = []
+    seen = set()
+    csv_path = os.path.join(os.path.dirname(__file__), "stock_data.csv")
+    with open(csv_path, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            rows.append((row['ticker'].upper(), row['company_name']))
+            seen.add(row['ticker'].upper())
+
+    while len(rows) < size:
+        ticker = ''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(1, 5)))
+        if ticker in seen:
+            continue
+        seen.add(ticker)
+        name = ' '.join(rng.sample(WORDS, rng.randint(1, 3)) + [rng.choice(SUFFIXES)])
+        rows.append((ticker, name))
+
+    rows.sort()
+    return rows
+
+def time_queries(search, queries, repeat=20):
+    """Return per-query latencies in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples
+
+def report(label, samples):
+    median = samples[len(samples) // 2]
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{label:28} median {median:8.3f} ms   p99 {p99:8.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=15000, help='universe size (default: 15000)')
+    args = parser.parse_args()
+
+    rows = make_synthetic_universe(args.size)
+    stock_data = [{'ticker': t, 'company': c} for t, c in rows]
+
+    start = time.perf_counter()
+    index = StockSearchIndex(rows)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Every prefix of a few typed queries, like keystrokes in the search box
+    typed = ['APPLE', 'MICROSOFT', 'URANIUM', 'NVDA', 'BANK OF', 'ZQX']
+    queries = [word[:i] for word in typed for i in range(1, len(word) + 1)]
+
+    print(f"📊 Universe: {len(rows):,} symbols, index built in {build_ms:.1f} ms")
+    print(f"⌨️  {len(queries)} keystroke queries")
+    print("-" * 60)
+    report("Linear scan (old)", time_queries(lambda q: linear_search(q, stock_data), queries, repeat=2))
+    report("StockSearchIndex", time_queries(lambda q: index.search(q, max_results=8), queries))
+
+    # Typos that fall through every exact tier to the fuzzy tier
+    typos = ['APPL', 'MICROSFT', 'NVIDA', 'AMAZN', 'URANUIM', 'TECHNOLOGEIS', 'HOLDNGS', 'QWXZ']
+    print("-" * 60)
+    report("Fuzzy tier (typos)", time_queries(index.fuzzy_search, typos, repeat=50))
+
+if __name__ == "__main__":
+    main()
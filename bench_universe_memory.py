@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory cost of the stock universe
+Compares the old list of {'ticker', 'company'} dicts (plus upper-cased copies for
+searching) and per-hit result dicts with the columnar Universe and slotted records
+
+Usage: python bench_universe_memory.py [--size 15000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from bench_search import make_synthetic_universe
+from universe import MATCH_ICONS, SearchResult, Universe
+
+def measure(build):
+    """Bytes still allocated after build() returns, and the object it built"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, built
+
+def decode_rows(encoded_rows):
+    """Fresh str objects for every row, like parsing the CSV, so they get counted too"""
+    return [(ticker.decode(), company.decode()) for ticker, company in encoded_rows]
+
+def build_dict_universe(encoded_rows):
+    """The GUI's old representation: one dict per symbol plus upper-cased key lists"""
+    stock_data = [{'ticker': ticker, 'company': company} for ticker, company in decode_rows(encoded_rows)]
+    ticker_keys = [stock['ticker'].upper() for stock in stock_data]
+    company_keys = [stock['company'].upper() for stock in stock_data]
+    return stock_data, ticker_keys, company_keys
+
+def build_columnar_universe(encoded_rows):
+    return Universe.from_records(decode_rows(encoded_rows))
+
+def build_dict_results(universe, count):
+    return [{
+        'display': f"{universe.tickers[row]} - {universe.companies[row]}",
+        'ticker': universe.tickers[row],
+        'company': universe.companies[row],
+        'match_type': 'company_contains',
+        'icon': MATCH_ICONS['company_contains']
+    } for row in range(count)]
+
+def build_record_results(universe, count):
+    return [SearchResult(universe.tickers[row], universe.companies[row], 'company_contains')
+            for row in range(count)]
+
+def report(label, old_bytes, new_bytes):
+    saved = 100 * (1 - new_bytes / old_bytes) if old_bytes else 0
+    print(f"{label:24} {old_bytes / 1024:9.1f} KB -> {new_bytes / 1024:9.1f} KB  ({saved:.0f}% less)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=15000, help='universe size (default: 15000)')
+    args = parser.parse_args()
+
+    encoded_rows = [(ticker.encode(), company.encode())
+                    for ticker, company in make_synthetic_universe(args.size)]
+
+    dict_bytes, _ = measure(lambda: build_dict_universe(encoded_rows))
+    columnar_bytes, universe = measure(lambda: build_columnar_universe(encoded_rows))
+
+    # A typing session: 8 hits per keystroke over a thousand keystrokes
+    hits = min(8000, len(universe))
+    dict_result_bytes, _ = measure(lambda: build_dict_results(universe, hits))
+    record_result_bytes, _ = measure(lambda: build_record_results(universe, hits))
+
+    print(f"📊 Universe: {len(universe):,} symbols, {hits:,} search hits")
+    print("-" * 72)
+    report("Universe (dicts -> cols)", dict_bytes, columnar_bytes)
+    report("Hits (dicts -> records)", dict_result_bytes, record_result_bytes)
+
+if __name__ == "__main__":
+    main()
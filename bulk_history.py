@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Bulk History
+Daily history for many symbols at once, downloaded concurrently in chunks.
+
+BulkHistoryDownloader splits the symbols into chunks and downloads a few chunks at a
+time, one yf.Ticker(symbol).history() request per symbol with a few symbols of each
+chunk in flight. Yahoo has no multi-symbol history endpoint (yf.download() makes the
+same per-symbol requests), so the gain over a loop is concurrency, not fewer round
+trips: DEFAULT_WORKERS x SYMBOL_THREADS requests at once, paced by the shared
+session's AdaptiveRateLimiter (see http_pool.py), which backs off on 429s.
+yf.download() itself isn't used: it turns every per-symbol failure into an empty
+frame, so an outage looked exactly like a universe of delisted symbols.
+
+  - symbols are canonicalized and de-duplicated first
+  - symbols in the negative cache are skipped; ones yfinance reports as missing
+    (YFTickerMissingError and its subclasses, or a 404) are added to it
+  - symbols whose stored history (see history_store.py) is fresh and complete are read
+    from disk; everything else is downloaded and written into the store
+  - any other error (Yahoo down, 429s, an open circuit breaker) fails the rest of the
+    chunk: the call raises, so a breaker around it counts the failure, and the symbols
+    not yet fetched get their stored history instead, marked degraded like
+    YahooProvider.fetch_history's
+
+The result is a tidy panel: one row per (Symbol, Date) with the OHLCV columns.
+
+Usage: python bulk_history.py [--period 1y] [--limit N] [SYMBOL ...]
+       (warms the history store for the stock_data.csv universe or the given symbols)
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from history_store import HistoryStore, degraded_history, slice_period
+from http_pool import yahoo_session
+from negative_cache import shared_negative_cache
+from symbols import canonical_symbol
+
+DEFAULT_CHUNK_SIZE = 100  # Symbols per download call, and per breaker success or failure
+DEFAULT_WORKERS = 4
+SYMBOL_THREADS = 4        # Requests in flight per chunk; workers x threads = http_pool.POOL_SIZE
+PANEL_COLUMNS = ['Symbol', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+
+class ChunkDownloadError(Exception):
+    """A chunk stopped at an error other than missing data; histories holds what was fetched before it"""
+
+    def __init__(self, symbol, error, histories):
+        super().__init__(f"{symbol}: {error}")
+        self.symbol = symbol
+        self.error = error
+        self.histories = histories
+
+
+def raise_yfinance_errors():
+    """
+    Make yfinance raise on failures instead of logging them and returning empty data, so
+    outages can be told from missing symbols (a process-wide yfinance setting; it
+    replaced raise_errors=)
+    """
+    import yfinance as yf
+    yf.config.debug.hide_exceptions = False
+
+
+def not_found(error):
+    """True for an HTTP 404: Yahoo has no such symbol, which isn't an outage"""
+    return getattr(getattr(error, 'response', None), 'status_code', None) == 404
+
+
+def symbol_missing(error):
+    """True when yfinance reports the symbol has no data (delisted, unknown, no prices)"""
+    from yfinance.exceptions import YFTickerMissingError
+    return isinstance(error, YFTickerMissingError) or not_found(error)
+
+
+def download_each(symbols, fetch, threads=1):
+    """
+    {symbol: fetch(symbol)} with up to threads fetches at once, and an empty frame for
+    symbols reported missing; any other error raises ChunkDownloadError once the
+    fetches in flight finish, and the symbols not started yet are skipped instead of
+    failing one timeout at a time
+    """
+    histories = {}
+    failures = []
+    lock = threading.Lock()
+
+    def fetch_one(symbol):
+        with lock:
+            if failures:
+                return
+        try:
+            hist = fetch(symbol)
+        except Exception as error:
+            if not symbol_missing(error):
+                with lock:
+                    failures.append((symbol, error))
+                return
+            hist = pd.DataFrame()
+        with lock:
+            histories[symbol] = hist
+
+    if threads > 1 and len(symbols) > 1:
+        with ThreadPoolExecutor(max_workers=min(threads, len(symbols))) as executor:
+            list(executor.map(fetch_one, symbols))
+    else:
+        for symbol in symbols:
+            fetch_one(symbol)
+
+    histories = {symbol: histories[symbol] for symbol in symbols if symbol in histories}
+    if failures:
+        symbol, error = failures[0]
+        raise ChunkDownloadError(symbol, error, histories) from error
+    return histories
+
+
+def yahoo_download(symbols, period, session=None, threads=SYMBOL_THREADS):
+    """One yf.Ticker(symbol).history() request per symbol of a chunk, threads at a time -> {symbol: history}"""
+    import yfinance as yf
+    raise_yfinance_errors()
+    session = session or yahoo_session()
+    return download_each(symbols, lambda symbol: yf.Ticker(symbol, session=session).history(period=period), threads)
+
+
+def to_panel(histories):
+    """{symbol: history} -> long DataFrame with a Symbol and a Date column"""
+    frames = []
+    for symbol, hist in histories.items():
+        if hist is None or hist.empty:
+            continue
+        frame = hist.reset_index()
+        frame = frame.rename(columns={frame.columns[0]: 'Date'})
+        frame.insert(0, 'Symbol', symbol)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=PANEL_COLUMNS)
+    panel = pd.concat(frames, ignore_index=True)
+    ordered = [column for column in PANEL_COLUMNS if column in panel.columns]
+    return panel[ordered + [column for column in panel.columns if column not in ordered]]
+
+
+def chunked(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+class BulkHistoryDownloader:
+    """
+    symbols -> panel of daily bars, downloaded in chunks with bounded parallelism
+    download(symbols, period) is the upstream fetch for one chunk and returns
+    {symbol: history}, an empty history for symbols with no data; the default is
+    yahoo_download(). When it raises, the chunk's symbols not in the
+    ChunkDownloadError's histories fall back to the store
+    """
+
+    def __init__(self, download=yahoo_download, store=None, negative_cache=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, max_workers=DEFAULT_WORKERS):
+        self.download_chunk = download
+        self.store = store
+        self.negative_cache = negative_cache or shared_negative_cache()
+        self.chunk_size = max(1, chunk_size)
+        self.max_workers = max(1, max_workers)
+        self.requests = 0
+        self.downloaded = 0
+        self.from_store = 0
+        self.skipped = 0
+        self.failed = 0
+        self.degraded = 0
+        self.errors = []  # One per failed chunk
+        self._lock = threading.Lock()  # Chunk requests run on worker threads
+
+    def histories(self, symbols, period='1y'):
+        """{symbol: history} for every symbol with data, in the order first given"""
+        wanted = list(dict.fromkeys(filter(None, map(canonical_symbol, symbols))))
+
+        histories = {}
+        missing = []
+        for symbol in wanted:
+            if self.negative_cache.is_known_bad(symbol):
+                self.skipped += 1
+                continue
+            cached = self.store.cached(symbol, period) if self.store is not None else None
+            if cached is not None:
+                histories[symbol] = cached
+                self.from_store += 1
+            else:
+                missing.append(symbol)
+
+        chunks = chunked(missing, self.chunk_size)
+        if chunks:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+                for chunk, (result, failed) in zip(chunks, executor.map(self._download, chunks,
+                                                                        [period] * len(chunks))):
+                    for symbol in chunk:
+                        hist = result.get(symbol)
+                        if hist is None and failed:
+                            # Not fetched before the chunk failed; that says nothing about the symbol
+                            stored = self._stored(symbol, period)
+                            if stored is not None:
+                                histories[symbol] = stored
+                                self.degraded += 1
+                            continue
+                        if hist is None or hist.empty:
+                            self.failed += 1
+                            self.negative_cache.record_failure(symbol, f"empty {period} bulk history")
+                            continue
+                        if self.store is not None:
+                            try:
+                                self.store.put(symbol, hist, period)
+                            except OSError:
+                                pass  # A read-only install just refetches next time
+                        histories[symbol] = slice_period(hist, period)
+                        self.downloaded += 1
+
+        return {symbol: histories[symbol] for symbol in wanted if symbol in histories}
+
+    def _stored(self, symbol, period):
+        """Stored bars marked degraded, in place of a failed download (None when nothing is stored)"""
+        if self.store is None:
+            return None
+        stored = self.store.load(symbol)
+        if stored is None or stored.empty:
+            return None
+        return degraded_history(slice_period(stored, period), self.store.refreshed_at(symbol))
+
+    def _download(self, chunk, period):
+        """(histories, failed) for one chunk"""
+        with self._lock:
+            self.requests += 1
+        try:
+            return self.download_chunk(chunk, period), False
+        except Exception as error:
+            with self._lock:
+                self.errors.append(error)
+            return getattr(error, 'histories', {}), True
+
+    def download(self, symbols, period='1y'):
+        """Tidy panel (Symbol, Date, OHLCV) for symbols"""
+        return to_panel(self.histories(symbols, period))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('symbols', nargs='*', help='symbols (default: the stock_data.csv universe)')
+    parser.add_argument('--period', default='1y', help='history period (default: 1y)')
+    parser.add_argument('--limit', type=int, default=None, help='only the first N symbols')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    symbols = args.symbols
+    if not symbols:
+        symbols = pd.read_csv('stock_data.csv')['ticker'].dropna().astype(str).tolist()
+    symbols = symbols[:args.limit] if args.limit else symbols
+
+    downloader = BulkHistoryDownloader(store=HistoryStore(), chunk_size=args.chunk_size, max_workers=args.workers)
+    print(f"📥 Fetching {args.period} history for {len(symbols)} symbols "
+          f"({args.chunk_size} per chunk, {args.workers} chunks x {SYMBOL_THREADS} requests in flight)")
+    start = time.perf_counter()
+    panel = downloader.download(symbols, args.period)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {panel['Symbol'].nunique()} symbols, {len(panel):,} bars in {elapsed:.1f}s")
+    print(f"   🌐 {downloader.requests} chunks, {downloader.downloaded} symbols downloaded")
+    print(f"   🗄️ {downloader.from_store} symbols already fresh in the store")
+    print(f"   🚫 {downloader.skipped} known-bad skipped, {downloader.failed} returned no data")
+    if downloader.errors:
+        print(f"   ⚠️ {len(downloader.errors)} chunks failed ({downloader.errors[-1]}); "
+              f"{downloader.degraded} symbols served from the store instead")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker
+Stops calling an upstream that keeps failing, and probes it before trusting it again.
+
+While Yahoo is down every request waits out its timeouts and retries before failing,
+and every page view or analysis pays for that again. A CircuitBreaker counts
+consecutive failures; after FAILURE_THRESHOLD of them it opens and calls fail at once
+with CircuitOpenError, so callers can fall back to cached data right away. After
+RESET_SECONDS one call is let through as a probe (half-open): success closes the
+breaker, failure opens it for another RESET_SECONDS. Other callers keep failing fast
+while the probe is in flight, and calls that started before the breaker opened don't
+change its state when they finish late: only the probe decides.
+"""
+
+import threading
+import time
+
+FAILURE_THRESHOLD = 3
+RESET_SECONDS = 30
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+CALL = 'call'    # How _admit() let a call through
+PROBE = 'probe'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} is unavailable; retrying in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    call(function, *args) runs function unless the breaker is open
+    Exceptions count as failures and are re-raised; returning counts as success
+    """
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_seconds=RESET_SECONDS, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+        self.trips = 0
+        self.rejected = 0
+        self.last_error = None
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and self._probe_due():
+                return HALF_OPEN
+            return self._state
+
+    def _probe_due(self):
+        return self.clock() - self._opened_at >= self.reset_seconds
+
+    def retry_in(self):
+        """Seconds until the next probe (0 when closed or due)"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_seconds - (self.clock() - self._opened_at))
+
+    def _admit(self):
+        """
+        CALL or PROBE when this call may go upstream (the first one after the timeout is
+        the probe), None when it must fail fast
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return CALL
+            if self._state == OPEN and self._probe_due():
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return PROBE
+            self.rejected += 1
+            return None
+
+    def _record(self, admitted, error):
+        with self._lock:
+            if admitted == PROBE:
+                self._probing = False
+            elif self._state != CLOSED:
+                # Started before the breaker opened: the probe's outcome decides
+                if error is not None:
+                    self.last_error = error
+                return
+            if error is None:
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self.last_error = error
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.trips += 1
+                self._state = OPEN
+                self._opened_at = self.clock()
+
+    def call(self, function, *args, **kwargs):
+        admitted = self._admit()
+        if admitted is None:
+            raise CircuitOpenError(self.name, self.retry_in())
+        try:
+            result = function(*args, **kwargs)
+        except Exception as error:
+            self._record(admitted, error)
+            raise
+        self._record(admitted, None)
+        return result
+
+    def describe(self):
+        """One line for status bars"""
+        state = self.state
+        if state == CLOSED:
+            return f"{self.name}: connected"
+        if state == HALF_OPEN:
+            return f"{self.name}: unavailable, checking again now"
+        return f"{self.name}: unavailable, checking again in {self.retry_in():.0f}s"
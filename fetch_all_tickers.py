@@ -4,14 +4,18 @@ Script to fetch ALL US stock tickers and add them to stock_data.csv
 """
 
 import pandas as pd
-import requests
+import io
 import csv
 import os
 from datetime import datetime
 
+from http_pool import shared_session
+from symbols import canonical_symbol, canonicalize_rows
+
 def fetch_all_us_tickers():
     """Fetch comprehensive list of US stock tickers from multiple sources"""
     all_tickers = []
+    session = shared_session()  # Pooled, rate-limited per host, retried
     
     print("🚀 Fetching ALL US Stock Tickers...")
     print("=" * 50)
@@ -20,11 +24,11 @@ def fetch_all_us_tickers():
     try:
         print("📈 Fetching S&P 500 companies...")
         sp500_url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-        sp500_tables = pd.read_html(sp500_url)
+        sp500_tables = pd.read_html(io.StringIO(session.get(sp500_url).text))
         sp500_df = sp500_tables[0]
         
         for _, row in sp500_df.iterrows():
-            ticker = str(row['Symbol']).replace('.', '-').strip().upper()
+            ticker = canonical_symbol(row['Symbol'])
             company = str(row['Security']).strip()
             if ticker and company and ticker != 'NAN':
                 all_tickers.append({'ticker': ticker, 'company_name': company, 'source': 'S&P500'})
@@ -41,7 +45,9 @@ def fetch_all_us_tickers():
         nasdaq_url2 = 'https://pkgstore.datahub.io/core/nasdaq-listings/nasdaq-listed_csv/data/7665719fb51081ba0bd834fde71ce822/nasdaq-listed_csv.csv'
         
         try:
-            nasdaq_df = pd.read_csv(nasdaq_url2)
+            response = session.get(nasdaq_url2)
+            response.raise_for_status()
+            nasdaq_df = pd.read_csv(io.StringIO(response.text))
         except:
             # Fallback to manual NASDAQ list
             nasdaq_tickers = [
@@ -271,21 +277,21 @@ def fetch_all_us_tickers():
 def save_to_csv(tickers_data, filename='stock_data.csv'):
     """Save ticker data to CSV file"""
     try:
-        # Sort by ticker for better organization
-        tickers_data.sort(key=lambda x: x['ticker'])
+        # Provider symbols, one row per symbol, sorted by ticker
+        rows = canonicalize_rows([(t['ticker'], t['company_name']) for t in tickers_data])
         
         with open(filename, 'w', newline='', encoding='utf-8') as file:
             fieldnames = ['ticker', 'company_name']
             writer = csv.DictWriter(file, fieldnames=fieldnames)
             
             writer.writeheader()
-            for ticker_data in tickers_data:
+            for ticker, company_name in rows:
                 writer.writerow({
-                    'ticker': ticker_data['ticker'],
-                    'company_name': ticker_data['company_name']
+                    'ticker': ticker,
+                    'company_name': company_name
                 })
         
-        print(f"\n✅ Successfully saved {len(tickers_data)} tickers to {filename}")
+        print(f"\n✅ Successfully saved {len(rows)} tickers to {filename}")
         return True
     except Exception as e:
         print(f"❌ Error saving to CSV: {e}")
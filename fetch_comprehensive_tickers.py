@@ -4,21 +4,24 @@ Advanced Daily Ticker Fetcher using Multiple Free APIs
 Fetches comprehensive ticker lists from SEC EDGAR, Yahoo Finance, and other sources
 """
 
-import requests
 import pandas as pd
 import csv
 import os
 import json
 from datetime import datetime
-import time
+
+from http_pool import shared_session
+from popularity import POPULARITY_FILE, save_popularity
+from symbols import canonicalize_rows
 
 class AdvancedTickerFetcher:
     def __init__(self):
         self.output_file = "comprehensive_tickers.csv"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = shared_session()  # Pooled, rate-limited per host, retried
+        self.headers = {
             'User-Agent': 'Stock Analyzer Ticker Fetcher (educational use)'
-        })
+        }
+        self.market_caps = {}  # ticker -> market cap, for search popularity scores
         
     def fetch_sec_tickers(self):
         """Fetch tickers from SEC EDGAR database (free and comprehensive)"""
@@ -29,7 +32,7 @@ class AdvancedTickerFetcher:
         try:
             # SEC provides a JSON file with all company tickers
             url = "https://www.sec.gov/files/company_tickers.json"
-            response = self.session.get(url)
+            response = self.session.get(url, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
@@ -69,7 +72,7 @@ class AdvancedTickerFetcher:
                     'exchange': exchange
                 }
                 
-                response = self.session.get(url, params=params)
+                response = self.session.get(url, params=params, headers=self.headers)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -81,10 +84,9 @@ class AdvancedTickerFetcher:
                             
                             if ticker and company_name:
                                 tickers.append((ticker, company_name, exchange.upper()))
+                                self.market_caps[ticker] = row.get('marketCap')
                                 
                         print(f"✅ Fetched {len(data['data']['rows'])} tickers from {exchange.upper()}")
-                        
-                time.sleep(1)  # Rate limiting
                 
         except Exception as e:
             print(f"❌ Error fetching NASDAQ screener data: {e}")
@@ -201,6 +203,9 @@ class AdvancedTickerFetcher:
             
         print(f"✅ Saved {len(tickers)} tickers to {self.output_file}")
         print(f"✅ Updated stock_data.csv for Stock Analyzer")
+        
+        # Popularity scores for search ranking, next to stock_data.csv
+        save_popularity(self.market_caps, POPULARITY_FILE)
     
     def create_summary_report(self, tickers):
         """Create a summary report"""
@@ -259,7 +264,7 @@ class AdvancedTickerFetcher:
         print(f"\n📊 Raw data collected: {len(all_tickers)} entries")
         
         # Clean and deduplicate
-        clean_tickers = self.clean_and_deduplicate(all_tickers)
+        clean_tickers = canonicalize_rows(self.clean_and_deduplicate(all_tickers))
         
         # Sort alphabetically
         clean_tickers.sort(key=lambda x: x[0])
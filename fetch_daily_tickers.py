@@ -11,13 +11,29 @@ import csv
 import os
 from datetime import datetime
 import yfinance as yf
-import time
+
+from http_pool import yahoo_session
+from negative_cache import shared_negative_cache
+from popularity import POPULARITY_FILE, save_popularity
+from symbols import canonicalize_rows
 
 class StockTickerFetcher:
     def __init__(self):
         self.output_file = "all_tickers_daily.csv"
         self.backup_file = f"stock_data_backup_{datetime.now().strftime('%Y%m%d')}.csv"
         self.exchanges = ['NASDAQ', 'NYSE', 'AMEX']
+        self.market_caps = {}  # ticker -> market cap, for search popularity scores
+        self.negative_cache = shared_negative_cache()
+        
+    def fetch_info(self, symbol):
+        """yfinance info for symbol; LookupError when Yahoo has (or recently had) no data"""
+        if self.negative_cache.is_known_bad(symbol):
+            raise LookupError(f"{symbol} is cached as having no data")
+        info = yf.Ticker(symbol, session=yahoo_session()).info  # Rate-limited and retried there
+        if not info or not (info.get('longName') or info.get('shortName') or info.get('quoteType')):
+            self.negative_cache.record_failure(symbol, "empty info")
+            raise LookupError(f"No info for {symbol}")
+        return info
         
     def fetch_nasdaq_tickers(self):
         """Fetch NASDAQ tickers using yfinance and alternative sources"""
@@ -34,16 +50,14 @@ class StockTickerFetcher:
             
             for symbol in nasdaq_symbols:
                 try:
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
+                    info = self.fetch_info(symbol)
+                    self.market_caps[symbol] = info.get('marketCap') or info.get('totalAssets')
                     company_name = info.get('longName', f"{symbol} Corp")
                     tickers.append((symbol, company_name, 'NASDAQ'))
                     print(f"✅ Added NASDAQ: {symbol} - {company_name}")
                 except:
                     tickers.append((symbol, f"{symbol} Corp", 'NASDAQ'))
                     print(f"⚠️ Added NASDAQ (basic): {symbol}")
-                
-                time.sleep(0.1)  # Rate limiting
             
             # Method 2: Add common NASDAQ tickers manually
             additional_nasdaq = [
@@ -83,16 +97,14 @@ class StockTickerFetcher:
             
             for symbol in nyse_symbols:
                 try:
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
+                    info = self.fetch_info(symbol)
+                    self.market_caps[symbol] = info.get('marketCap') or info.get('totalAssets')
                     company_name = info.get('longName', f"{symbol} Corp")
                     tickers.append((symbol, company_name, 'NYSE'))
                     print(f"✅ Added NYSE: {symbol} - {company_name}")
                 except:
                     tickers.append((symbol, f"{symbol} Corp", 'NYSE'))
                     print(f"⚠️ Added NYSE (basic): {symbol}")
-                
-                time.sleep(0.1)  # Rate limiting
             
             # Add specific stocks we know are NYSE
             additional_nyse = [
@@ -131,16 +143,14 @@ class StockTickerFetcher:
             
             for symbol in amex_symbols:
                 try:
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
+                    info = self.fetch_info(symbol)
+                    self.market_caps[symbol] = info.get('marketCap') or info.get('totalAssets')
                     company_name = info.get('longName', f"{symbol} Fund")
                     tickers.append((symbol, company_name, 'AMEX'))
                     print(f"✅ Added AMEX: {symbol} - {company_name}")
                 except:
                     tickers.append((symbol, f"{symbol} Fund", 'AMEX'))
                     print(f"⚠️ Added AMEX (basic): {symbol}")
-                
-                time.sleep(0.1)  # Rate limiting
             
             # Add our specific tickers that are AMEX
             additional_amex = [
@@ -201,10 +211,9 @@ class StockTickerFetcher:
     
     def save_to_csv(self, data, filename):
         """Save ticker data to CSV file"""
-        # Sort by ticker (skip header)
+        # Canonical provider symbols, deduplicated and sorted (skip header)
         header = data[0]
-        ticker_data = data[1:]
-        ticker_data.sort(key=lambda x: x[0].upper())
+        ticker_data = canonicalize_rows(data[1:])
         
         with open(filename, 'w', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
@@ -266,11 +275,15 @@ class StockTickerFetcher:
         # Save daily snapshot
         self.save_to_csv(merged_data, self.output_file)
         
+        # Popularity scores for search ranking, next to stock_data.csv
+        save_popularity(self.market_caps, POPULARITY_FILE)
+        
         # Create report
         self.create_daily_report(all_new_tickers)
         
         print("\n🎉 Daily ticker fetch completed successfully!")
         print(f"📈 Total tickers in database: {len(merged_data) - 1}")  # -1 for header
+        print(f"🚫 Known-bad symbols skipped: {self.negative_cache.avoided_requests}")
 
 def main():
     """Main execution function"""
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Fundamentals Cache
+Yahoo info dicts cached per field group, each group with its own TTL.
+
+The info payload mixes fields that move every second (prices), fields that move every
+quarter (valuation ratios, revenue, debt) and fields that almost never move (sector,
+industry, business summary). FundamentalsCache stores them as separate groups:
+
+  quote         QUOTE_TTL_SECONDS         currentPrice, marketCap, dayHigh, ...
+  fundamentals  FUNDAMENTALS_TTL_SECONDS  everything not named in the other groups
+  profile       PROFILE_TTL_SECONDS       sector, industry, longBusinessSummary, ...
+
+The quote group's TTL only runs while its market trades (see market_calendar.py), so
+after the close and over weekends quotes stay cached until the next open.
+
+When only the quote group has expired the cache asks for a quote (yfinance fast_info,
+a small chart request) instead of the multi-kilobyte info payload. The full payload is
+only fetched when fundamentals or profile data is missing or expired, and then it
+refreshes every group at once since it contains them all.
+
+Entries live in <cache dir>/fundamentals/<SYMBOL>.json (see negative_cache.cache_dir).
+"""
+
+import json
+import math
+import os
+import threading
+import time
+
+from market_calendar import freshness_policy
+from negative_cache import cache_dir, write_json_atomic
+
+FUNDAMENTALS_DIR = "fundamentals"
+
+QUOTE_TTL_SECONDS = 5 * 60
+FUNDAMENTALS_TTL_SECONDS = 24 * 60 * 60
+PROFILE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+QUOTE_FIELDS = {
+    'currentPrice', 'regularMarketPrice', 'previousClose', 'regularMarketPreviousClose',
+    'open', 'regularMarketOpen', 'dayHigh', 'dayLow', 'regularMarketDayHigh', 'regularMarketDayLow',
+    'volume', 'regularMarketVolume', 'marketCap', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow',
+    'fiftyDayAverage', 'twoHundredDayAverage', 'averageVolume10days', 'averageVolume',
+    'bid', 'ask', 'bidSize', 'askSize',
+}
+PROFILE_FIELDS = {
+    'longName', 'shortName', 'sector', 'industry', 'sectorKey', 'industryKey', 'longBusinessSummary',
+    'fullTimeEmployees', 'website', 'irWebsite', 'address1', 'address2', 'city', 'state', 'zip',
+    'country', 'phone', 'companyOfficers', 'exchange', 'fullExchangeName', 'quoteType', 'currency',
+    'financialCurrency', 'timeZoneFullName', 'timeZoneShortName', 'firstTradeDateEpochUtc', 'symbol',
+}
+
+# group -> default TTL; fields not listed in QUOTE_FIELDS / PROFILE_FIELDS are fundamentals
+FIELD_GROUP_TTLS = {
+    'quote': QUOTE_TTL_SECONDS,
+    'fundamentals': FUNDAMENTALS_TTL_SECONDS,
+    'profile': PROFILE_TTL_SECONDS,
+}
+
+# yfinance fast_info key -> the info fields it answers
+FAST_INFO_FIELDS = {
+    'lastPrice': ('currentPrice', 'regularMarketPrice'),
+    'previousClose': ('previousClose',),
+    'regularMarketPreviousClose': ('regularMarketPreviousClose',),
+    'open': ('open', 'regularMarketOpen'),
+    'dayHigh': ('dayHigh', 'regularMarketDayHigh'),
+    'dayLow': ('dayLow', 'regularMarketDayLow'),
+    'lastVolume': ('volume', 'regularMarketVolume'),
+    'marketCap': ('marketCap',),
+    'yearHigh': ('fiftyTwoWeekHigh',),
+    'yearLow': ('fiftyTwoWeekLow',),
+    'fiftyDayAverage': ('fiftyDayAverage',),
+    'twoHundredDayAverage': ('twoHundredDayAverage',),
+    'tenDayAverageVolume': ('averageVolume10days',),
+    'threeMonthAverageVolume': ('averageVolume',),
+}
+
+
+def field_group(field):
+    if field in QUOTE_FIELDS:
+        return 'quote'
+    if field in PROFILE_FIELDS:
+        return 'profile'
+    return 'fundamentals'
+
+
+def split_info(info):
+    """info dict -> {group: {field: value}}"""
+    groups = {group: {} for group in FIELD_GROUP_TTLS}
+    for field, value in info.items():
+        groups[field_group(field)][field] = value
+    return groups
+
+
+def quote_from_fast_info(fast_info):
+    """Quote-group fields from a yfinance fast_info mapping (missing values skipped)"""
+    quote = {}
+    for key, fields in FAST_INFO_FIELDS.items():
+        try:
+            value = fast_info[key]
+        except Exception:
+            continue  # fast_info computes lazily and raises for what Yahoo doesn't have
+        if value is None or (isinstance(value, float) and not math.isfinite(value)):
+            continue
+        for field in fields:
+            quote[field] = value
+    return quote
+
+
+def _json_safe(value):
+    """NaN/inf aren't JSON; yfinance uses them for missing numbers"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class FundamentalsCache:
+    """
+    symbol -> info dict assembled from per-group cache entries
+    info(symbol, fetch_info, fetch_quote) refreshes only what has expired:
+    fetch_info(symbol) returns the full info dict, fetch_quote(symbol) just the quote fields
+    """
+
+    def __init__(self, directory=None, ttls=None, policy=None):
+        self.directory = directory or os.path.join(cache_dir(), FUNDAMENTALS_DIR)
+        self.ttls = dict(FIELD_GROUP_TTLS, **(ttls or {}))
+        self.policy = policy or freshness_policy()
+        self.full_fetches = 0
+        self.quote_fetches = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, symbol):
+        return os.path.join(self.directory, symbol.upper() + ".json")
+
+    def load(self, symbol):
+        """{group: {'fetched_at': epoch, 'fields': {...}}} for symbol ({} when not cached)"""
+        try:
+            with open(self.path_for(symbol), 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            return entry if isinstance(entry, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, symbol, entry):
+        try:
+            write_json_atomic(self.path_for(symbol), entry)
+        except OSError:
+            pass  # A read-only install just refetches next time
+
+    def expired_groups(self, symbol, entry, now=None):
+        now = now if now is not None else time.time()
+        expired = []
+        for group, ttl in self.ttls.items():
+            fetched_at = entry.get(group, {}).get('fetched_at')
+            if fetched_at is None:
+                expired.append(group)
+            elif group == 'quote':
+                if not self.policy.is_fresh(symbol, fetched_at, ttl, now):
+                    expired.append(group)
+            elif now - fetched_at >= ttl:
+                expired.append(group)
+        return expired
+
+    def info(self, symbol, fetch_info, fetch_quote=None):
+        """Merged info dict for symbol, fetching only the expired field groups"""
+        symbol = symbol.upper()
+        with self._lock:
+            entry = self.load(symbol)
+        now = time.time()
+        expired = self.expired_groups(symbol, entry, now)
+
+        if any(group != 'quote' for group in expired) or (expired and fetch_quote is None):
+            info = fetch_info(symbol)
+            self.full_fetches += 1
+            if not info:
+                return {}  # Nothing to cache for a symbol Yahoo doesn't know
+            entry = {group: {'fetched_at': now, 'fields': {field: _json_safe(value) for field, value in fields.items()}}
+                     for group, fields in split_info(info).items()}
+        elif expired:
+            quote = fetch_quote(symbol)
+            self.quote_fetches += 1
+            if quote:
+                fields = dict(entry.get('quote', {}).get('fields', {}))
+                fields.update({field: _json_safe(value) for field, value in quote.items()})
+                entry['quote'] = {'fetched_at': now, 'fields': fields}
+        else:
+            self.hits += 1
+            return self._merged(entry)
+
+        with self._lock:
+            self.save(symbol, entry)
+        return self._merged(entry)
+
+    def cached(self, symbol):
+        """(info, fetched_at) from whatever is stored however old, for when Yahoo is down"""
+        entry = self.load(symbol.upper())
+        fetched_at = entry.get('quote', {}).get('fetched_at')
+        return self._merged(entry), fetched_at
+
+    def _merged(self, entry):
+        info = {}
+        for group in ('profile', 'fundamentals', 'quote'):
+            info.update(entry.get(group, {}).get('fields', {}))
+        return info
+
+    def ages(self, symbol):
+        """group -> seconds since it was fetched, for what's cached"""
+        now = time.time()
+        return {group: now - data.get('fetched_at', 0) for group, data in self.load(symbol).items()}
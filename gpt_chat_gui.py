@@ -5,10 +5,9 @@ from tkinter import ttk, scrolledtext, messagebox, simpledialog
 import threading
 import requests
 import json
-import csv
 import os
+import queue
 import webbrowser
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -17,6 +16,14 @@ import time
 import platform
 import subprocess
 
+from circuit_breaker import CLOSED
+from indicators import CHART_FIELDS, add_indicator_columns, graph_for
+from market_data import default_provider
+from revalidating_cache import format_age
+from stock_search import StockSearchIndex, TickerResolver
+from symbols import canonical_symbol
+from universe_snapshot import load_search_index
+
 # Try to import pyperclip for clipboard functionality
 try:
     import pyperclip
@@ -33,6 +40,12 @@ except ImportError:
 # Free Hugging Face API endpoint (no key required for basic use)
 FREE_API_URL = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium"
 
+# Wait this long after the last keystroke before searching for suggestions
+SUGGESTION_DEBOUNCE_MS = 150
+
+# History lengths one analysis reads: 1y for the indicators, 6mo for the charts
+ANALYSIS_PERIODS = ("1y", "6mo")
+
 def clean_ticker(ticker_input):
     """
     Clean and validate ticker input
@@ -232,11 +245,23 @@ class StockAnalyzerGUI:
         self.model_type = "api"  # "api" or "local"
         
         # Stock data for autocomplete
-        self.stock_data = self.load_stock_data()
+        self.search_index = self.load_stock_data()
+        self.stock_data = self.search_index.universe
+        self.ticker_resolver = TickerResolver(self.search_index)
         self.suggestion_listbox = None
         self.current_suggestions = []  # Store current suggestions for selection
+        
+        # Debounced suggestion pipeline: searches run on a worker thread and each
+        # request carries a generation so results for text already typed past are dropped
+        self._suggestion_generation = 0
+        self._suggestion_after_id = None
+        self._suggestion_requests = queue.Queue()
+        threading.Thread(target=self._suggestion_worker, daemon=True).start()
         self.typing_new_ticker = False  # Flag to track if user is entering new ticker
         self.current_ticker = None  # Store current ticker for chart generation
+        # Info and history fetched once per analysis, shared by intrinsic value and charts
+        self.market_data = default_provider()
+        self.analysis_context = None
         
         self.setup_gui()
         self.setup_ai_model()
@@ -522,24 +547,17 @@ class StockAnalyzerGUI:
             self.update_status("Using free online AI (install transformers for local AI)")
     
     def load_stock_data(self):
-        """Load stock data from CSV file"""
-        stock_data = []
+        """Load the stock search index from the memory-mapped stock_data.csv snapshot"""
         csv_path = os.path.join(os.path.dirname(__file__), "stock_data.csv")
         
         try:
-            with open(csv_path, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    stock_data.append({
-                        'ticker': row['ticker'].upper(),
-                        'company': row['company_name']
-                    })
+            return load_search_index(csv_path)
         except FileNotFoundError:
             self.update_status("Stock data file not found")
         except Exception as e:
             self.update_status(f"Error loading stock data: {str(e)}")
         
-        return stock_data
+        return StockSearchIndex([])
     
     def _load_local_model(self):
         """Load local AI model in background"""
@@ -613,129 +631,82 @@ class StockAnalyzerGUI:
             self.question_input.insert("1.0", upper_content)
             self.question_input.mark_set(tk.INSERT, current_pos)
         
-        # Show suggestions based on current input
-        self.show_suggestions()
+        # Show suggestions based on current input once typing pauses
+        self.schedule_suggestions()
+    
+    def schedule_suggestions(self):
+        """Debounce suggestion searches; any result still in flight is now stale"""
+        self._suggestion_generation += 1
+        if self._suggestion_after_id is not None:
+            self.root.after_cancel(self._suggestion_after_id)
+        self._suggestion_after_id = self.root.after(SUGGESTION_DEBOUNCE_MS, self.show_suggestions)
     
     def show_suggestions(self):
         """Show stock ticker and company name suggestions with Finviz-style search"""
+        self._suggestion_after_id = None
         content = self.question_input.get("1.0", tk.END).strip()
         
         if len(content) < 1 or content.upper() == "TYPE TICKER OR COMPANY NAME (E.G., AAPL, APPLE, MICROSOFT)":
             self.hide_suggestions()
             return
         
-        # Use the advanced search function similar to web app
-        matches = self.search_stocks(content, max_results=8)
+        # Use the advanced search function similar to web app, off the Tk main loop
+        self._suggestion_requests.put((self._suggestion_generation, content))
+    
+    def _suggestion_worker(self):
+        """Background thread that runs suggestion searches in request order"""
+        while True:
+            generation, content = self._suggestion_requests.get()
+            
+            # Only the newest queued request matters
+            while not self._suggestion_requests.empty():
+                generation, content = self._suggestion_requests.get_nowait()
+            
+            if generation != self._suggestion_generation:
+                continue
+            
+            try:
+                matches = self.search_stocks(content, max_results=8)
+            except Exception as e:
+                self.root.after(0, self._suggestion_failed, generation, e)
+                continue
+            
+            self.root.after(0, self._apply_suggestions, generation, matches)
+    
+    def _apply_suggestions(self, generation, matches):
+        """Show worker results on the main thread unless the user typed past them"""
+        if generation != self._suggestion_generation:
+            return
         
         if matches:
             self.display_suggestions(matches)
         else:
             self.hide_suggestions()
     
+    def _suggestion_failed(self, generation, error):
+        """Report a failed search in the status bar unless the user typed past it"""
+        if generation != self._suggestion_generation:
+            return
+        
+        self.hide_suggestions()
+        self.update_status(f"Suggestion search failed: {error}")
+    
     def search_stocks(self, query, max_results=8):
         """
         Advanced stock search with Finviz-style prioritization
         Returns filtered results with match types and smart ranking
         """
-        if not query or len(query) < 1:
-            return []
-        
-        query = query.upper().strip()
-        results = []
-        
-        # Exact ticker matches first (highest priority)
-        for stock in self.stock_data:
-            if stock['ticker'].upper() == query:
-                results.append({
-                    'display': f"{stock['ticker']} - {stock['company']}",
-                    'ticker': stock['ticker'],
-                    'company': stock['company'],
-                    'match_type': 'exact_ticker',
-                    'icon': '🎯'
-                })
-        
-        # Company name exact word matches (e.g., "APPLE" should find "Apple Inc")
-        if len(results) < max_results:
-            for stock in self.stock_data:
-                if stock['ticker'].upper() not in [r['ticker'].upper() for r in results]:
-                    company_words = stock['company'].upper().split()
-                    if any(word == query for word in company_words):
-                        results.append({
-                            'display': f"{stock['ticker']} - {stock['company']}",
-                            'ticker': stock['ticker'],
-                            'company': stock['company'],
-                            'match_type': 'company_exact_word',
-                            'icon': '🎯'
-                        })
-                        if len(results) >= max_results:
-                            break
-        
-        # Ticker starts with query
-        if len(results) < max_results:
-            for stock in self.stock_data:
-                if (stock['ticker'].upper().startswith(query) and 
-                    stock['ticker'].upper() not in [r['ticker'].upper() for r in results]):
-                    results.append({
-                        'display': f"{stock['ticker']} - {stock['company']}",
-                        'ticker': stock['ticker'],
-                        'company': stock['company'],
-                        'match_type': 'ticker_starts',
-                        'icon': '📈'
-                    })
-                    if len(results) >= max_results:
-                        break
-        
-        # Company name contains query
-        if len(results) < max_results:
-            for stock in self.stock_data:
-                if (query in stock['company'].upper() and 
-                    stock['ticker'].upper() not in [r['ticker'].upper() for r in results]):
-                    results.append({
-                        'display': f"{stock['ticker']} - {stock['company']}",
-                        'ticker': stock['ticker'],
-                        'company': stock['company'],
-                        'match_type': 'company_contains',
-                        'icon': '🏢'
-                    })
-                    if len(results) >= max_results:
-                        break
-        
-        # Ticker contains query (partial matches)
-        if len(results) < max_results:
-            for stock in self.stock_data:
-                if (query in stock['ticker'].upper() and 
-                    stock['ticker'].upper() not in [r['ticker'].upper() for r in results]):
-                    results.append({
-                        'display': f"{stock['ticker']} - {stock['company']}",
-                        'ticker': stock['ticker'],
-                        'company': stock['company'],
-                        'match_type': 'ticker_contains',
-                        'icon': '📊'
-                    })
-                    if len(results) >= max_results:
-                        break
-        
-        return results
+        return self.search_index.search(query, max_results=max_results)
     
     def display_suggestions(self, suggestions):
         """Display enhanced suggestion dropdown with Finviz-style formatting"""
-        if self.suggestion_listbox:
-            self.suggestion_listbox.destroy()
+        if self.suggestion_listbox is None:
+            self._create_suggestion_listbox()
         
-        # Create suggestion listbox with enhanced styling
+        # Reuse the listbox: replace its rows instead of rebuilding the widget
         max_height = min(len(suggestions), 6)  # Show up to 6 suggestions at once
-        self.suggestion_listbox = tk.Listbox(self.root, 
-                                           height=max_height,
-                                           font=("Arial", 11), 
-                                           bg="#ffffff",           # White background
-                                           fg="#2c3e50",           # Dark blue text
-                                           selectbackground="#007acc",  # Blue selection
-                                           selectforeground="#ffffff",  # White text when selected
-                                           highlightthickness=1,
-                                           highlightcolor="#007acc",
-                                           relief="solid",
-                                           borderwidth=1,
-                                           activestyle="dotbox")    # Better selection style
+        self.suggestion_listbox.config(height=max_height)
+        self.suggestion_listbox.delete(0, tk.END)
         
         # Add enhanced suggestions with icons and formatting
         for suggestion in suggestions:
@@ -767,19 +738,37 @@ class StockAnalyzerGUI:
         
         self.suggestion_listbox.place(x=rel_x, y=rel_y, width=input_width)
         
+        # Store suggestions data for selection handling
+        self.current_suggestions = suggestions
+    
+    def _create_suggestion_listbox(self):
+        """Create the suggestion dropdown once; later updates only change its rows"""
+        # Create suggestion listbox with enhanced styling
+        self.suggestion_listbox = tk.Listbox(self.root, 
+                                           font=("Arial", 11), 
+                                           bg="#ffffff",           # White background
+                                           fg="#2c3e50",           # Dark blue text
+                                           selectbackground="#007acc",  # Blue selection
+                                           selectforeground="#ffffff",  # White text when selected
+                                           highlightthickness=1,
+                                           highlightcolor="#007acc",
+                                           relief="solid",
+                                           borderwidth=1,
+                                           activestyle="dotbox")    # Better selection style
+        
         # Bind enhanced selection events
         self.suggestion_listbox.bind("<Double-Button-1>", self.on_suggestion_select)
         self.suggestion_listbox.bind("<Return>", self.on_suggestion_select)
         self.suggestion_listbox.bind("<Button-1>", self.on_suggestion_click)
-        
-        # Store suggestions data for selection handling
-        self.current_suggestions = suggestions
     
     def hide_suggestions(self, event=None):
-        """Hide suggestion dropdown"""
+        """Hide suggestion dropdown and drop any search still in flight"""
+        self._suggestion_generation += 1
+        if self._suggestion_after_id is not None:
+            self.root.after_cancel(self._suggestion_after_id)
+            self._suggestion_after_id = None
         if self.suggestion_listbox:
-            self.suggestion_listbox.destroy()
-            self.suggestion_listbox = None
+            self.suggestion_listbox.place_forget()
     
     def on_suggestion_select(self, event):
         """Handle suggestion selection (double-click or Enter)"""
@@ -1397,11 +1386,7 @@ class StockAnalyzerGUI:
         ticker_matches = re.findall(r'\b[A-Z]{1,5}(?:\.[A-Z])?\b', input_text.upper())
         if ticker_matches:
             potential_ticker = ticker_matches[0]
-            # Check if it's a valid ticker in our database
-            for stock in self.stock_data:
-                if stock['ticker'] == potential_ticker:
-                    return potential_ticker
-            # If not found in database, still return it as it might be valid
+            # Valid in our database or not, it might still be a real ticker
             return potential_ticker
         
         # If no direct ticker match, try company name resolution
@@ -1635,9 +1620,9 @@ class StockAnalyzerGUI:
             
         except Exception as e:
             print(f"Debug: Exception occurred: {str(e)}")  # Debug output
-            # Ensure we always provide some analysis
-            fallback_response = self._create_comprehensive_analysis(question)
-            self.root.after(0, self._display_ai_response, fallback_response, None)
+            # No second attempt: the data layer has already retried, and its breaker decides
+            # when Yahoo is worth asking again
+            self.root.after(0, self._display_ai_response, None, f"❌ Analysis failed: {str(e)}")
     
     def _create_comprehensive_analysis(self, question):
         """Create a comprehensive stock analysis using real data from yfinance"""
@@ -1651,13 +1636,13 @@ class StockAnalyzerGUI:
         if ticker_matches:
             # First try the regex match
             potential_ticker = ticker_matches[0]
-            ticker = self.find_ticker_from_company_name(potential_ticker)
+            ticker = self.ticker_resolver.resolve(potential_ticker)
         else:
             # If no clear ticker pattern, try to resolve the whole input as a company name
-            ticker = self.find_ticker_from_company_name(question.strip())
+            ticker = self.ticker_resolver.resolve(question.strip())
         
-        # Final cleanup
-        ticker = ticker.upper().strip()
+        # Final cleanup: the provider's spelling (BRK.B -> BRK-B, BTCUSD -> BTC-USD)
+        ticker = canonical_symbol(ticker)
         
         # Store the current ticker for chart generation
         self.current_ticker = ticker
@@ -1667,48 +1652,31 @@ class StockAnalyzerGUI:
         self.root.after(0, self.display_analysis_header, ticker, company_name)
         
         try:
-            # Fetch real stock data
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            hist = stock.history(period="1y")
+            # Fetch real stock data: one history call covers the 1y analysis and the 6mo charts
+            context = self.market_data.analysis(ticker, periods=ANALYSIS_PERIODS)
+            self.analysis_context = context
+            hist = context.history("1y")
             
             if hist.empty:
                 return f"❌ Could not fetch data for ticker: {ticker}. Please check the symbol and try again."
+            info = context.info
             
             # Calculate technical indicators
             current_price = hist['Close'].iloc[-1]
-            sma_9 = hist['Close'].rolling(window=9).mean().iloc[-1]
-            sma_50 = hist['Close'].rolling(window=50).mean().iloc[-1]
-            sma_200 = hist['Close'].rolling(window=200).mean().iloc[-1]
-            
-            # RSI calculation
-            delta = hist['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs)).iloc[-1]
-            
-            # MACD calculation
-            exp1 = hist['Close'].ewm(span=12).mean()
-            exp2 = hist['Close'].ewm(span=26).mean()
-            macd_line = exp1 - exp2
-            signal_line = macd_line.ewm(span=9).mean()
-            macd_current = macd_line.iloc[-1]
-            signal_current = signal_line.iloc[-1]
-            
-            # Ichimoku Cloud calculation
-            high_9 = hist['High'].rolling(window=9).max()
-            low_9 = hist['Low'].rolling(window=9).min()
-            tenkan_sen = ((high_9 + low_9) / 2).iloc[-1]
-            
-            high_26 = hist['High'].rolling(window=26).max()
-            low_26 = hist['Low'].rolling(window=26).min()
-            kijun_sen = ((high_26 + low_26) / 2).iloc[-1]
-            
-            # Determine cloud position (current price vs cloud)
-            high_52 = hist['High'].rolling(window=52).max()
-            low_52 = hist['Low'].rolling(window=52).min()
-            senkou_span_b = ((high_52 + low_52) / 2).iloc[-27] if len(hist) > 27 else None
+            # Only the latest values are read, so only the trailing bars that decide them are used
+            latest = graph_for(hist).latest(('sma_9', 'sma_50', 'sma_200', 'rsi', 'macd', 'macd_signal', 'tenkan_sen',
+                                             'kijun_sen', 'senkou_span_b', 'stoch_k', 'stoch_d'))
+            sma_9 = latest['sma_9']
+            sma_50 = latest['sma_50']
+            sma_200 = latest['sma_200']
+            rsi = latest['rsi']
+            macd_current = latest['macd']
+            signal_current = latest['macd_signal']
+            
+            # Ichimoku Cloud: today's conversion/base lines, the cloud plotted 26 days ago
+            tenkan_sen = latest['tenkan_sen']
+            kijun_sen = latest['kijun_sen']
+            senkou_span_b = latest['senkou_span_b'] if len(hist) > 27 else None
             senkou_span_a = ((tenkan_sen + kijun_sen) / 2)
             
             # Cloud signal
@@ -1719,11 +1687,9 @@ class StockAnalyzerGUI:
                 elif current_price < min(senkou_span_a, senkou_span_b):
                     ichimoku_signal = "BEARISH"
             
-            # Stochastic Oscillator calculation (5-day period)
-            lowest_low_5 = hist['Low'].rolling(window=5).min()
-            highest_high_5 = hist['High'].rolling(window=5).max()
-            stoch_k = (100 * ((hist['Close'] - lowest_low_5) / (highest_high_5 - lowest_low_5))).iloc[-1]
-            stoch_d = (100 * ((hist['Close'] - lowest_low_5) / (highest_high_5 - lowest_low_5))).rolling(window=3).mean().iloc[-1]
+            # Stochastic Oscillator (5-day period)
+            stoch_k = latest['stoch_k']
+            stoch_d = latest['stoch_d']
             
             # Volume analysis
             avg_volume = hist['Volume'].mean()
@@ -1747,6 +1713,12 @@ class StockAnalyzerGUI:
             formatted = f"📊 COMPREHENSIVE STOCK ANALYSIS: {ticker} ({company_name})\n"
             formatted += f"{'='*60}\n\n"
             
+            # Yahoo failed and the provider fell back to stored data (see circuit_breaker.py)
+            if context.degraded:
+                as_of = context.degraded_as_of
+                age = f" from {format_age(time.time() - as_of)} ago" if as_of else ""
+                formatted += f"⚡ Live data is unavailable; this analysis uses cached data{age}.\n\n"
+            
             # Add company and industry overview
             sector = info.get('sector', 'N/A')
             industry = info.get('industry', 'N/A')
@@ -1914,46 +1886,19 @@ class StockAnalyzerGUI:
     
     def find_ticker_from_company_name(self, company_input):
         """Find ticker from company name input"""
-        company_input = company_input.upper().strip()
-        
-        # First, check if it's already a ticker
-        for stock in self.stock_data:
-            if stock['ticker'] == company_input:
-                return company_input
-        
-        # If not, search for company name matches
-        best_match = ""
-        best_score = 0
-        
-        for stock in self.stock_data:
-            company_name = stock['company'].upper()
-            ticker = stock['ticker']
-            
-            # Exact match
-            if company_name == company_input:
-                return ticker
-                
-            # Partial match - check if input words are in company name
-            input_words = company_input.split()
-            company_words = company_name.split()
-            
-            matches = sum(1 for word in input_words if any(w.startswith(word) for w in company_words))
-            score = matches / len(input_words) if input_words else 0
-            
-            if score > best_score and score > 0.5:  # At least 50% match
-                best_score = score
-                best_match = ticker
-        
-        # Return best match or the original input if no good match found
-        return best_match if best_match else company_input
+        return self.ticker_resolver.resolve(company_input)
+    
+    def _analysis_context(self, ticker):
+        """The last analysis's memoized data when it was for ticker, else a new context"""
+        context = self.analysis_context
+        if context is None or context.symbol != canonical_symbol(ticker):
+            context = self.market_data.analysis(ticker, periods=ANALYSIS_PERIODS)
+        return context
     
     def calculate_intrinsic_value(self, ticker):
         """Calculate intrinsic value using multiple valuation methods"""
         try:
-            import yfinance as yf
-            
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            info = self._analysis_context(ticker).info
             
             # Get key financial metrics
             current_price = info.get('currentPrice', info.get('regularMarketPrice', 0))
@@ -2056,10 +2001,7 @@ class StockAnalyzerGUI:
     def get_company_name_from_ticker(self, ticker):
         """Get company name from ticker"""
         ticker = ticker.upper()
-        for stock in self.stock_data:
-            if stock['ticker'] == ticker:
-                return stock['company']
-        return f"Unknown Company ({ticker})"
+        return self.ticker_resolver.company_name(ticker, f"Unknown Company ({ticker})")
     
     def get_industry_insights(self, ticker, sector, industry, company_name):
         """Get industry and company insights"""
@@ -2154,11 +2096,19 @@ class StockAnalyzerGUI:
         """Display AI response in the GUI"""
         if error:
             self.display_message(error, "error")
-            self.update_status("❌ Error occurred")
+            breaker = self.market_data.breaker
+            if breaker is not None and breaker.state != CLOSED:
+                self.update_status(f"⚡ {breaker.describe()}")
+            else:
+                self.update_status("❌ Error occurred")
             self.charts_button.config(state="disabled")
         else:
             self.display_complete_analysis(response, "response")
-            self.update_status("✅ Analysis complete")
+            breaker = self.market_data.breaker
+            if breaker is not None and breaker.state != CLOSED:
+                self.update_status(f"⚡ {breaker.describe()}")
+            else:
+                self.update_status("✅ Analysis complete")
             # Enable charts button if we have a current ticker
             if self.current_ticker:
                 self.charts_button.config(state="normal")
@@ -2253,10 +2203,8 @@ class StockAnalyzerGUI:
             import matplotlib.dates as mdates
             from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
             
-            # Get stock data
-            import yfinance as yf
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="6mo")  # 6 months for cleaner charts
+            # Get stock data (sliced from the analysis's history when it's the same ticker)
+            hist = self._analysis_context(ticker).history("6mo")  # 6 months for cleaner charts
             
             if hist.empty:
                 self.update_status(f"❌ No chart data available for {ticker}")
@@ -2272,35 +2220,9 @@ class StockAnalyzerGUI:
             notebook = ttk.Notebook(chart_window)
             notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
             
-            # Calculate technical indicators for charts
-            hist['SMA_9'] = hist['Close'].rolling(window=9).mean()
-            hist['SMA_50'] = hist['Close'].rolling(window=50).mean()
-            hist['SMA_200'] = hist['Close'].rolling(window=200).mean()
-            
-            # RSI
-            delta = hist['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            hist['RSI'] = 100 - (100 / (1 + rs))
-            
-            # MACD
-            exp1 = hist['Close'].ewm(span=12).mean()
-            exp2 = hist['Close'].ewm(span=26).mean()
-            hist['MACD'] = exp1 - exp2
-            hist['MACD_Signal'] = hist['MACD'].ewm(span=9).mean()
-            
-            # Stochastic (5-day)
-            lowest_low_5 = hist['Low'].rolling(window=5).min()
-            highest_high_5 = hist['High'].rolling(window=5).max()
-            hist['Stoch_K'] = 100 * ((hist['Close'] - lowest_low_5) / (highest_high_5 - lowest_low_5))
-            hist['Stoch_D'] = hist['Stoch_K'].rolling(window=3).mean()
-            
-            # Bollinger Bands
-            hist['BB_Middle'] = hist['Close'].rolling(window=20).mean()
-            bb_std = hist['Close'].rolling(window=20).std()
-            hist['BB_Upper'] = hist['BB_Middle'] + (bb_std * 2)
-            hist['BB_Lower'] = hist['BB_Middle'] - (bb_std * 2)
+            # Calculate the technical indicators the chart tabs plot (no Ichimoku tab here)
+            hist = add_indicator_columns(hist, CHART_FIELDS['price'] + CHART_FIELDS['rsi'] + CHART_FIELDS['macd']
+                                         + CHART_FIELDS['stochastic'])
             
             # Tab 1: Price Chart with Moving Averages
             price_frame = ttk.Frame(notebook)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+History Store
+Local columnar OHLCV cache: one Parquet file per symbol holding its full bar history.
+
+The first request for a symbol downloads the period asked for and saves it. Later
+requests that fall inside what's stored only ask Yahoo for the bars since the last
+stored one (re-fetching that last bar, which may have been a partial day) and append
+them. A warm analysis therefore costs at most one tiny delta request, and none at all
+while the stored bars are still fresh: REFRESH_SECONDS while the market is trading,
+and until the next session opens once it has closed (see market_calendar.py). A split or dividend inside the delta
+changes Yahoo's adjusted prices for the whole history, so that triggers a full refetch
+of the stored range instead of an append.
+
+Files live in <cache dir>/history/ (see negative_cache.cache_dir). Without pyarrow the
+store falls back to pickles, which keep the same columns and metadata.
+
+Usage: python history_store.py [SYMBOL ...]   (lists what's stored)
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from market_calendar import freshness_policy
+from negative_cache import cache_dir
+
+# Try to import pyarrow for Parquet files
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+HISTORY_DIR = "history"
+REFRESH_SECONDS = 5 * 60  # While the market is open; see FreshnessPolicy
+
+# Calendar span of each yfinance period, used to pick the longest one and slice the rest
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+    'max': None,
+}
+COVERED_FROM_MAX = 'max'
+
+
+def period_start(period, now=None):
+    """First timestamp a period covers (None for 'max')"""
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period!r} (use one of {', '.join(PERIOD_OFFSETS)})")
+    offset = PERIOD_OFFSETS[period]
+    if offset is None:
+        return None
+    now = now if now is not None else pd.Timestamp.now()
+    return now - offset
+
+
+def longest_period(periods):
+    """The period that covers all the others"""
+    periods = list(periods)
+    if 'max' in periods:
+        return 'max'
+    now = pd.Timestamp('2000-01-01')  # Any fixed date ranks the offsets
+    return min(periods, key=lambda period: period_start(period, now))
+
+
+def slice_period(hist, period):
+    """The rows of a longer daily history that a fetch of period would have returned"""
+    start = period_start(period, pd.Timestamp.now(tz=getattr(hist.index, 'tz', None)))
+    if start is None or hist.empty:
+        return hist.copy()
+    return hist.loc[hist.index >= start.normalize()].copy()
+
+
+def degraded_history(hist, as_of):
+    """Mark stored bars served in place of a failed fetch"""
+    hist.attrs.update(degraded=True, as_of=as_of)
+    return hist
+
+
+def _has_corporate_action(bars):
+    """Splits and dividends re-adjust every earlier price Yahoo returns"""
+    for column in ('Stock Splits', 'Dividends'):
+        if column in bars.columns and (bars[column].fillna(0) != 0).any():
+            return True
+    return False
+
+
+class HistoryStore:
+    """
+    symbol -> full daily OHLCV history on disk, refreshed by appending deltas
+    download(symbol, period=None, start=None) is the upstream fetch; the store calls it
+    with a period for cold fetches and with start=<last stored date> for deltas
+    """
+
+    def __init__(self, directory=None, refresh_seconds=REFRESH_SECONDS, policy=None):
+        self.directory = directory or os.path.join(cache_dir(), HISTORY_DIR)
+        self.refresh_seconds = refresh_seconds
+        self.policy = policy or freshness_policy()
+        self.full_fetches = 0
+        self.delta_fetches = 0
+        self.hits = 0
+
+    def path_for(self, symbol):
+        suffix = ".parquet" if PARQUET_AVAILABLE else ".pkl"
+        return os.path.join(self.directory, symbol.upper() + suffix)
+
+    def load(self, symbol):
+        """Stored history, or None when there is none (or it can't be read)"""
+        path = self.path_for(symbol)
+        try:
+            if PARQUET_AVAILABLE:
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            return None  # Corrupt or foreign file: refetch rather than fail the analysis
+
+    def save(self, symbol, hist, covered_from):
+        """Write the full history atomically, recording how far back it's complete"""
+        hist = hist.copy()
+        hist.attrs = {'covered_from': covered_from}
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(symbol)
+        fd, temp_path = tempfile.mkstemp(prefix='.history-', dir=self.directory)
+        os.close(fd)
+        try:
+            if PARQUET_AVAILABLE:
+                hist.to_parquet(temp_path)
+            else:
+                hist.to_pickle(temp_path)
+            os.chmod(temp_path, 0o644)  # mkstemp creates 0600
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def refreshed_at(self, symbol):
+        """Epoch seconds of the last refresh (None when not stored)"""
+        try:
+            return os.stat(self.path_for(symbol)).st_mtime
+        except OSError:
+            return None
+
+    def age(self, symbol):
+        """Seconds since the stored history was last refreshed (None when not stored)"""
+        refreshed_at = self.refreshed_at(symbol)
+        return None if refreshed_at is None else time.time() - refreshed_at
+
+    def is_fresh(self, symbol):
+        refreshed_at = self.refreshed_at(symbol)
+        return refreshed_at is not None and self.policy.is_fresh(symbol, refreshed_at, self.refresh_seconds)
+
+    def _covers(self, stored, start):
+        covered_from = stored.attrs.get('covered_from')
+        if covered_from == COVERED_FROM_MAX:
+            return True
+        if covered_from is None or start is None:
+            return False
+        return pd.Timestamp(covered_from) <= start.normalize()
+
+    def history(self, symbol, period, download):
+        """Daily bars for period, downloading only what the store doesn't already have"""
+        symbol = symbol.upper()
+        start = period_start(period)
+        stored = self.load(symbol)
+
+        if stored is None or stored.empty or not self._covers(stored, start):
+            hist = download(symbol, period=period)
+            self.full_fetches += 1
+            if hist.empty:
+                return hist
+            return slice_period(self.put(symbol, hist, period, stored), period)
+
+        if self.is_fresh(symbol):
+            self.hits += 1
+            return slice_period(stored, period)
+
+        # Bars since the last stored one, which is re-fetched in case it was a partial day
+        covered_from = stored.attrs.get('covered_from')
+        last_date = stored.index[-1]
+        delta = download(symbol, start=str(last_date.date()))
+        self.delta_fetches += 1
+
+        if _has_corporate_action(delta.loc[delta.index > last_date]):
+            if covered_from == COVERED_FROM_MAX:
+                hist = download(symbol, period='max')
+            else:
+                hist = download(symbol, start=covered_from)
+            self.full_fetches += 1
+            if hist.empty:
+                return slice_period(stored, period)
+        else:
+            hist = self._merge(stored, delta)
+        self.save(symbol, hist, covered_from)
+        return slice_period(hist, period)
+
+    def put(self, symbol, hist, period, stored=None):
+        """
+        Store a freshly downloaded period of bars, merged with what's already stored
+        (pass stored when the caller has just loaded it); returns the full history
+        """
+        symbol = symbol.upper()
+        start = period_start(period)
+        covered_from = COVERED_FROM_MAX if start is None else str(start.normalize().date())
+        if stored is None:
+            stored = self.load(symbol)
+        if stored is not None and not stored.empty:
+            # A split or dividend since the last stored bar re-adjusts the older stored prices,
+            # so they can't be kept alongside the new download
+            if not _has_corporate_action(hist.loc[hist.index > stored.index[-1]]):
+                if self._covers(stored, start):
+                    covered_from = stored.attrs.get('covered_from')
+                hist = self._merge(stored, hist)
+        self.save(symbol, hist, covered_from)
+        return hist
+
+    def cached(self, symbol, period):
+        """Stored bars for period when they're fresh and complete, else None (no download)"""
+        stored = self.load(symbol)
+        if stored is None or stored.empty or not self._covers(stored, period_start(period)):
+            return None
+        if not self.is_fresh(symbol):
+            return None
+        self.hits += 1
+        return slice_period(stored, period)
+
+    def _merge(self, stored, new_bars):
+        """Stored bars plus new ones; a bar present in both takes the new values"""
+        if new_bars.empty:
+            return stored
+        new_bars = new_bars.reindex(columns=stored.columns.union(new_bars.columns, sort=False))
+        merged = pd.concat([stored.loc[~stored.index.isin(new_bars.index)], new_bars])
+        return merged.sort_index()
+
+    def symbols(self):
+        """Symbols with a stored history"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(os.path.splitext(name)[0] for name in names
+                      if name.endswith(('.parquet', '.pkl')) and not name.startswith('.'))
+
+
+def main():
+    store = HistoryStore()
+    symbols = [symbol.upper() for symbol in sys.argv[1:]] or store.symbols()
+    print(f"🗄️ {len(store.symbols())} symbols stored in {store.directory}")
+    for symbol in symbols:
+        hist = store.load(symbol)
+        if hist is None or hist.empty:
+            print(f"   {symbol:<10} not stored")
+            continue
+        print(f"   {symbol:<10} {len(hist):>6} bars  {hist.index[0].date()} -> {hist.index[-1].date()}"
+              f"  complete from {hist.attrs.get('covered_from')}  refreshed {store.age(symbol) / 60:.0f} min ago")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+HTTP Pool
+One shared transport for every upstream request: pooled keep-alive connections, an
+adaptive per-host rate limit, and retries with jitter.
+
+Fixed sleeps between requests are either too slow (the upstream could take more) or
+too fast (it answers 429 and the run fails). Instead every host gets an
+AdaptiveRateLimiter, a token bucket whose rate follows AIMD: each success raises it a
+little, each 429 / 5xx halves it and honours Retry-After. Throughput settles just
+under whatever the upstream currently allows, and all threads and sessions talking
+to the same host share its limiter.
+
+Failed requests (connection errors, timeouts, 429 and 5xx answers) are retried with
+full-jitter exponential backoff, so parallel workers don't retry in lockstep.
+
+  shared_session()  requests-based, for SEC / NASDAQ / Wikipedia downloads
+  yahoo_session()   what yfinance gets: a browser-impersonating curl_cffi session
+                    (Yahoo turns away plain clients), or the requests one without it
+
+Usage: python http_pool.py URL [URL ...]   (fetches each URL and prints the limiter state)
+"""
+
+import email.utils
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NameResolutionError
+
+# Try to import curl_cffi (a yfinance dependency) for Yahoo's browser fingerprint checks
+try:
+    from curl_cffi import requests as curl_requests
+    CURL_CFFI_AVAILABLE = True
+except ImportError:
+    CURL_CFFI_AVAILABLE = False
+
+USER_AGENT = 'Stock Analyzer (educational use)'
+POOL_SIZE = 16               # Keep-alive connections per host
+TIMEOUT_SECONDS = 15
+
+DEFAULT_RATE = 5.0           # Requests per second a host starts at
+DEFAULT_BURST = 5
+MIN_RATE = 0.5
+MAX_RATE = 50.0
+RATE_INCREASE = 0.1          # Added per success
+RATE_DECREASE = 0.5          # Multiplied in per throttle
+DECREASE_COOLDOWN = 1.0      # A burst of 429s from requests already in flight counts once
+
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 0.5        # Base of the exponential backoff
+MAX_BACKOFF_SECONDS = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout)
+if CURL_CFFI_AVAILABLE:
+    TRANSIENT_ERRORS += (curl_requests.exceptions.ConnectionError, curl_requests.exceptions.Timeout)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket with an AIMD rate: acquire() before each request, then report the
+    outcome with on_success() or on_throttle(retry_after)
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 increase=RATE_INCREASE, decrease=RATE_DECREASE, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._last_decrease = None
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttles = 0
+        self.waited = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take a token, sleeping until it's due; returns the seconds waited"""
+        with self._lock:
+            self._refill(self.clock())
+            self._tokens -= 1  # Reserve now, so concurrent callers queue up behind each other
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.acquired += 1
+            self.waited += wait
+        if wait:
+            self.sleep(wait)
+        return wait
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        """The upstream pushed back (429 / 5xx / dropped connection)"""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if self._last_decrease is None or now - self._last_decrease >= DECREASE_COOLDOWN:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+                self.throttles += 1
+            self._tokens = min(self._tokens, 0.0)  # No bursting straight back into the limit
+            if retry_after:
+                self._tokens = min(self._tokens, -retry_after * self.rate)
+
+    def state(self):
+        return {'rate': round(self.rate, 2), 'acquired': self.acquired,
+                'throttles': self.throttles, 'waited': round(self.waited, 2)}
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def host_limiter(host):
+    """The process-wide limiter for a host, shared by every session"""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = AdaptiveRateLimiter()
+        return limiter
+
+
+def limiter_states():
+    """host -> limiter state, for reports"""
+    with _limiters_lock:
+        return {host: limiter.state() for host, limiter in _limiters.items()}
+
+
+def retry_after_seconds(response):
+    """Retry-After as seconds (it may also be an HTTP date); None when absent"""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient(error):
+    """Worth retrying: dropped connections and timeouts, but not a host that doesn't resolve"""
+    if CURL_CFFI_AVAILABLE and isinstance(error, curl_requests.exceptions.DNSError):
+        return False
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    if isinstance(reason, NameResolutionError):
+        return False  # requests wraps urllib3's resolution failure in a ConnectionError
+    return True
+
+
+def backoff_delay(attempt, base=BACKOFF_SECONDS, cap=MAX_BACKOFF_SECONDS):
+    """Full jitter: uniform between 0 and the exponential backoff for this attempt"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class _RateLimitedRetries:
+    """
+    request() override shared by the session classes below: every attempt waits for
+    the host's limiter, and transient failures are retried with jittered backoff
+    """
+
+    def _setup(self, retries, timeout, limiter_for, sleep):
+        self.retries = retries
+        self.timeout = timeout
+        self.limiter_for = limiter_for or host_limiter
+        self.sleep = sleep
+        self.attempts = 0
+        self.retried = 0
+        self.failures = 0
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        limiter = self.limiter_for(urlsplit(url).hostname or '')
+
+        for attempt in range(self.retries + 1):
+            limiter.acquire()
+            self.attempts += 1
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except TRANSIENT_ERRORS as error:
+                if not is_transient(error):
+                    self.failures += 1
+                    raise
+                limiter.on_throttle()
+                if attempt == self.retries:
+                    self.failures += 1
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    limiter.on_success()
+                    return response
+                limiter.on_throttle(retry_after_seconds(response))
+                if attempt == self.retries:
+                    self.failures += 1
+                    return response  # Callers already handle error statuses
+                close = getattr(response, 'close', None)
+                if close:
+                    close()
+            self.retried += 1
+            self.sleep(backoff_delay(attempt))
+
+
+class RateLimitedSession(_RateLimitedRetries, requests.Session):
+    """requests.Session with pooled keep-alive connections, rate limiting and retries"""
+
+    def __init__(self, pool_size=POOL_SIZE, retries=MAX_RETRIES, timeout=TIMEOUT_SECONDS,
+                 limiter_for=None, sleep=time.sleep):
+        super().__init__()
+        self._setup(retries, timeout, limiter_for, sleep)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.headers.update({'User-Agent': USER_AGENT})
+
+
+if CURL_CFFI_AVAILABLE:
+    class ImpersonatingSession(_RateLimitedRetries, curl_requests.Session):
+        """curl_cffi session with a browser fingerprint, rate limiting and retries"""
+
+        def __init__(self, retries=MAX_RETRIES, timeout=TIMEOUT_SECONDS, limiter_for=None, sleep=time.sleep):
+            super().__init__(impersonate='chrome')
+            self._setup(retries, timeout, limiter_for, sleep)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def shared_session():
+    """Process-wide requests session for plain HTTP downloads"""
+    with _sessions_lock:
+        if 'http' not in _sessions:
+            _sessions['http'] = RateLimitedSession()
+        return _sessions['http']
+
+
+def yahoo_session(retries=MAX_RETRIES, timeout=TIMEOUT_SECONDS):
+    """
+    Process-wide session to hand yfinance (session=yahoo_session()), one per retry budget;
+    calls behind a circuit breaker want a short one so failures reach the breaker quickly
+    """
+    key = ('yahoo', retries, timeout)
+    with _sessions_lock:
+        if key not in _sessions:
+            session_class = ImpersonatingSession if CURL_CFFI_AVAILABLE else RateLimitedSession
+            _sessions[key] = session_class(retries=retries, timeout=timeout)
+        return _sessions[key]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-1])
+        return
+    session = shared_session()
+    for url in sys.argv[1:]:
+        start = time.perf_counter()
+        try:
+            response = session.get(url)
+            print(f"🌐 {response.status_code} {url} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        except requests.RequestException as e:
+            print(f"❌ {url}: {e}")
+    print(f"🔁 {session.attempts} attempts, {session.retried} retried, {session.failures} gave up")
+    for host, state in limiter_states().items():
+        print(f"   {host:<30} {state['rate']:>6} req/s   {state['throttles']} throttles   waited {state['waited']}s")
+
+
+if __name__ == "__main__":
+    main()
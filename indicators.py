@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Indicators
+One NumPy engine for every technical indicator the apps show.
+
+The Streamlit app, the GUI analysis and the GUI charts used to compute SMA, RSI, MACD,
+Bollinger Bands, Stochastic and Ichimoku separately, each through a dozen intermediate
+pandas Series. Here every indicator is a node in a small dependency graph (NODES)
+over contiguous float64 arrays: MACD_Signal reads MACD, which reads two EMAs; every
+moving average reads one shared cumulative sum of closes; Stochastic and Ichimoku read
+rolling highs and lows (rolling_extrema.py). An IndicatorGraph evaluates nodes lazily
+and at most once, so a caller pays only for what it reads: one chart's columns, or
+with latest() just the last values, computed from the few trailing bars that decide
+them (for the EMAs, the bars whose weight still registers in float64). The exponential averages use a blocked closed form
+of the recurrence, so no step loops over individual bars in Python.
+
+Results match pandas (rolling(...).mean()/std(), ewm(span=...).mean() with its default
+adjust=True) to floating-point rounding, NaN warm-up periods included.
+
+Every kernel works along the last axis, so the same graph scores a whole universe:
+IndicatorPanel lays aligned Close/High/Low frames out as symbols x days arrays and
+computes each indicator for a block of symbols per vectorized operation, with no
+loop over symbols. Bars before a symbol's listing are NaN, and its own bars get
+exactly what its own, shorter series would; later NaNs are gaps, handled as pandas
+handles a missing close. Only panels read leading NaNs as listing dates (which
+changes RSI); one series keeps the pandas behaviour, where they are gaps too.
+
+Usage: python indicators.py [SYMBOL]   (prints the latest values from the market data provider)
+"""
+
+import math
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from rolling_extrema import rolling_max, rolling_min, widen_extremes
+
+SMA_WINDOWS = (9, 50, 200)
+RSI_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_WINDOW, BB_WIDTH = 20, 2
+STOCH_WINDOW, STOCH_SMOOTHING = 5, 3
+TENKAN_WINDOW, KIJUN_WINDOW, SENKOU_B_WINDOW, ICHIMOKU_SHIFT = 9, 26, 52, 26
+
+# Indicator field -> DataFrame column the apps use
+COLUMNS = {
+    'sma_9': 'SMA_9',
+    'sma_50': 'SMA_50',
+    'sma_200': 'SMA_200',
+    'rsi': 'RSI',
+    'macd': 'MACD',
+    'macd_signal': 'MACD_Signal',
+    'bb_middle': 'BB_Middle',
+    'bb_upper': 'BB_Upper',
+    'bb_lower': 'BB_Lower',
+    'tenkan_sen': 'Tenkan_sen',
+    'kijun_sen': 'Kijun_sen',
+    'senkou_span_a': 'Senkou_span_A',
+    'senkou_span_b': 'Senkou_span_B',
+    'chikou_span': 'Chikou_span',
+    'stoch_k': 'Stoch_K',
+    'stoch_d': 'Stoch_D',
+}
+
+EWM_BLOCK_EXPONENT = 300.0  # Largest e^x a block's rescaling factors reach
+SHORT_WINDOW = 8  # Rolling means up to this long add slices instead of differencing cumulative sums
+PANEL_BLOCK = 256  # Symbols an IndicatorPanel evaluates together
+
+
+def as_array(values):
+    """Contiguous float64 copy-free view where possible"""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _cumsum(values):
+    """Cumulative sums along the last axis with a leading 0, so a window's sum is one subtraction"""
+    csum = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    np.cumsum(values, axis=-1, out=csum[..., 1:])
+    return csum
+
+
+def prefix_sums(values):
+    """
+    (values, cumulative sums, cumulative NaN counts, base) for window_mean(), along the last axis
+    NaNs (gaps, or bars before a listing in a panel) sum as 0 and are counted instead;
+    the counts are None when there are none, the sums None when values hold an infinity
+    """
+    if values.shape[-1] == 0:
+        return values, None, None, 0.0
+    # Summing offsets from each series' first value keeps the running sums small
+    finite = np.isfinite(values)
+    if finite.all():
+        base = values[..., :1]
+        return values, _cumsum(values - base), None, base
+    if np.isinf(values).any():
+        return values, None, None, 0.0
+    missing = ~finite
+    base = np.take_along_axis(values, np.expand_dims(finite.argmax(axis=-1), -1), axis=-1)
+    base[np.isnan(base)] = 0.0  # A series with no values at all
+    offsets = values - base
+    offsets[missing] = 0.0
+    return values, _cumsum(offsets), _cumsum(missing), base
+
+
+def window_mean(sums, window):
+    """Rolling mean like pandas rolling(window).mean() along the last axis, from prefix_sums()"""
+    values, csum, counts, base = sums
+    n = values.shape[-1]
+    out = np.full(values.shape, np.nan)
+    if n >= window:
+        if csum is None:
+            out[..., window - 1:] = sliding_window_view(values, window, axis=-1).mean(axis=-1)
+        else:
+            out[..., window - 1:] = (csum[..., window:] - csum[..., :-window]) / window + base
+            if counts is not None:
+                out[..., window - 1:][counts[..., window:] > counts[..., :-window]] = np.nan  # Window holds a NaN
+    return out
+
+
+def rolling_means(values, windows):
+    """{window: rolling mean} like pandas rolling(window).mean(), from one cumulative sum"""
+    sums = prefix_sums(values)
+    return {window: window_mean(sums, window) for window in windows}
+
+
+def rolling_mean(values, window):
+    """Rolling mean of one window; short ones add shifted slices, which propagate NaNs by themselves"""
+    if window > SHORT_WINDOW:
+        return rolling_means(values, (window,))[window]
+    n = values.shape[-1]
+    out = np.full(values.shape, np.nan)
+    if n >= window:
+        total = values[..., window - 1:].copy()
+        for offset in range(window - 1):
+            total += values[..., offset:n - window + 1 + offset]
+        out[..., window - 1:] = total / window
+    return out
+
+
+def rolling_std(values, window, mean=None):
+    """
+    Sample standard deviation (ddof=1) over each window, like pandas rolling(window).std()
+    Two passes (deviations from each window's mean), one vector operation per window offset
+    """
+    n = values.shape[-1]
+    out = np.full(values.shape, np.nan)
+    if n < window or window < 2:
+        return out
+    if mean is None:
+        mean = rolling_mean(values, window)
+    mean = mean[..., window - 1:]
+    squares = np.zeros(mean.shape)
+    deviation = np.empty(mean.shape)
+    for offset in range(window):
+        np.subtract(values[..., offset:n - window + 1 + offset], mean, out=deviation)
+        np.multiply(deviation, deviation, out=deviation)
+        squares += deviation
+    out[..., window - 1:] = np.sqrt(squares / (window - 1))
+    return out
+
+
+def ewm_mean(values, span):
+    """
+    pandas ewm(span=span).mean() (adjust=True, ignore_na=False)
+    y_t = num_t / den_t with num_t = x_t + d*num_{t-1}, den_t = 1 + d*den_{t-1}, d = 1 - alpha;
+    each block solves the recurrence with one cumulative sum of d^-k scaled terms, along the last axis
+    """
+    decay = 1.0 - 2.0 / (span + 1.0)
+    n = values.shape[-1]
+    out = np.empty(values.shape)
+    if n == 0:
+        return out
+    block = max(1, int(EWM_BLOCK_EXPONENT / -math.log(decay)))
+    k = np.arange(min(block, n))
+    grow = decay ** -k        # d^-k
+    shrink = decay ** k       # d^k
+    valid = ~np.isnan(values)
+    terms = np.where(valid, values, 0.0)  # A NaN adds nothing but still ages the weights
+    weights = valid.astype(np.float64)
+    num = den = np.zeros(values.shape[:-1] + (1,))  # Per series, carried from block to block
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        m = stop - start
+        num_block = shrink[:m] * (decay * num + np.cumsum(terms[..., start:stop] * grow[:m], axis=-1))
+        den_block = shrink[:m] * (decay * den + np.cumsum(weights[..., start:stop] * grow[:m], axis=-1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[..., start:stop] = num_block / den_block
+        num, den = num_block[..., -1:], den_block[..., -1:]
+    return out
+
+
+def ewm_lookback(span):
+    """Bars after which older values' weight in ewm_mean(span) is below float64 resolution"""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    return int(math.ceil(math.log(np.finfo(np.float64).eps / 4) / math.log(decay)))
+
+
+def shift(values, periods):
+    """pandas shift() along the last axis: positive moves values later, negative earlier, NaN-filled"""
+    n = values.shape[-1]
+    out = np.full(values.shape, np.nan)
+    if periods >= 0:
+        if periods < n:
+            out[..., periods:] = values[..., :n - periods]
+    elif -periods < n:
+        out[..., :periods] = values[..., -periods:]
+    return out
+
+
+class Indicators:
+    """Every indicator the apps use, as float64 arrays aligned with the input bars"""
+
+    __slots__ = tuple(COLUMNS)
+
+    def __init__(self, **arrays):
+        for name in self.__slots__:
+            setattr(self, name, arrays[name])
+
+    def last(self, name):
+        return float(getattr(self, name)[-1])
+
+    def add_columns(self, hist):
+        """Copy of hist with one column per indicator (the names in COLUMNS), joined in one step"""
+        columns = pd.DataFrame({column: getattr(self, name) for name, column in COLUMNS.items()}, index=hist.index)
+        return pd.concat([hist.drop(columns=list(columns.columns), errors='ignore'), columns], axis=1)
+
+
+def _delta(close):
+    """close.diff() along the last axis: the first difference is NaN"""
+    delta = np.empty(close.shape)
+    if close.shape[-1]:
+        delta[..., 0] = np.nan
+        np.subtract(close[..., 1:], close[..., :-1], out=delta[..., 1:])
+    return delta
+
+
+def _listed(close):
+    """True from each series' first close on (a panel symbol's listing date)"""
+    return np.logical_or.accumulate(~np.isnan(close), axis=-1)
+
+
+def _rsi(gain, loss, listed):
+    avg_gain = rolling_mean(gain, RSI_WINDOW)
+    avg_loss = rolling_mean(loss, RSI_WINDOW)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    # With listing dates, windows reaching back before a series' first close have no RSI,
+    # as in that series alone (pandas counts those bars as zero gain and loss)
+    n = rsi.shape[-1]
+    if listed is not None and n >= RSI_WINDOW:
+        rsi[..., RSI_WINDOW - 1:][~listed[..., :n - RSI_WINDOW + 1]] = np.nan
+    return rsi
+
+
+def _stochastic_k(close, highest, lowest):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * ((close - lowest) / (highest - lowest))
+
+
+class Node:
+    """
+    One indicator in the graph: function(*values of inputs)
+    lookback is how many bars before its inputs' last one the node's last value reads
+    (window - 1 for a rolling window); None would mean every bar matters
+    """
+
+    __slots__ = ('inputs', 'function', 'lookback')
+
+    def __init__(self, inputs, function, lookback=0):
+        self.inputs = inputs
+        self.function = function
+        self.lookback = lookback
+
+
+INPUTS = ('close', 'high', 'low')
+
+NODES = {
+    'close_sums': Node(('close',), prefix_sums),
+    'sma_9': Node(('close_sums',), lambda sums: window_mean(sums, 9), 8),
+    'sma_50': Node(('close_sums',), lambda sums: window_mean(sums, 50), 49),
+    'sma_200': Node(('close_sums',), lambda sums: window_mean(sums, 200), 199),
+
+    # RSI: pandas' where() turns the first (NaN) difference into a zero gain and loss;
+    # listed marks the bars from a series' first close on, for graphs with listing dates
+    # (None otherwise; latest() hands its tail graph the full series' answer)
+    'delta': Node(('close',), _delta, 1),
+    'gain': Node(('delta',), lambda delta: np.where(delta > 0, delta, 0.0)),
+    'loss': Node(('delta',), lambda delta: np.where(delta < 0, -delta, 0.0)),
+    'listed': Node(('close',), _listed),
+    'rsi': Node(('gain', 'loss', 'listed'), _rsi, RSI_WINDOW - 1),
+
+    # Bars older than ewm_lookback() no longer change an EMA's value in float64
+    'ema_fast': Node(('close',), lambda close: ewm_mean(close, MACD_FAST), ewm_lookback(MACD_FAST)),
+    'ema_slow': Node(('close',), lambda close: ewm_mean(close, MACD_SLOW), ewm_lookback(MACD_SLOW)),
+    'macd': Node(('ema_fast', 'ema_slow'), np.subtract),
+    'macd_signal': Node(('macd',), lambda macd: ewm_mean(macd, MACD_SIGNAL), ewm_lookback(MACD_SIGNAL)),
+
+    'bb_middle': Node(('close_sums',), lambda sums: window_mean(sums, BB_WINDOW), BB_WINDOW - 1),
+    'bb_spread': Node(('close', 'bb_middle'), lambda close, mean: rolling_std(close, BB_WINDOW, mean) * BB_WIDTH,
+                      BB_WINDOW - 1),
+    'bb_upper': Node(('bb_middle', 'bb_spread'), np.add),
+    'bb_lower': Node(('bb_middle', 'bb_spread'), np.subtract),
+
+    'stoch_k': Node(('close', f'highest_{STOCH_WINDOW}', f'lowest_{STOCH_WINDOW}'), _stochastic_k),
+    'stoch_d': Node(('stoch_k',), lambda k: rolling_mean(k, STOCH_SMOOTHING), STOCH_SMOOTHING - 1),
+
+    'tenkan_sen': Node((f'highest_{TENKAN_WINDOW}', f'lowest_{TENKAN_WINDOW}'), lambda high, low: (high + low) / 2),
+    'kijun_sen': Node((f'highest_{KIJUN_WINDOW}', f'lowest_{KIJUN_WINDOW}'), lambda high, low: (high + low) / 2),
+    'senkou_span_a': Node(('tenkan_sen', 'kijun_sen'),
+                          lambda tenkan, kijun: shift((tenkan + kijun) / 2, ICHIMOKU_SHIFT), ICHIMOKU_SHIFT),
+    'senkou_span_b': Node((f'highest_{SENKOU_B_WINDOW}', f'lowest_{SENKOU_B_WINDOW}'),
+                          lambda high, low: shift((high + low) / 2, ICHIMOKU_SHIFT), ICHIMOKU_SHIFT),
+    'chikou_span': Node(('close',), lambda close: shift(close, -ICHIMOKU_SHIFT)),  # Last value is always NaN
+}
+# Each longer window's highs and lows widen the previous window's (rolling_extrema.widen_extremes)
+_previous = None
+for _window in sorted((STOCH_WINDOW, TENKAN_WINDOW, KIJUN_WINDOW, SENKOU_B_WINDOW)):
+    if _previous is None:
+        NODES[f'highest_{_window}'] = Node(('high',), lambda high, window=_window: rolling_max(high, window),
+                                           _window - 1)
+        NODES[f'lowest_{_window}'] = Node(('low',), lambda low, window=_window: rolling_min(low, window), _window - 1)
+    else:
+        NODES[f'highest_{_window}'] = Node(
+            (f'highest_{_previous}',),
+            lambda high, window=_previous, target=_window: widen_extremes(high, window, target, np.maximum),
+            _window - _previous)
+        NODES[f'lowest_{_window}'] = Node(
+            (f'lowest_{_previous}',),
+            lambda low, window=_previous, target=_window: widen_extremes(low, window, target, np.minimum),
+            _window - _previous)
+    _previous = _window
+del _window, _previous
+
+# Inputs of get_recommendation() and the GUI analysis, and what each chart plots
+RECOMMENDATION_FIELDS = ('rsi', 'sma_9', 'sma_50', 'sma_200', 'macd', 'macd_signal', 'stoch_k', 'stoch_d')
+CHART_FIELDS = {
+    'price': ('sma_9', 'sma_50', 'sma_200', 'bb_upper', 'bb_middle', 'bb_lower'),
+    'rsi': ('rsi',),
+    'macd': ('macd', 'macd_signal'),
+    'stochastic': ('stoch_k', 'stoch_d'),
+    'ichimoku': ('tenkan_sen', 'kijun_sen', 'senkou_span_a', 'senkou_span_b', 'chikou_span'),
+}
+
+
+def bars_needed(name):
+    """Trailing bars that fully determine name's last value (None: the whole series)"""
+    if name in INPUTS:
+        return 1
+    node = NODES[name]
+    if node.lookback is None:
+        return None
+    needed = [bars_needed(dependency) for dependency in node.inputs]
+    if None in needed:
+        return None
+    return node.lookback + max(needed)
+
+
+def _last(values):
+    """Last bar: a float for one series, an array for a panel"""
+    last = values[..., -1]
+    return float(last) if last.ndim == 0 else last
+
+
+class IndicatorGraph:
+    """
+    Lazily evaluated indicators for one series, or for a panel of aligned series with
+    bars along the last axis (symbols x days)
+    graph[name] computes name and whatever it depends on, each node at most once;
+    latest(names) is the cheap last-value-only mode. With listing_dates, leading NaN
+    closes are bars before a listing rather than gaps (see IndicatorPanel)
+    """
+
+    def __init__(self, close, high, low, listing_dates=False):
+        self.values = {'close': as_array(close), 'high': as_array(high), 'low': as_array(low)}
+        self.listing_dates = listing_dates
+        if not listing_dates:
+            self.values['listed'] = None
+        self.evaluated = []  # Nodes computed so far, in order
+        self._tail = None
+
+    def __len__(self):
+        return self.values['close'].shape[-1]
+
+    def __getitem__(self, name):
+        if name not in self.values:
+            if name not in NODES:
+                raise KeyError(f"Unknown indicator: {name!r} (use one of {', '.join(COLUMNS)})")
+            node = NODES[name]
+            self.values[name] = node.function(*(self[dependency] for dependency in node.inputs))
+            self.evaluated.append(name)
+        return self.values[name]
+
+    def latest(self, names=COLUMNS):
+        """
+        {name: last value}, evaluated over only the trailing bars that determine them
+        (names already computed over the whole series are read, not recomputed);
+        for a panel each value is an array with one entry per series
+        """
+        n = len(self)
+        if n == 0:
+            return {name: _last(np.full(self.values['close'].shape[:-1] + (1,), np.nan)) for name in names}
+        pending = [name for name in names if name not in self.values]
+        bars = 0
+        for name in pending:
+            needed = bars_needed(name)
+            bars = n if needed is None else max(bars, needed)
+        source = self
+        if pending and bars < n:
+            if self._tail is None or len(self._tail) < bars:
+                self._tail = IndicatorGraph(*(self.values[column][..., n - bars:] for column in INPUTS),
+                                            listing_dates=self.listing_dates)
+                if self.listing_dates:
+                    # The one thing the tail can't see: which series had closes before it starts
+                    before = (~np.isnan(self.values['close'][..., :n - bars])).any(axis=-1, keepdims=True)
+                    self._tail.values['listed'] = _listed(self._tail.values['close']) | before
+            source = self._tail
+        return {name: _last((self if name in self.values else source)[name]) for name in names}
+
+    def last(self, name):
+        return self.latest((name,))[name]
+
+    def indicators(self):
+        """Every indicator as an Indicators struct"""
+        return Indicators(**{name: self[name] for name in COLUMNS})
+
+    def add_columns(self, hist, names=COLUMNS):
+        """Copy of hist with a column for each of names (see COLUMNS), joined in one step"""
+        columns = pd.DataFrame({COLUMNS[name]: self[name] for name in names}, index=hist.index)
+        return pd.concat([hist.drop(columns=list(columns.columns), errors='ignore'), columns], axis=1)
+
+
+def compute(close, high, low):
+    """All indicators for aligned close/high/low arrays (NaN until each has enough bars)"""
+    return IndicatorGraph(close, high, low).indicators()
+
+
+def graph_for(hist):
+    """Lazy IndicatorGraph for an OHLC DataFrame (Close, High, Low columns)"""
+    return IndicatorGraph(hist['Close'].to_numpy(dtype=np.float64), hist['High'].to_numpy(dtype=np.float64),
+                          hist['Low'].to_numpy(dtype=np.float64))
+
+
+def from_history(hist):
+    """Indicators for an OHLC DataFrame (Close, High, Low columns)"""
+    return graph_for(hist).indicators()
+
+
+def add_indicator_columns(hist, names=COLUMNS):
+    """Copy of hist with indicator columns added: all of them, or only names (see CHART_FIELDS)"""
+    return graph_for(hist).add_columns(hist, names)
+
+
+class IndicatorPanel:
+    """
+    Indicators for many symbols at once, from dates x symbols Close/High/Low frames
+    (NaN where a symbol has no bar: before its listing, gaps, after a delisting)
+    Symbols are evaluated PANEL_BLOCK at a time, one IndicatorGraph per block, so the
+    intermediate arrays are recycled block to block instead of held for the whole panel
+    """
+
+    def __init__(self, close, high, low):
+        high = high.reindex(index=close.index, columns=close.columns)
+        low = low.reindex(index=close.index, columns=close.columns)
+        self.symbols = close.columns
+        self.dates = close.index
+        # symbols x days, so each symbol's bars are contiguous along the last axis
+        self.values = {column: as_array(frame.to_numpy(dtype=np.float64).T)
+                       for column, frame in zip(INPUTS, (close, high, low))}
+        self._computed = {}
+
+    @classmethod
+    def from_long(cls, panel):
+        """From a long (Symbol, Date, ...) panel such as bulk_history.to_panel()"""
+        wide = panel.pivot(index='Date', columns='Symbol', values=['Close', 'High', 'Low']).sort_index()
+        return cls(wide['Close'], wide['High'], wide['Low'])
+
+    def _graphs(self):
+        """(rows, IndicatorGraph) for each block of symbols"""
+        for start in range(0, len(self.symbols), PANEL_BLOCK):
+            rows = slice(start, start + PANEL_BLOCK)
+            yield rows, IndicatorGraph(*(self.values[column][rows] for column in INPUTS), listing_dates=True)
+
+    def arrays(self, names=COLUMNS):
+        """{name: symbols x days array}; each block computes all of names from one graph"""
+        for name in names:
+            if name not in NODES and name not in INPUTS:
+                raise KeyError(f"Unknown indicator: {name!r} (use one of {', '.join(COLUMNS)})")
+        pending = [name for name in names if name not in self._computed]
+        if pending:
+            arrays = {name: np.empty(self.values['close'].shape) for name in pending}
+            for rows, graph in self._graphs():
+                for name in pending:
+                    arrays[name][rows] = graph[name]
+            self._computed.update(arrays)
+        return {name: self._computed[name] for name in names}
+
+    def __getitem__(self, name):
+        """One indicator as a dates x symbols DataFrame"""
+        return pd.DataFrame(self.arrays((name,))[name].T, index=self.dates, columns=self.symbols)
+
+    def latest(self, names=COLUMNS):
+        """Symbols x indicator columns (see COLUMNS): each symbol's value on the last date"""
+        columns = {COLUMNS.get(name, name): np.empty(len(self.symbols)) for name in names}
+        for rows, graph in self._graphs():
+            for name, values in graph.latest(names).items():
+                columns[COLUMNS.get(name, name)][rows] = values
+        return pd.DataFrame(columns, index=self.symbols)
+
+
+def main():
+    from market_data import default_provider
+    symbol = sys.argv[1] if len(sys.argv) > 1 else 'AAPL'
+    hist = default_provider().fetch_history(symbol, '1y')
+    if hist.empty:
+        print(f"❌ No history for {symbol}")
+        return
+    latest = graph_for(hist).latest()
+    print(f"📈 {symbol} on {hist.index[-1].date()}")
+    for name, column in COLUMNS.items():
+        print(f"   {column:<14} {latest[name]:12.4f}")
+
+
+if __name__ == "__main__":
+    main()
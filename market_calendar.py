@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Market Calendar
+NYSE/NASDAQ sessions and holidays, and the freshness policy every cache layer shares.
+
+Daily bars and quotes can only change while their market is trading. FreshnessPolicy
+turns a TTL into a real expiry: an entry fetched during a session (or in the few minutes
+after the close while Yahoo settles the final bar) lives for the TTL but never past
+that settle time; an entry fetched while the market is closed stays fresh until the
+next session opens. So after the close, over weekends and on holidays nothing is
+refetched, while crypto pairs such as BTC-USD trade 24/7 and always use the plain TTL.
+
+Holidays are computed from the NYSE rules (observed-date shifting, Good Friday, the
+post-2022 Juneteenth holiday), plus the 1 p.m. early closes and one-off closures.
+
+Usage: python market_calendar.py [YEAR]   (prints that year's holidays and early closes)
+"""
+
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from datetime import time as clock
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from symbols import CRYPTO_BASES, CRYPTO_QUOTES, canonical_symbol
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = clock(9, 30)
+MARKET_CLOSE = clock(16, 0)
+EARLY_CLOSE = clock(13, 0)
+SETTLE_SECONDS = 20 * 60  # Yahoo keeps revising the day's bar for a while after the bell
+
+# One-off closures the rules can't predict (national days of mourning)
+SPECIAL_CLOSURES = {
+    date(2018, 12, 5),   # President George H. W. Bush
+    date(2025, 1, 9),    # President Jimmy Carter
+}
+
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous computus)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th weekday (Mon=0) of a month; n=-1 for the last one"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=64)
+def nyse_holidays(year):
+    """Full-day NYSE closures in a year"""
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),         # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),         # Washington's Birthday
+        _easter(year) - timedelta(days=2),   # Good Friday
+        _nth_weekday(year, 5, 0, -1),        # Memorial Day
+        _observed(date(year, 7, 4)),         # Independence Day
+        _nth_weekday(year, 9, 0, 1),         # Labor Day
+        _nth_weekday(year, 11, 3, 4),        # Thanksgiving
+        _observed(date(year, 12, 25)),       # Christmas
+    }
+    # New Year's Day on a Saturday isn't moved back into the old year
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    holidays.update(day for day in SPECIAL_CLOSURES if day.year == year)
+    return frozenset(holidays)
+
+
+@lru_cache(maxsize=64)
+def nyse_early_closes(year):
+    """1 p.m. closes: July 3, the day after Thanksgiving, Christmas Eve (when trading days)"""
+    candidates = [
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    ]
+    return frozenset(day for day in candidates if is_trading_day(day))
+
+
+def is_trading_day(day):
+    return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+
+def session(day):
+    """(open, close) as aware datetimes for a trading day, None otherwise"""
+    if not is_trading_day(day):
+        return None
+    close = EARLY_CLOSE if day in nyse_early_closes(day.year) else MARKET_CLOSE
+    return (datetime.combine(day, MARKET_OPEN, MARKET_TZ), datetime.combine(day, close, MARKET_TZ))
+
+
+def next_session(moment):
+    """The first session whose close is after moment (may be the one in progress)"""
+    day = moment.astimezone(MARKET_TZ).date()
+    for offset in range(0, 15):
+        hours = session(day + timedelta(days=offset))
+        if hours and hours[1] > moment:
+            return hours
+    raise ValueError(f"No NYSE session within two weeks of {moment}")
+
+
+def is_market_open(moment=None):
+    moment = moment or datetime.now(MARKET_TZ)
+    opens, closes = next_session(moment)
+    return opens <= moment < closes
+
+
+def trades_around_the_clock(symbol):
+    """Crypto pairs (BTC-USD, ETH-EUR, ...) have no sessions or holidays"""
+    base, _, quote = canonical_symbol(symbol).partition('-')
+    return base in CRYPTO_BASES and quote in CRYPTO_QUOTES
+
+
+class FreshnessPolicy:
+    """
+    Market-aware expiry for cached prices
+    expires_at(symbol, fetched_at, ttl) is when an entry fetched at fetched_at (epoch
+    seconds) can first have changed upstream; with market_hours=False it's a plain TTL
+    """
+
+    def __init__(self, market_hours=True, settle_seconds=SETTLE_SECONDS):
+        self.market_hours = market_hours
+        self.settle = timedelta(seconds=settle_seconds)
+
+    def expires_at(self, symbol, fetched_at, ttl):
+        if ttl <= 0:
+            return fetched_at  # A zero TTL means "always refetch", market open or not
+        if not self.market_hours or trades_around_the_clock(symbol):
+            return fetched_at + ttl
+
+        fetched = datetime.fromtimestamp(fetched_at, MARKET_TZ)
+        # A session "lasts" until its bar has settled
+        opens, closes = next_session(fetched - self.settle)
+        settled = closes + self.settle
+        if opens <= fetched < settled:
+            return min(fetched_at + ttl, settled.timestamp())
+        return opens.timestamp()  # Closed: nothing changes before the next open
+
+    def is_fresh(self, symbol, fetched_at, ttl, now=None):
+        now = now if now is not None else time.time()
+        return now < self.expires_at(symbol, fetched_at, ttl)
+
+    def cache_key(self, symbol, ttl, now=None):
+        """
+        Bucket id for TTL-less caches such as st.cache_data: it changes exactly when
+        data fetched now would expire, so every entry in a bucket is equally fresh
+        """
+        now = now if now is not None else time.time()
+        bucket_start = now - now % ttl if ttl > 0 else now
+        return int(self.expires_at(symbol, bucket_start, ttl))
+
+
+_shared_policy = None
+_policy_lock = threading.Lock()
+
+
+def freshness_policy():
+    """Process-wide policy every cache layer uses"""
+    global _shared_policy
+    with _policy_lock:
+        if _shared_policy is None:
+            _shared_policy = FreshnessPolicy()
+        return _shared_policy
+
+
+def main():
+    year = int(sys.argv[1]) if len(sys.argv) > 1 else date.today().year
+    print(f"📅 NYSE {year}")
+    for day in sorted(nyse_holidays(year)):
+        print(f"   closed       {day:%a %Y-%m-%d}")
+    for day in sorted(nyse_early_closes(year)):
+        print(f"   closes 1 pm  {day:%a %Y-%m-%d}")
+    state = "open" if is_market_open() else "closed"
+    print(f"🕒 Market is {state} now; next session {next_session(datetime.now(MARKET_TZ))[0]:%a %Y-%m-%d %H:%M %Z}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Market Data Provider
+One place the apps get quotes, fundamentals and price history from.
+
+A MarketDataProvider fetches info dicts and daily history for a symbol. Front ends
+don't call it directly per dataset; they open an AnalysisContext for the symbol
+they're analysing, which memoizes the info dict and the longest history asked for
+and hands shorter periods out as slices of it. A GUI analysis (1y) followed by its
+charts (6mo) and intrinsic value (info again) then costs one info call and one
+history call instead of three or four.
+
+YahooProvider is the yfinance implementation. It consults the shared negative cache,
+so symbols Yahoo recently had no data for are answered without a request. It keeps
+daily history in the on-disk HistoryStore, so a warm symbol costs at most a delta, and
+info in the FundamentalsCache, so a re-analysis refetches only expired field groups.
+Its requests go through the shared, rate-limited session from http_pool.py and a
+CircuitBreaker: while Yahoo keeps failing, calls fail fast and the provider serves the
+last stored info and history instead, marked degraded (AnalysisContext.degraded).
+The session behind the breaker retries once with a short timeout, so an outage opens
+the breaker within seconds rather than after each call's full retry schedule.
+fetch_histories() serves many symbols at once, downloading the ones the store can't
+answer in chunks (see bulk_history.py); each chunk is one breaker-guarded call.
+"""
+
+import threading
+
+import pandas as pd
+
+from bulk_history import BulkHistoryDownloader, not_found, raise_yfinance_errors, symbol_missing, yahoo_download
+from circuit_breaker import CircuitBreaker
+from fundamentals_cache import FundamentalsCache, quote_from_fast_info
+from history_store import HistoryStore, degraded_history, longest_period, slice_period
+from http_pool import yahoo_session
+from negative_cache import shared_negative_cache
+from symbols import canonical_symbol
+
+DEFAULT_PERIOD = '1y'
+BREAKER_RETRIES = 1          # Per breaker-guarded call; the breaker decides when Yahoo is down
+BREAKER_TIMEOUT_SECONDS = 6
+
+
+class DegradedInfo(dict):
+    """An info dict served from cache because the upstream failed; as_of is when it was fetched"""
+
+    degraded = True
+
+    def __init__(self, info, as_of=None):
+        super().__init__(info)
+        self.as_of = as_of
+
+
+def is_degraded(data):
+    """True for info dicts and histories served from cache because the upstream failed"""
+    if isinstance(data, pd.DataFrame):
+        return bool(data.attrs.get('degraded'))
+    return bool(getattr(data, 'degraded', False))
+
+
+def degraded_as_of(data):
+    if isinstance(data, pd.DataFrame):
+        return data.attrs.get('as_of')
+    return getattr(data, 'as_of', None)
+
+
+class MarketDataProvider:
+    """
+    Source of info dicts and daily OHLCV history
+    Subclasses implement fetch_info() and fetch_history(); callers use analysis()
+    """
+
+    name = "base"
+    breaker = None  # CircuitBreaker guarding the upstream, for status displays
+
+    def fetch_info(self, symbol):
+        raise NotImplementedError
+
+    def fetch_history(self, symbol, period=DEFAULT_PERIOD):
+        raise NotImplementedError
+
+    def fetch_histories(self, symbols, period=DEFAULT_PERIOD):
+        """{symbol: history} for the symbols that have data; providers may batch this"""
+        histories = {}
+        for symbol in symbols:
+            hist = self.fetch_history(symbol, period)
+            if not hist.empty:
+                histories[symbol] = hist
+        return histories
+
+    def analysis(self, symbol, periods=()):
+        """A per-analysis context; periods lists every history length the analysis will read"""
+        return AnalysisContext(self, symbol, periods)
+
+
+class YahooProvider(MarketDataProvider):
+    """
+    yfinance-backed provider that skips symbols in the negative cache and falls back to
+    stored data when Yahoo fails
+    """
+
+    name = "yahoo"
+
+    def __init__(self, negative_cache=None, history_store=None, fundamentals=None, session=None, breaker=None):
+        self.negative_cache = negative_cache or shared_negative_cache()
+        self.session = session
+        self.breaker = breaker or CircuitBreaker("Yahoo Finance")
+        self.history_store = history_store or HistoryStore()
+        self.fundamentals = fundamentals or FundamentalsCache()
+        self.info_requests = 0
+        self.quote_requests = 0
+        self.history_requests = 0
+        raise_yfinance_errors()
+
+    def _session(self):
+        return self.session or yahoo_session(retries=BREAKER_RETRIES, timeout=BREAKER_TIMEOUT_SECONDS)
+
+    def _ticker(self, symbol):
+        import yfinance as yf
+        return yf.Ticker(symbol, session=self._session())
+
+    def fetch_info(self, symbol):
+        if self.negative_cache.is_known_bad(symbol):
+            return {}
+        try:
+            return self.fundamentals.info(symbol, self._download_info, self._download_quote)
+        except Exception:
+            info, fetched_at = self.fundamentals.cached(symbol)
+            if not info:
+                raise
+            return DegradedInfo(info, fetched_at)
+
+    def _download_info(self, symbol):
+        def request():
+            self.info_requests += 1
+            try:
+                return dict(self._ticker(symbol).info or {})
+            except Exception as error:
+                if not_found(error):
+                    return {}
+                raise
+        return self.breaker.call(request)
+
+    def _download_quote(self, symbol):
+        def request():
+            self.quote_requests += 1
+            return quote_from_fast_info(self._ticker(symbol).fast_info)
+        return self.breaker.call(request)
+
+    def fetch_history(self, symbol, period=DEFAULT_PERIOD):
+        if self.negative_cache.is_known_bad(symbol):
+            return pd.DataFrame()
+        try:
+            hist = self.history_store.history(symbol, period, self._download_history)
+        except Exception:
+            stored = self.history_store.load(symbol)
+            if stored is None or stored.empty:
+                raise
+            return degraded_history(slice_period(stored, period), self.history_store.refreshed_at(symbol))
+        if hist.empty:
+            self.negative_cache.record_failure(symbol, f"empty {period} history")
+        return hist
+
+    def fetch_histories(self, symbols, period=DEFAULT_PERIOD):
+        """Stored histories where fresh, the rest downloaded concurrently in chunks"""
+        downloader = BulkHistoryDownloader(self._download_histories, store=self.history_store,
+                                           negative_cache=self.negative_cache)
+        return downloader.histories(symbols, period)
+
+    def _download_histories(self, symbols, period):
+        def request():
+            self.history_requests += 1
+            return yahoo_download(symbols, period, self._session())
+        return self.breaker.call(request)
+
+    def _download_history(self, symbol, period=None, start=None):
+        def request():
+            self.history_requests += 1
+            # yfinance raises on failures (raise_yfinance_errors) so the breaker sees them;
+            # a symbol without data is still just empty
+            try:
+                if start is not None:
+                    return self._ticker(symbol).history(start=start)
+                return self._ticker(symbol).history(period=period)
+            except Exception as error:
+                if symbol_missing(error):
+                    return pd.DataFrame()
+                raise
+        return self.breaker.call(request)
+
+
+class AnalysisContext:
+    """
+    Memoized data for analysing one symbol
+    info is fetched once; history(period) fetches the longest period requested so far
+    and answers shorter periods by slicing it
+    """
+
+    def __init__(self, provider, symbol, periods=()):
+        self.provider = provider
+        self.symbol = canonical_symbol(symbol)
+        self._periods = set(periods)
+        self._info = None
+        self._history = None
+        self._history_period = None
+        self._lock = threading.Lock()  # The GUI analyses on a worker thread and charts on the main one
+
+    @property
+    def degraded(self):
+        """True when some of this analysis was served from cache because the upstream failed"""
+        return is_degraded(self._info) or is_degraded(self._history)
+
+    @property
+    def degraded_as_of(self):
+        """Fetch time (epoch) of the oldest degraded part, None when nothing is degraded"""
+        times = [degraded_as_of(data) for data in (self._info, self._history) if is_degraded(data)]
+        times = [moment for moment in times if moment is not None]
+        return min(times) if times else None
+
+    @property
+    def info(self):
+        with self._lock:
+            if self._info is None:
+                self._info = self.provider.fetch_info(self.symbol)
+            return self._info
+
+    def _covers(self, period):
+        if self._history_period is None:
+            return False
+        return longest_period([self._history_period, period]) == self._history_period
+
+    def history(self, period=DEFAULT_PERIOD):
+        """Daily bars for period; a fresh DataFrame the caller may modify"""
+        with self._lock:
+            if not self._covers(period):
+                fetch_period = longest_period(self._periods | {period})
+                self._history = self.provider.fetch_history(self.symbol, fetch_period)
+                self._history_period = fetch_period
+            if period == self._history_period:
+                return self._history.copy()
+            return slice_period(self._history, period)
+
+
+_default_provider = None
+_provider_lock = threading.Lock()
+
+
+def default_provider():
+    """
+    Process-wide provider the apps share: YahooProvider, or recorded fixtures when
+    STOCKAI_MARKET_DATA=record|replay (see market_fixtures.py)
+    """
+    global _default_provider
+    with _provider_lock:
+        if _default_provider is None:
+            from market_fixtures import provider_from_environment
+            _default_provider = provider_from_environment()
+        return _default_provider
+
+
+def set_default_provider(provider):
+    """Swap the process-wide provider (tests, benchmarks); returns the previous one"""
+    global _default_provider
+    with _provider_lock:
+        previous, _default_provider = _default_provider, provider
+        return previous
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Market Data Fixtures
+Record Yahoo responses once, then replay them with no network access.
+
+RecordingProvider wraps a live provider and writes every info dict and history it
+returns into a FixtureStore. ReplayProvider answers from that store only, after an
+optional artificial delay, so tests, benchmarks and both apps run offline and give
+the same numbers on every run. Replayed periods are measured back from the last
+recorded bar, not from today, so a fixture set stays usable after it was recorded.
+
+The store is compact: <dir>/info/<SYMBOL>.json and <dir>/history/<SYMBOL>.parquet
+(the HistoryStore format; longer recordings of a symbol are merged into one file).
+
+Select a provider for the whole process through the environment:
+
+  STOCKAI_MARKET_DATA=yahoo|record|replay   (default: yahoo)
+  STOCKAI_FIXTURES_DIR=<dir>                 (default: fixtures/ next to this file)
+  STOCKAI_REPLAY_LATENCY_MS=<ms>             (default: 0)
+
+Usage: python market_fixtures.py record SYMBOL ... [--period 2y]   (needs network)
+       python market_fixtures.py [list]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from fundamentals_cache import _json_safe
+from history_store import HistoryStore, period_start
+from market_data import DEFAULT_PERIOD, MarketDataProvider, YahooProvider
+from negative_cache import write_json_atomic
+from symbols import canonical_symbol
+
+MARKET_DATA_VARIABLE = "STOCKAI_MARKET_DATA"
+FIXTURES_DIR_VARIABLE = "STOCKAI_FIXTURES_DIR"
+LATENCY_VARIABLE = "STOCKAI_REPLAY_LATENCY_MS"
+RECORD_PERIOD = '2y'  # Enough for a 1y analysis plus its 200-day averages
+
+
+def fixtures_dir():
+    directory = os.environ.get(FIXTURES_DIR_VARIABLE)
+    if not directory:
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+    return directory
+
+
+class FixtureStore:
+    """Recorded info dicts and daily histories, one file per symbol and kind"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or fixtures_dir()
+        self.histories = HistoryStore(os.path.join(self.directory, "history"))
+        self._lock = threading.Lock()
+
+    def info_path(self, symbol):
+        return os.path.join(self.directory, "info", canonical_symbol(symbol) + ".json")
+
+    def save_info(self, symbol, info):
+        entry = {'recorded_at': time.time(),
+                 'info': {field: _json_safe(value) for field, value in info.items()}}
+        with self._lock:
+            write_json_atomic(self.info_path(symbol), entry)
+
+    def load_info(self, symbol):
+        """Recorded info dict, None when the symbol wasn't recorded"""
+        try:
+            with open(self.info_path(symbol), 'r', encoding='utf-8') as file:
+                return json.load(file).get('info')
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def save_history(self, symbol, hist, period):
+        if hist.empty:
+            return
+        with self._lock:
+            self.histories.put(canonical_symbol(symbol), hist, period)
+
+    def load_history(self, symbol):
+        """Every recorded bar for the symbol, None when it wasn't recorded"""
+        return self.histories.load(canonical_symbol(symbol))
+
+    def symbols(self):
+        try:
+            infos = {os.path.splitext(name)[0] for name in os.listdir(os.path.join(self.directory, "info"))
+                     if name.endswith('.json')}
+        except OSError:
+            infos = set()
+        return sorted(infos | set(self.histories.symbols()))
+
+
+def replay_period(hist, period):
+    """The bars a fetch of period would have returned on the day the last one was recorded"""
+    start = period_start(period, hist.index[-1]) if not hist.empty else None
+    if start is None:
+        return hist.copy()
+    return hist.loc[hist.index >= start.normalize()].copy()
+
+
+class RecordingProvider(MarketDataProvider):
+    """Passes calls through to a live provider and records what it returns"""
+
+    name = "record"
+
+    def __init__(self, upstream=None, store=None):
+        self.upstream = upstream or YahooProvider()
+        self.store = store or FixtureStore()
+        self.breaker = getattr(self.upstream, 'breaker', None)
+
+    def fetch_info(self, symbol):
+        info = self.upstream.fetch_info(symbol)
+        if info and not getattr(info, 'degraded', False):
+            self.store.save_info(symbol, info)
+        return info
+
+    def fetch_history(self, symbol, period=DEFAULT_PERIOD):
+        hist = self.upstream.fetch_history(symbol, period)
+        if not hist.attrs.get('degraded'):
+            self.store.save_history(symbol, hist, period)
+        return hist
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Answers from a FixtureStore only; symbols that weren't recorded come back empty,
+    like symbols Yahoo has no data for, and are counted in misses
+    """
+
+    name = "replay"
+
+    def __init__(self, store=None, latency_ms=0.0):
+        self.store = store or FixtureStore()
+        self.latency = latency_ms / 1000
+        self.info_requests = 0
+        self.history_requests = 0
+        self.misses = 0
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def fetch_info(self, symbol):
+        self.info_requests += 1
+        self._wait()
+        info = self.store.load_info(symbol)
+        if info is None:
+            self.misses += 1
+            return {}
+        return info
+
+    def fetch_history(self, symbol, period=DEFAULT_PERIOD):
+        self.history_requests += 1
+        self._wait()
+        hist = self.store.load_history(symbol)
+        if hist is None:
+            self.misses += 1
+            return pd.DataFrame()
+        hist = replay_period(hist, period)
+        hist.attrs = {}
+        return hist
+
+
+def provider_from_environment():
+    """The provider STOCKAI_MARKET_DATA selects: live Yahoo, recording, or replay"""
+    mode = os.environ.get(MARKET_DATA_VARIABLE, "").strip().lower() or "yahoo"
+    if mode == "yahoo":
+        return YahooProvider()
+    if mode == "record":
+        return RecordingProvider(YahooProvider(), FixtureStore())
+    if mode == "replay":
+        return ReplayProvider(FixtureStore(), float(os.environ.get(LATENCY_VARIABLE) or 0))
+    raise ValueError(f"{MARKET_DATA_VARIABLE} must be yahoo, record or replay (got {mode!r})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('command', nargs='?', default='list', choices=['list', 'record'])
+    parser.add_argument('symbols', nargs='*')
+    parser.add_argument('--period', default=RECORD_PERIOD, help=f'history to record (default: {RECORD_PERIOD})')
+    args = parser.parse_args()
+
+    store = FixtureStore()
+    if args.command == 'record':
+        recorder = RecordingProvider(YahooProvider(), store)
+        for symbol in map(canonical_symbol, args.symbols):
+            hist = recorder.fetch_history(symbol, args.period)
+            info = recorder.fetch_info(symbol)
+            status = "✅" if not hist.empty and info else "⚠️"
+            print(f"{status} {symbol:<10} {len(hist):>5} bars, {len(info):>3} info fields")
+
+    symbols = store.symbols()
+    print(f"📼 {len(symbols)} symbols recorded in {store.directory}")
+    for symbol in symbols:
+        hist = store.load_history(symbol)
+        bars = f"{len(hist):>5} bars {hist.index[0].date()} -> {hist.index[-1].date()}" if hist is not None else "no history"
+        info = "info" if store.load_info(symbol) is not None else "no info"
+        print(f"   {symbol:<10} {bars}  {info}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Negative Ticker Cache
+Remembers symbols Yahoo has no data for, so known-bad tickers short-circuit instantly.
+
+An invalid or delisted symbol costs a full round trip (often several, since yfinance
+tries more than one endpoint) only to come back with an empty history. The Streamlit
+app, the GUI and the fetch scripts all record those failures here, in one JSON file
+under the shared cache folder, and skip the symbol until its entry expires. Every
+skipped fetch is counted in avoided_requests.
+
+The cache folder is .cache/ next to this file; set STOCKAI_CACHE_DIR to move it.
+
+Usage: python negative_cache.py [--clear]   (lists, or clears, the known-bad symbols)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from symbols import canonical_symbol
+
+CACHE_DIR_VARIABLE = "STOCKAI_CACHE_DIR"
+NEGATIVE_CACHE_FILE = "negative_tickers.json"
+NEGATIVE_TTL_SECONDS = 24 * 60 * 60  # Delistings don't come back; typos don't either
+
+
+def cache_dir():
+    """Shared on-disk cache folder for every cache layer"""
+    directory = os.environ.get(CACHE_DIR_VARIABLE)
+    if not directory:
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+    return directory
+
+
+def write_json_atomic(path, data):
+    """Write JSON through a temp file and os.replace, so readers never see half a file"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=1, sort_keys=True)
+        os.chmod(temp_path, 0o644)  # mkstemp creates 0600
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class NegativeCache:
+    """
+    symbol -> {'expires': epoch seconds, 'reason': text} for symbols with no data
+    The file is re-read whenever another process has changed it, so one app's
+    failure is every app's cache hit
+    """
+
+    def __init__(self, path=None, ttl=NEGATIVE_TTL_SECONDS):
+        self.path = path or os.path.join(cache_dir(), NEGATIVE_CACHE_FILE)
+        self.ttl = ttl
+        self.avoided_requests = 0
+        self._entries = {}
+        self._file_stamp = None
+        self._lock = threading.Lock()
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _refresh(self):
+        """Reload the file if it changed since we last read it (caller holds the lock)"""
+        stamp = self._stamp()
+        if stamp == self._file_stamp:
+            return
+        entries = {}
+        if stamp is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                entries = {symbol: entry for symbol, entry in data.items()
+                           if isinstance(entry, dict) and 'expires' in entry}
+            except (OSError, ValueError, AttributeError):
+                entries = {}  # Unreadable cache: start over rather than fail a fetch
+        self._entries = entries
+        self._file_stamp = stamp
+
+    def _save(self, now):
+        """Drop expired entries and write the file (caller holds the lock)"""
+        self._entries = {symbol: entry for symbol, entry in self._entries.items()
+                         if entry['expires'] > now}
+        try:
+            write_json_atomic(self.path, self._entries)
+        except OSError:
+            return  # A read-only install still caches in memory
+        self._file_stamp = self._stamp()
+
+    def get(self, symbol):
+        """The live entry for a symbol, or None (doesn't count as an avoided request)"""
+        symbol = canonical_symbol(symbol)
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(symbol)
+            if entry and entry['expires'] > time.time():
+                return dict(entry)
+        return None
+
+    def is_known_bad(self, symbol):
+        """True when symbol recently had no data; each True is one request avoided"""
+        if self.get(symbol) is None:
+            return False
+        with self._lock:
+            self.avoided_requests += 1
+        return True
+
+    def record_failure(self, symbol, reason="no data", ttl=None):
+        """Remember that symbol had no data for ttl seconds (default: the cache TTL)"""
+        symbol = canonical_symbol(symbol)
+        if not symbol:
+            return
+        now = time.time()
+        with self._lock:
+            self._refresh()
+            self._entries[symbol] = {
+                'expires': round(now + (self.ttl if ttl is None else ttl), 3),
+                'reason': str(reason),
+            }
+            self._save(now)
+
+    def forget(self, symbol):
+        """Drop a symbol, e.g. after it fetched fine from another path"""
+        symbol = canonical_symbol(symbol)
+        with self._lock:
+            self._refresh()
+            if self._entries.pop(symbol, None) is not None:
+                self._save(time.time())
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._save(time.time())
+
+    def known_bad(self):
+        """Live symbol -> entry map"""
+        now = time.time()
+        with self._lock:
+            self._refresh()
+            return {symbol: dict(entry) for symbol, entry in self._entries.items()
+                    if entry['expires'] > now}
+
+    def stats(self):
+        return {'known_bad': len(self.known_bad()), 'avoided_requests': self.avoided_requests}
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_negative_cache():
+    """Process-wide NegativeCache on the default file"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = NegativeCache()
+        return _shared_cache
+
+
+def main():
+    cache = shared_negative_cache()
+    if '--clear' in sys.argv[1:]:
+        cache.clear()
+        print(f"🧹 Cleared {cache.path}")
+        return
+
+    entries = cache.known_bad()
+    print(f"🚫 {len(entries)} known-bad symbols in {cache.path}")
+    now = time.time()
+    for symbol in sorted(entries):
+        hours = (entries[symbol]['expires'] - now) / 3600
+        print(f"   {symbol:<12} {entries[symbol]['reason']} (expires in {hours:.1f}h)")
+
+
+if __name__ == "__main__":
+    main()
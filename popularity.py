@@ -0,0 +1,88 @@
+"""
+Stock Popularity
+Static popularity scores for search ranking, stored next to stock_data.csv.
+
+The ticker fetch scripts record each symbol's market cap while they already have it
+in hand, and save a log10(market cap) score per ticker to stock_popularity.csv.
+Search uses the score to rank matches inside each tier, so "A" puts AAPL ahead of
+obscure A-tickers. Symbols without a known market cap score 0.
+"""
+
+import csv
+import math
+import os
+import re
+
+from symbols import canonical_symbol
+
+POPULARITY_FILE = "stock_popularity.csv"
+
+_SUFFIXES = {'K': 1e3, 'M': 1e6, 'B': 1e9, 'T': 1e12}
+_NUMBER_PATTERN = re.compile(r'^\$?([0-9][0-9,]*(?:\.[0-9]+)?)\s*([KMBT]?)$', re.IGNORECASE)
+
+
+def popularity_path_for(csv_path):
+    """stock_data.csv -> stock_popularity.csv in the same folder"""
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), POPULARITY_FILE)
+
+
+def parse_market_cap(value):
+    """
+    Market cap in USD from yfinance numbers or screener strings
+    ("2,345,678,000", "$1.2B"); None when missing or unparseable
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) and value > 0 else None
+
+    match = _NUMBER_PATTERN.match(str(value).strip())
+    if not match:
+        return None
+    number = float(match.group(1).replace(',', ''))
+    number *= _SUFFIXES.get(match.group(2).upper(), 1)
+    return number if number > 0 else None
+
+
+def market_cap_score(market_cap):
+    """Popularity score for a market cap: log10 dollars, 0 when unknown"""
+    market_cap = parse_market_cap(market_cap)
+    if not market_cap or market_cap < 1:
+        return 0.0
+    return round(math.log10(market_cap), 4)
+
+
+def load_popularity(path):
+    """ticker -> score from a popularity file ({} when there is none)"""
+    scores = {}
+    try:
+        with open(path, 'r', newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                try:
+                    scores[row['ticker'].upper().strip()] = float(row['score'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+    except FileNotFoundError:
+        pass
+    return scores
+
+
+def save_popularity(market_caps, path=POPULARITY_FILE):
+    """
+    Merge ticker -> market cap into the popularity file and write it sorted by ticker
+    Tickers this run didn't see keep their previous score
+    """
+    scores = load_popularity(path)
+    for ticker, market_cap in market_caps.items():
+        score = market_cap_score(market_cap)
+        if score:
+            scores[canonical_symbol(ticker)] = score
+
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['ticker', 'score'])
+        for ticker in sorted(scores):
+            writer.writerow([ticker, scores[ticker]])
+
+    print(f"⭐ Saved popularity scores for {len(scores)} tickers to {path}")
+    return scores
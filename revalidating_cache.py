@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Revalidating Cache
+Stale-while-revalidate: serve the last good value at once, refresh it in the background.
+
+A plain TTL cache makes the first caller after expiry wait through a full upstream round
+trip. RevalidatingCache instead answers an expired key from the value it already has,
+labelled with its age, and starts one background refresh. Only when a value is more than
+max_stale seconds past its expiry (or there is none) does get() block on the fetch, so
+page latency for popular tickers no longer follows upstream latency.
+
+Expiry comes from the shared FreshnessPolicy (see market_calendar.py), so a Friday
+close stays fresh all weekend and nothing is revalidated until the market reopens.
+
+Entries are bounded like the st.cache_data path they replace: at most max_entries keys,
+least recently read evicted first. Values too stale to serve are dropped when they are
+read, and on insert from the least recently read end, where the oldest ones collect;
+neither scans the whole cache under the lock.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from market_calendar import freshness_policy
+from single_flight import SingleFlight
+
+
+class CachedValue:
+    """A value with its fetch time; stale means it was served past expiry"""
+
+    __slots__ = ('value', 'fetched_at', 'stale')
+
+    def __init__(self, value, fetched_at, stale=False):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.stale = stale
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+def format_age(seconds):
+    """'45s', '12 min', '3.5 h', '2.0 days'"""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.1f} days"
+
+
+class RevalidatingCache:
+    """
+    key -> last good fetch(key), served stale for up to max_stale seconds past expiry
+    while a background thread refreshes it; keys are symbols for the freshness policy
+    cacheable(value) decides what counts as good (default: anything but None);
+    at most max_entries keys are kept, least recently read evicted first
+    """
+
+    def __init__(self, fetch, ttl, max_stale, policy=None, flights=None, cacheable=None, max_entries=512):
+        self.fetch = fetch
+        self.cacheable = cacheable or (lambda value: value is not None)
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.policy = policy or freshness_policy()
+        self.flights = flights or SingleFlight()
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.blocking_fetches = 0
+        self.background_refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+        self.last_error = None
+
+    def _too_stale(self, key, entry, now):
+        return now - self.policy.expires_at(key, entry.fetched_at, self.ttl) >= self.max_stale
+
+    def _evict(self, now):
+        """Drop too-stale entries from the least recently read end, then any past max_entries (lock held)"""
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if not self._too_stale(key, entry, now):
+                break
+            del self._entries[key]
+            self.evictions += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _fetch_and_store(self, key):
+        """fetch(key) through the single flight; a cacheable result replaces the entry"""
+        fetched_at = time.time()
+        value = self.flights.do(key, self.fetch, key)
+        if self.cacheable(value):
+            with self._lock:
+                current = self._entries.get(key)
+                if current is None or current.fetched_at <= fetched_at:
+                    self._entries[key] = CachedValue(value, fetched_at)
+                    self._entries.move_to_end(key)
+                self._evict(time.time())
+        return CachedValue(value, fetched_at)
+
+    def _refresh_in_background(self, key):
+        try:
+            self._fetch_and_store(key)
+            self.background_refreshes += 1
+        except Exception as error:
+            self.refresh_errors += 1  # Keep serving the stale value; the next get() retries
+            self.last_error = error
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key):
+        """CachedValue for key; its value is None when the fetch found nothing"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._too_stale(key, entry, now):
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            elif entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            expires_at = self.policy.expires_at(key, entry.fetched_at, self.ttl)
+            if now < expires_at:
+                self.fresh_hits += 1
+                return entry
+            if now - expires_at < self.max_stale:
+                self.stale_hits += 1
+                with self._lock:
+                    start = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start:
+                    threading.Thread(target=self._refresh_in_background, args=(key,), daemon=True).start()
+                return CachedValue(entry.value, entry.fetched_at, stale=True)
+
+        # Nothing cached, or too stale to show: wait for the upstream
+        self.blocking_fetches += 1
+        return self._fetch_and_store(key)
+
+    def refreshing(self, key):
+        with self._lock:
+            return key in self._refreshing
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
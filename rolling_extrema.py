@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Rolling Extrema
+Rolling max/min kernel for the Ichimoku and Stochastic windows, every window in one call.
+
+Each window's extreme is the extreme of two overlapping power-of-two spans, the same
+split van Herk/Gil-Werman use with blocks. The spans come from a doubling ladder
+(level[i] = extreme of values[i:i + span] for span = 1, 2, 4, ...) that is built
+once and climbed in window order. That is log2(largest window) whole-array NumPy
+operations plus one per window. A true van Herk/Gil-Werman pass or a monotonic deque
+needs a sequential scan per element, which NumPy can only run as short strided
+loops. Measured here, that was 3-10x slower (see bench_rolling_extrema.py); the
+deque lives on in streaming_indicators, where bars do arrive one at a time.
+
+Values may be 1-D (one series) or N-D with bars along the last axis (a symbols x
+days panel), so a universe scan is a handful of array operations however many
+symbols it covers. Windows holding a NaN give NaN, like pandas rolling(N).max().
+
+widen_extremes() reuses a window's result for a longer one: the extreme over 52 bars
+is the extreme of two 26-bar extremes, 26 bars apart. The indicator graph chains the
+Ichimoku/Stochastic windows that way (5 -> 9 -> 26 -> 52), one or two operations each.
+"""
+
+import numpy as np
+
+ICHIMOKU_STOCHASTIC_WINDOWS = (5, 9, 26, 52)
+
+
+def rolling_extremes(values, windows, reduce):
+    """
+    {window: rolling max (reduce=np.maximum) or min (np.minimum)} along the last axis
+    NaN for the first window - 1 bars, like pandas rolling(window).max()/min()
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    results = {}
+    level, span = values, 1
+    for window in sorted(set(windows)):
+        if window < 1:
+            raise ValueError(f"window must be at least 1 (got {window})")
+        out = np.full(values.shape, np.nan)
+        if n >= window:
+            while span * 2 <= window:
+                # Only the current level is kept: windows come in ascending order
+                level = reduce(level[..., :level.shape[-1] - span], level[..., span:])
+                span *= 2
+            out[..., window - 1:] = reduce(level[..., :n - window + 1], level[..., window - span:])
+        results[window] = out
+    return results
+
+
+def widen_extremes(extremes, window, target, reduce):
+    """
+    Rolling extreme over target bars from the rolling extreme over window bars (as
+    rolling_extremes() returns it), combining copies shifted by up to window bars
+    """
+    if not 1 <= window <= target:
+        raise ValueError(f"can only widen a window of at least 1 bar to a longer one (got {window} -> {target})")
+    n = extremes.shape[-1]
+    out = np.full(extremes.shape, np.nan)
+    if n >= target:
+        result = extremes[..., target - 1:]
+        offset = 0
+        while offset + window < target:
+            offset = min(offset + window, target - window)
+            result = reduce(result, extremes[..., target - 1 - offset:n - offset])
+        out[..., target - 1:] = result
+    return out
+
+
+def rolling_max(values, window):
+    return rolling_extremes(values, (window,), np.maximum)[window]
+
+
+def rolling_min(values, window):
+    return rolling_extremes(values, (window,), np.minimum)[window]
+
+
+def rolling_highs_lows(high, low, windows=ICHIMOKU_STOCHASTIC_WINDOWS):
+    """({window: highest high}, {window: lowest low}) for every window, in one call"""
+    return rolling_extremes(high, windows, np.maximum), rolling_extremes(low, windows, np.minimum)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Single Flight
+Coalesces concurrent calls for the same key into one upstream call.
+
+Streamlit runs every browser session on its own thread. When several sessions miss
+st.cache_data for the same ticker at the same moment (typically AAPL, the default
+selection) each would send its own Yahoo request. SingleFlight.do(key, fn) lets the
+first caller run fn while the others wait on it and share its result, or its
+exception. Once the call finishes the key is released, so the next miss fetches again.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Process-wide duplicate-call suppression
+    calls counts functions actually run, shared counts callers that joined one
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, function, *args, **kwargs):
+        """function(*args, **kwargs), run once for every concurrent caller with this key"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,555 @@
+"""
+Stock Search Index
+Shared Finviz-style autocomplete index used by both the Tk GUI and the Streamlit app.
+
+The index is built once when stock_data.csv loads. Every ticker and company name is
+upper-cased a single time, tickers are kept in a sorted prefix array, and company names
+are split into an inverted word index, so a keystroke never rescans the whole universe.
+"""
+
+import bisect
+import heapq
+import re
+import time
+from collections import OrderedDict
+from itertools import accumulate
+
+from symbols import canonical_symbol
+from universe import SearchResult, Universe
+
+
+# Fuzzy tier: shortest query worth correcting, and the latency budget per query
+FUZZY_MIN_LENGTH = 3
+FUZZY_BUDGET_MS = 5.0
+
+# Word tokens follow regex \b semantics so "COCA" finds "Coca-Cola Co"
+WORD_PATTERN = re.compile(r'\w+')
+
+# Separator between rows in the substring search blobs (never part of a query)
+ROW_SEPARATOR = '\n'
+
+
+class StockSearchIndex:
+    """Precomputed search structures over a ticker/company universe"""
+
+    def __init__(self, records, popularity=None):
+        """
+        Build the index from (ticker, company) pairs in file order
+        Matches inside a tier rank by popularity score (ticker -> score), and
+        equal scores keep file order, exactly like the old linear scans
+        """
+        self._set_universe(Universe.from_records(records, popularity))
+
+        # Sorted ticker array for exact and prefix lookups
+        # (stable, so duplicate tickers keep file order)
+        order = sorted(range(len(self.ticker_keys)), key=lambda row: self.ticker_keys[row])
+        self._sorted_keys = [self.ticker_keys[row] for row in order]
+        self._sorted_rows = order
+
+        # Inverted word index over company names: word -> row ids, most popular first
+        self._word_rows = {}
+        for row in self.rank_order:
+            for word in set(WORD_PATTERN.findall(self.company_keys[row])):
+                self._word_rows.setdefault(word, []).append(row)
+
+        self._company_tokens = None
+        self._build_trigram_index()
+
+    def _set_universe(self, universe, rank_order=None):
+        """Row columns, their upper-cased keys, popularity rank and the substring blobs"""
+        self.universe = universe
+        self.tickers = universe.tickers
+        self.companies = universe.companies
+        self.ticker_keys = universe.ticker_keys
+        self.company_keys = universe.company_keys
+
+        # Rows most popular first, and each row's position in that order
+        self.rank_order = rank_order if rank_order is not None else universe.rank_order()
+        self._rank = [0] * len(universe)
+        for position, row in enumerate(self.rank_order):
+            self._rank[row] = position
+
+        # Substring blobs: one str.find over a joined blob replaces a Python-level scan.
+        # Rows are joined most popular first, so the first hits are the top hits
+        self._company_blob, self._company_starts = self._build_blob(
+            [self.company_keys[row] for row in self.rank_order])
+        self._ticker_blob, self._ticker_starts = self._build_blob(
+            [self.ticker_keys[row] for row in self.rank_order])
+
+    @classmethod
+    def from_records(cls, stock_data, popularity=None):
+        """Build from the GUI's list of {'ticker', 'company'} dicts"""
+        return cls(((stock['ticker'], stock['company']) for stock in stock_data), popularity)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Build from the Streamlit DataFrame with ticker/company_name columns"""
+        return cls(zip(df['ticker'].astype(str), df['company_name'].fillna('').astype(str)))
+
+    @classmethod
+    def from_tables(cls, tickers, companies, tables):
+        """
+        Rebuild an index from prebuilt tables (see tables()) without re-tokenizing
+        Used by universe_snapshot to serve the index straight from a memory map
+        """
+        index = cls.__new__(cls)
+        index._set_universe(Universe(tickers, companies, tables['scores']), tables['rank_order'])
+        index._sorted_keys = tables['sorted_keys']
+        index._sorted_rows = tables['sorted_rows']
+        index._word_rows = tables['word_rows']
+        index._fuzzy_terms = tables['fuzzy_terms']
+        index._fuzzy_term_rows = tables['fuzzy_term_rows']
+        index._trigram_terms = tables['trigram_terms']
+        index._company_tokens = (tables['tokens'], tables['token_rows'])
+        return index
+
+    def tables(self):
+        """The precomputed lookup structures, for serializing into a snapshot"""
+        tokens, token_rows = self.company_tokens()
+        return {
+            'scores': self.universe.scores,
+            'rank_order': self.rank_order,
+            'sorted_keys': self._sorted_keys,
+            'sorted_rows': self._sorted_rows,
+            'word_rows': self._word_rows,
+            'fuzzy_terms': self._fuzzy_terms,
+            'fuzzy_term_rows': self._fuzzy_term_rows,
+            'trigram_terms': self._trigram_terms,
+            'tokens': tokens,
+            'token_rows': token_rows,
+        }
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def records(self):
+        """Rows as a read-only sequence of entry['ticker'] / entry['company'] records"""
+        return self.universe
+
+    def company_name(self, ticker, default=None):
+        """Company name of the first row with this ticker"""
+        rows = self._canonical_ticker_rows(str(ticker).upper().strip())
+        return self.companies[rows[0]] if len(rows) else default
+
+    def company_tokens(self):
+        """
+        Sorted whitespace tokens of the company names and the rows holding each
+        Built on first use; TickerResolver bisects these for word-prefix matches
+        """
+        if self._company_tokens is None:
+            token_rows = {}
+            for row, company_key in enumerate(self.company_keys):
+                for token in set(company_key.split()):
+                    token_rows.setdefault(token, []).append(row)
+            tokens = sorted(token_rows)
+            self._company_tokens = (tokens, [token_rows[token] for token in tokens])
+        return self._company_tokens
+
+    @staticmethod
+    def _build_blob(keys):
+        """Join keys into one searchable string and remember where each row starts"""
+        # Row i starts after the lengths of rows 0..i-1 plus their separators
+        step = len(ROW_SEPARATOR)
+        starts = list(accumulate(map(step.__add__, map(len, keys)), initial=0))
+        starts.pop()
+        return ROW_SEPARATOR.join(keys), starts
+
+    def _build_trigram_index(self):
+        """
+        Character-trigram index over every distinct ticker and company word
+        Terms are padded with '$' so short tickers still get a trigram
+        """
+        self._fuzzy_terms = []
+        self._fuzzy_term_rows = []
+        term_ids = {}
+
+        ticker_rows = {}
+        for row in self.rank_order:
+            ticker_rows.setdefault(self.ticker_keys[row], []).append(row)
+
+        # Tickers first so a ticker outranks a company word at the same distance
+        sources = list(ticker_rows.items())
+        sources += [(word, rows) for word, rows in self._word_rows.items()
+                    if len(word) >= FUZZY_MIN_LENGTH - 1]
+        for term, rows in sources:
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_ids[term] = len(self._fuzzy_terms)
+                self._fuzzy_terms.append(term)
+                self._fuzzy_term_rows.append(list(rows))
+            else:
+                self._fuzzy_term_rows[term_id].extend(rows)
+
+        self._trigram_terms = {}
+        for term_id, term in enumerate(self._fuzzy_terms):
+            for gram in _trigrams(term):
+                self._trigram_terms.setdefault(gram, []).append(term_id)
+
+    def _make_result(self, row, match_type):
+        return SearchResult(self.tickers[row], self.companies[row], match_type)
+
+    def _exact_ticker_rows(self, query):
+        start = bisect.bisect_left(self._sorted_keys, query)
+        end = bisect.bisect_right(self._sorted_keys, query, start)
+        return self._sorted_rows[start:end]
+
+    def _canonical_ticker_rows(self, query):
+        """Exact ticker rows, also accepting aliases like BRK.B or BTCUSD"""
+        rows = self._exact_ticker_rows(query)
+        if not rows:
+            canonical = canonical_symbol(query)
+            if canonical != query:
+                rows = self._exact_ticker_rows(canonical)
+        return rows
+
+    def _exact_word_rows(self, query):
+        """Rows whose company name contains the query as a whole word"""
+        words = WORD_PATTERN.findall(query)
+        if not words:
+            return []
+
+        if len(words) == 1 and words[0] == query:
+            return self._word_rows.get(query, [])
+
+        # Multi-word or punctuated query ("AT&T", "BANK OF"): intersect the postings
+        # of its words, then confirm the whole phrase on those few candidates only
+        postings = [self._word_rows.get(word) for word in words]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for rows in postings[1:]:
+            candidates.intersection_update(rows)
+            if not candidates:
+                return []
+
+        pattern = re.compile(r'\b' + re.escape(query) + r'\b')
+        return [row for row in sorted(candidates, key=self._rank.__getitem__)
+                if pattern.search(self.company_keys[row])]
+
+    def _ticker_prefix_rows(self, query, limit, seen=()):
+        """
+        The limit most popular rows whose ticker starts with the query
+        The sorted prefix range is in ticker order, so a bounded heap picks the top
+        rows without sorting the whole range
+        """
+        def candidates():
+            previous = None
+            start = bisect.bisect_left(self._sorted_keys, query)
+            for position in range(start, len(self._sorted_keys)):
+                key = self._sorted_keys[position]
+                if not key.startswith(query):
+                    break
+                # Duplicate tickers sit together; the first is the one reported
+                if key != previous and key not in seen:
+                    yield self._sorted_rows[position]
+                previous = key
+
+        if limit <= 0:
+            return []
+        return heapq.nsmallest(limit, candidates(), key=self._rank.__getitem__)
+
+    def _substring_rows(self, query, blob, starts):
+        """Rows whose key contains the query, most popular first, via str.find on the blob"""
+        if ROW_SEPARATOR in query:
+            return
+        position = blob.find(query)
+        while position != -1:
+            slot = bisect.bisect_right(starts, position) - 1
+            yield self.rank_order[slot]
+            # Skip the rest of this row so each row is reported once
+            next_start = starts[slot + 1] if slot + 1 < len(starts) else len(blob)
+            position = blob.find(query, next_start)
+
+    def _fuzzy_rows(self, query, budget_ms=FUZZY_BUDGET_MS):
+        """
+        Rows whose ticker or a company word is within a small edit distance of the query
+        Candidates come from shared trigrams and are verified closest-first until
+        the latency budget runs out
+        """
+        words = WORD_PATTERN.findall(query)
+        if not words:
+            return []
+        # For multi-word input correct the most distinctive (longest) word
+        term = max(words, key=len)
+        if len(term) < FUZZY_MIN_LENGTH:
+            return []
+
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        max_distance = 1 if len(term) <= 5 else 2
+
+        shared = {}
+        for gram in _trigrams(term):
+            for term_id in self._trigram_terms.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+
+        # q-gram lemma: each edit destroys at most three padded trigrams
+        candidates = []
+        for term_id, count in shared.items():
+            candidate = self._fuzzy_terms[term_id]
+            if abs(len(candidate) - len(term)) > max_distance:
+                continue
+            if count >= max(len(candidate), len(term)) - 3 * max_distance:
+                candidates.append((-count, term_id))
+        candidates.sort()
+
+        matches = []
+        for checked, (_, term_id) in enumerate(candidates):
+            if checked % 32 == 0 and time.perf_counter() > deadline:
+                break
+            distance = _edit_distance(term, self._fuzzy_terms[term_id], max_distance)
+            if distance <= max_distance:
+                matches.append((distance, term_id))
+        matches.sort()
+
+        rows = []
+        for _, term_id in matches:
+            rows.extend(self._fuzzy_term_rows[term_id])
+        return rows
+
+    def fuzzy_search(self, query, max_results=5):
+        """Typo-tolerant suggestions only ("APPL", "MICROSFT", "NVIDA")"""
+        if not query:
+            return []
+        query = str(query).upper().strip()
+
+        results = []
+        seen = set()
+        for row in self._fuzzy_rows(query):
+            if len(results) >= max_results:
+                break
+            if self.ticker_keys[row] in seen:
+                continue
+            seen.add(self.ticker_keys[row])
+            results.append(self._make_result(row, 'fuzzy'))
+        return results
+
+    def search(self, query, max_results=8):
+        """
+        Tiered search: exact ticker, exact company word, ticker prefix,
+        company substring, ticker substring, then typo-tolerant fuzzy matches
+        Each tier yields its most popular matches first and stops once the
+        results are full, so a common prefix never materializes every match
+        """
+        if not query:
+            return []
+
+        query = str(query).upper().strip()
+        if not query:
+            return []
+
+        results = []
+        seen = set()
+
+        tiers = [
+            ('exact_ticker', self._canonical_ticker_rows(query)),
+            ('company_exact_word', self._exact_word_rows(query)),
+            ('ticker_starts', _Deferred(lambda: self._ticker_prefix_rows(
+                query, max_results - len(results), seen))),
+            ('company_contains', self._substring_rows(query, self._company_blob, self._company_starts)),
+            ('ticker_contains', self._substring_rows(query, self._ticker_blob, self._ticker_starts)),
+            ('fuzzy', _Deferred(self._fuzzy_rows, query)),
+        ]
+
+        for match_type, rows in tiers:
+            for row in rows:
+                if len(results) >= max_results:
+                    return results
+                ticker_key = self.ticker_keys[row]
+                if ticker_key in seen:
+                    continue
+                seen.add(ticker_key)
+                results.append(self._make_result(row, match_type))
+
+        return results
+
+
+class _Deferred:
+    """Iterable that only runs its producer when a tier actually needs it"""
+
+    def __init__(self, producer, *args):
+        self.producer = producer
+        self.args = args
+
+    def __iter__(self):
+        return iter(self.producer(*self.args))
+
+
+def _trigrams(term):
+    """Padded character trigrams of a term"""
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, max_distance):
+    """
+    Optimal string alignment distance (adjacent swaps count as one edit)
+    Gives up early and returns max_distance + 1 once every path is too long
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class SearchSession:
+    """
+    Incremental sidebar search for one user session
+    Matches rows whose ticker or company name contains the query. When a new query
+    contains the previous one, only the previous candidates are re-checked, and a
+    bounded LRU of query -> rows makes backspacing free.
+    """
+
+    def __init__(self, index, memo_size=64):
+        self.index = index
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._last_query = None
+        self._last_rows = None
+
+        # Counters so the cost of a typing sequence can be checked
+        self.full_scans = 0
+        self.narrowings = 0
+        self.memo_hits = 0
+
+    def matching_rows(self, query):
+        """All matching row ids for the query, most popular first"""
+        query = str(query).upper().strip() if query else ""
+        if not query:
+            return []
+
+        rows = self._memo.get(query)
+        if rows is not None:
+            self._memo.move_to_end(query)
+            self.memo_hits += 1
+        elif self._last_query and self._last_query in query:
+            # Anything matching the longer query also matched the shorter one
+            ticker_keys = self.index.ticker_keys
+            company_keys = self.index.company_keys
+            rows = [row for row in self._last_rows
+                    if query in ticker_keys[row] or query in company_keys[row]]
+            self.narrowings += 1
+        else:
+            ticker_keys = self.index.ticker_keys
+            company_keys = self.index.company_keys
+            rows = [row for row in self.index.rank_order
+                    if query in ticker_keys[row] or query in company_keys[row]]
+            self.full_scans += 1
+
+        self._last_query = query
+        self._last_rows = rows
+        self._memo[query] = rows
+        self._memo.move_to_end(query)
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+        return rows
+
+    def search(self, query, max_results=8):
+        """First matches for the sidebar as entry['ticker'] / entry['company'] records"""
+        universe = self.index.universe
+        rows = self.matching_rows(query)
+
+        # An alias (BRK.B, BTCUSD) leads with the provider symbol it stands for
+        query = str(query).upper().strip() if query else ""
+        canonical = canonical_symbol(query)
+        if canonical != query:
+            alias_rows = list(self.index._exact_ticker_rows(canonical))
+            rows = alias_rows + [row for row in rows if row not in alias_rows]
+
+        return [universe[row] for row in rows[:max_results]]
+
+
+class TickerResolver:
+    """
+    Resolve user input to a ticker and tickers to company names
+    O(1) ticker -> name and name -> ticker maps, plus a sorted token-prefix index
+    that scores company names by the share of input words they match (> 50% wins)
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+        # First occurrence wins, like the old front-to-back scans (built back to front
+        # so earlier rows overwrite later duplicates)
+        self._names_by_ticker = dict(zip(reversed(index.ticker_keys), reversed(index.companies)))
+        self._tickers_by_name = dict(zip(reversed(index.company_keys), reversed(index.tickers)))
+
+        # Whitespace tokens of every company name -> row ids
+        self._tokens, self._token_rows = index.company_tokens()
+
+    @classmethod
+    def from_records(cls, stock_data):
+        """Build from the GUI's list of {'ticker', 'company'} dicts"""
+        return cls(StockSearchIndex.from_records(stock_data))
+
+    def is_known_ticker(self, ticker):
+        return canonical_symbol(ticker) in self._names_by_ticker
+
+    def company_name(self, ticker, default=None):
+        """Company name for a ticker or alias, or default when it isn't in the universe"""
+        return self._names_by_ticker.get(canonical_symbol(ticker), default)
+
+    def _prefix_rows(self, word):
+        """Rows with a company token starting with word"""
+        rows = set()
+        start = bisect.bisect_left(self._tokens, word)
+        for position in range(start, len(self._tokens)):
+            if not self._tokens[position].startswith(word):
+                break
+            rows.update(self._token_rows[position])
+        return rows
+
+    def resolve(self, company_input):
+        """
+        Find ticker from company name input
+        Returns the input itself when nothing scores above 50%
+        """
+        company_input = str(company_input).upper().strip()
+
+        # Already a ticker, or an exact company name
+        if company_input in self._names_by_ticker:
+            return company_input
+        if company_input in self._tickers_by_name:
+            return self._tickers_by_name[company_input]
+        canonical = canonical_symbol(company_input)
+        if canonical in self._names_by_ticker:
+            return canonical
+
+        input_words = company_input.split()
+        if not input_words:
+            return company_input
+
+        # Count, per row, how many input words prefix one of its company tokens
+        matches = {}
+        prefix_rows = {}
+        for word in input_words:
+            if word not in prefix_rows:
+                prefix_rows[word] = self._prefix_rows(word)
+            for row in prefix_rows[word]:
+                matches[row] = matches.get(row, 0) + 1
+
+        best_row = None
+        best_score = 0
+        for row, count in matches.items():
+            score = count / len(input_words)
+            if score > 0.5 and (score > best_score or (score == best_score and row < best_row)):
+                best_score = score
+                best_row = row
+
+        return self.index.tickers[best_row] if best_row is not None else company_input
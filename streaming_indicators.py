@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Streaming Indicators
+Indicator state that updates in constant time per bar instead of recomputing the year.
+
+Each indicator keeps only what it needs to produce its next value: running window sums
+(re-summed once per window length so rounding never accumulates), the EMA recurrence
+of pandas' adjust=True average, and monotonic deques for rolling highs and lows.
+append() adds a bar; revise() replaces the latest bar, for intraday ticks that update
+today's bar in place. Both are O(1) (amortized for the deques).
+
+values() gives the indicators for the latest bar with the field names of
+indicators.COLUMNS, and agree with indicators.compute() over the same bars to
+floating-point rounding. Chikou span is the one exception: it plots a close 26 bars
+back, so for the latest bar it is always NaN, exactly as in the batch result.
+
+State serializes to plain JSON (to_dict / from_dict). IndicatorStateStore keeps one
+file per symbol in <cache dir>/indicators/, next to the history store, and
+stream_for() brings a saved stream up to date with a history frame.
+
+Usage: python streaming_indicators.py SYMBOL [--period 1y]   (uses the history store)
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from collections import deque
+
+import pandas as pd
+
+from indicators import (BB_WIDTH, BB_WINDOW, COLUMNS, ICHIMOKU_SHIFT, KIJUN_WINDOW, MACD_FAST, MACD_SIGNAL,
+                        MACD_SLOW, RSI_WINDOW, SENKOU_B_WINDOW, SMA_WINDOWS, STOCH_SMOOTHING, STOCH_WINDOW,
+                        TENKAN_WINDOW)
+from negative_cache import cache_dir, write_json_atomic
+
+INDICATORS_DIR = "indicators"
+NAN = float('nan')
+
+
+def _finite(value):
+    return not (math.isnan(value) or math.isinf(value))
+
+
+class StreamingState:
+    """Base for objects whose whole state is their attributes; to_dict() is JSON-ready"""
+
+    def to_dict(self):
+        return {'type': type(self).__name__,
+                'state': {name: _encode(value) for name, value in self.__dict__.items()}}
+
+    @staticmethod
+    def from_dict(data):
+        cls = _TYPES[data['type']]
+        obj = cls.__new__(cls)
+        obj.__dict__.update({name: _decode(value) for name, value in data['state'].items()})
+        return obj
+
+
+def _encode(value):
+    if isinstance(value, StreamingState):
+        return value.to_dict()
+    if isinstance(value, deque):
+        return {'deque': [_encode(item) for item in value], 'maxlen': value.maxlen}
+    if isinstance(value, dict):
+        return {'items': [[_encode(key), _encode(item)] for key, item in value.items()]}  # Keeps int keys
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if 'deque' in value:
+            return deque([_decode(item) for item in value['deque']], maxlen=value['maxlen'])
+        if 'items' in value:
+            return {_decode(key): _decode(item) for key, item in value['items']}
+        return StreamingState.from_dict(value)
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+class RollingWindow(StreamingState):
+    """Sum of the last window values; NaN/inf inside the window make the mean NaN"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.nonfinite = 0
+        self.pushes = 0
+
+    def _add(self, value, sign):
+        if _finite(value):
+            self.total += sign * value
+        else:
+            self.nonfinite += sign
+
+    def push(self, value):
+        if len(self.values) == self.window:
+            self._add(self.values[0], -1)
+        self.values.append(value)
+        self._add(value, 1)
+        self.pushes += 1
+        if self.pushes % self.window == 0:
+            # Re-sum once per window length: O(1) amortized, and subtraction error never piles up
+            self.total = math.fsum(value for value in self.values if _finite(value))
+
+    def replace_last(self, value):
+        self._add(self.values[-1], -1)
+        self.values[-1] = value
+        self._add(value, 1)
+
+    def mean(self):
+        if len(self.values) < self.window or self.nonfinite:
+            return NAN
+        return self.total / self.window
+
+
+class RollingExtreme(StreamingState):
+    """
+    Rolling max (or min) of the last window values
+    A monotonic deque covers every value but the latest, which is kept apart so revising
+    it never loses values the deque would have discarded
+    """
+
+    def __init__(self, window, highest=True):
+        self.window = window
+        self.highest = highest
+        self.candidates = deque()  # [index, value], values strictly decreasing (max) / increasing (min)
+        self.index = -1
+        self.latest = NAN
+        self.last_nan = None       # Index of the newest NaN seen
+        self.nan_before = None     # last_nan before the latest value arrived
+
+    def _beats(self, a, b):
+        return a >= b if self.highest else a <= b
+
+    def push(self, value):
+        if self.index >= 0 and not math.isnan(self.latest):
+            while self.candidates and self._beats(self.latest, self.candidates[-1][1]):
+                self.candidates.pop()
+            self.candidates.append([self.index, self.latest])
+        self.index += 1
+        while self.candidates and self.candidates[0][0] <= self.index - self.window:
+            self.candidates.popleft()
+        self.nan_before = self.last_nan
+        self.latest = NAN
+        self.replace_last(value)
+
+    def replace_last(self, value):
+        self.latest = value
+        self.last_nan = self.index if math.isnan(value) else self.nan_before
+
+    def value(self):
+        if self.index + 1 < self.window:
+            return NAN
+        if self.last_nan is not None and self.last_nan > self.index - self.window:
+            return NAN
+        if not self.candidates:
+            return self.latest
+        best = self.candidates[0][1]
+        return best if self._beats(best, self.latest) else self.latest
+
+
+class Ema(StreamingState):
+    """pandas ewm(span).mean() with adjust=True: y = num / den, both decayed every bar"""
+
+    def __init__(self, span):
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.num = self.den = 0.0
+        self.previous = [0.0, 0.0]
+
+    def push(self, value):
+        self.previous = [self.num, self.den]
+        self.replace_last(value)
+
+    def replace_last(self, value):
+        num, den = self.previous
+        valid = not math.isnan(value)
+        self.num = self.decay * num + (value if valid else 0.0)
+        self.den = self.decay * den + (1.0 if valid else 0.0)
+
+    def value(self):
+        return self.num / self.den if self.den else NAN
+
+
+class Delay(StreamingState):
+    """The value pushed periods bars ago"""
+
+    def __init__(self, periods):
+        self.values = deque(maxlen=periods + 1)
+
+    def push(self, value):
+        self.values.append(value)
+
+    def replace_last(self, value):
+        self.values[-1] = value
+
+    def value(self):
+        return self.values[0] if len(self.values) == self.values.maxlen else NAN
+
+
+class StreamingIndicator(StreamingState):
+    """append()/revise() take the bar's close, high and low; values() maps field -> latest value"""
+
+    def append(self, close, high, low):
+        raise NotImplementedError
+
+    def revise(self, close, high, low):
+        raise NotImplementedError
+
+    def values(self):
+        raise NotImplementedError
+
+
+class StreamingSMA(StreamingIndicator):
+    def __init__(self, window, field=None):
+        self.field = field or f"sma_{window}"
+        self.closes = RollingWindow(window)
+
+    def append(self, close, high, low):
+        self.closes.push(close)
+
+    def revise(self, close, high, low):
+        self.closes.replace_last(close)
+
+    def values(self):
+        return {self.field: self.closes.mean()}
+
+
+class StreamingRSI(StreamingIndicator):
+    """Simple-average RSI; the first bar (no previous close) counts as zero gain and loss"""
+
+    def __init__(self, window=RSI_WINDOW):
+        self.gains = RollingWindow(window)
+        self.losses = RollingWindow(window)
+        self.previous_close = NAN
+        self.close = NAN
+
+    def _moves(self, close):
+        delta = close - self.previous_close
+        return (delta if delta > 0 else 0.0), (-delta if delta < 0 else 0.0)
+
+    def append(self, close, high, low):
+        self.previous_close = self.close
+        self.close = close
+        gain, loss = self._moves(close)
+        self.gains.push(gain)
+        self.losses.push(loss)
+
+    def revise(self, close, high, low):
+        self.close = close
+        gain, loss = self._moves(close)
+        self.gains.replace_last(gain)
+        self.losses.replace_last(loss)
+
+    def values(self):
+        gain, loss = self.gains.mean(), self.losses.mean()
+        if math.isnan(gain) or math.isnan(loss) or (gain == 0 and loss == 0):
+            return {'rsi': NAN}
+        if loss == 0:
+            return {'rsi': 100.0}
+        return {'rsi': 100 - 100 / (1 + gain / loss)}
+
+
+class StreamingMACD(StreamingIndicator):
+    def __init__(self, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+        self.fast = Ema(fast)
+        self.slow = Ema(slow)
+        self.signal = Ema(signal)
+
+    def append(self, close, high, low):
+        self.fast.push(close)
+        self.slow.push(close)
+        self.signal.push(self.fast.value() - self.slow.value())
+
+    def revise(self, close, high, low):
+        self.fast.replace_last(close)
+        self.slow.replace_last(close)
+        self.signal.replace_last(self.fast.value() - self.slow.value())
+
+    def values(self):
+        return {'macd': self.fast.value() - self.slow.value(), 'macd_signal': self.signal.value()}
+
+
+class StreamingBollinger(StreamingIndicator):
+    """
+    Running sum and sum of squares over the window, both taken around a recent close
+    (re-centred once per window length) so the variance doesn't cancel away
+    """
+
+    def __init__(self, window=BB_WINDOW, width=BB_WIDTH):
+        self.window = window
+        self.width = width
+        self.closes = deque(maxlen=window)
+        self.center = NAN
+        self.total = 0.0
+        self.squares = 0.0
+        self.nonfinite = 0
+        self.pushes = 0
+
+    def _add(self, close, sign):
+        if _finite(close):
+            offset = close - self.center
+            self.total += sign * offset
+            self.squares += sign * offset * offset
+        else:
+            self.nonfinite += sign
+
+    def _recenter(self):
+        finite = [close for close in self.closes if _finite(close)]
+        self.center = finite[-1] if finite else NAN
+        self.total = math.fsum(close - self.center for close in finite)
+        self.squares = math.fsum((close - self.center) ** 2 for close in finite)
+        self.nonfinite = len(self.closes) - len(finite)
+
+    def append(self, close, high, low):
+        if len(self.closes) == self.window:
+            self._add(self.closes[0], -1)
+        self.closes.append(close)
+        self.pushes += 1
+        if math.isnan(self.center) or self.pushes % self.window == 0:
+            self._recenter()
+        else:
+            self._add(close, 1)
+
+    def revise(self, close, high, low):
+        self._add(self.closes[-1], -1)
+        self.closes[-1] = close
+        if math.isnan(self.center):
+            self._recenter()
+        else:
+            self._add(close, 1)
+
+    def values(self):
+        if len(self.closes) < self.window or self.nonfinite:
+            return {'bb_middle': NAN, 'bb_upper': NAN, 'bb_lower': NAN}
+        mean = self.total / self.window
+        variance = max(0.0, (self.squares - self.total * mean) / (self.window - 1))
+        middle = self.center + mean
+        spread = math.sqrt(variance) * self.width
+        return {'bb_middle': middle, 'bb_upper': middle + spread, 'bb_lower': middle - spread}
+
+
+class StreamingStochastic(StreamingIndicator):
+    def __init__(self, window=STOCH_WINDOW, smoothing=STOCH_SMOOTHING):
+        self.highs = RollingExtreme(window, highest=True)
+        self.lows = RollingExtreme(window, highest=False)
+        self.close = NAN
+        self.k_values = RollingWindow(smoothing)
+
+    def _k(self):
+        highest, lowest = self.highs.value(), self.lows.value()
+        if math.isnan(highest) or math.isnan(lowest) or math.isnan(self.close):
+            return NAN
+        if highest == lowest:
+            return NAN if self.close == lowest else math.copysign(math.inf, self.close - lowest)
+        return 100 * ((self.close - lowest) / (highest - lowest))
+
+    def append(self, close, high, low):
+        self.highs.push(high)
+        self.lows.push(low)
+        self.close = close
+        self.k_values.push(self._k())
+
+    def revise(self, close, high, low):
+        self.highs.replace_last(high)
+        self.lows.replace_last(low)
+        self.close = close
+        self.k_values.replace_last(self._k())
+
+    def values(self):
+        return {'stoch_k': self.k_values.values[-1] if self.k_values.values else NAN,
+                'stoch_d': self.k_values.mean()}
+
+
+class StreamingIchimoku(StreamingIndicator):
+    """Conversion/base lines now; the cloud spans plotted ICHIMOKU_SHIFT bars later"""
+
+    def __init__(self, shift=ICHIMOKU_SHIFT):
+        self.highs = {window: RollingExtreme(window, highest=True)
+                      for window in (TENKAN_WINDOW, KIJUN_WINDOW, SENKOU_B_WINDOW)}
+        self.lows = {window: RollingExtreme(window, highest=False)
+                     for window in (TENKAN_WINDOW, KIJUN_WINDOW, SENKOU_B_WINDOW)}
+        self.span_a = Delay(shift)
+        self.span_b = Delay(shift)
+
+    def _midpoint(self, window):
+        return (self.highs[window].value() + self.lows[window].value()) / 2
+
+    def _lines(self):
+        tenkan, kijun = self._midpoint(TENKAN_WINDOW), self._midpoint(KIJUN_WINDOW)
+        return tenkan, kijun, (tenkan + kijun) / 2, self._midpoint(SENKOU_B_WINDOW)
+
+    def append(self, close, high, low):
+        for window in self.highs:
+            self.highs[window].push(high)
+            self.lows[window].push(low)
+        _, _, span_a, span_b = self._lines()
+        self.span_a.push(span_a)
+        self.span_b.push(span_b)
+
+    def revise(self, close, high, low):
+        for window in self.highs:
+            self.highs[window].replace_last(high)
+            self.lows[window].replace_last(low)
+        _, _, span_a, span_b = self._lines()
+        self.span_a.replace_last(span_a)
+        self.span_b.replace_last(span_b)
+
+    def values(self):
+        tenkan, kijun, _, _ = self._lines()
+        return {'tenkan_sen': tenkan, 'kijun_sen': kijun, 'senkou_span_a': self.span_a.value(),
+                'senkou_span_b': self.span_b.value(), 'chikou_span': NAN}
+
+
+class IndicatorStream(StreamingIndicator):
+    """Every indicator in indicators.COLUMNS, fed one bar at a time"""
+
+    def __init__(self):
+        self.indicators = [StreamingSMA(window) for window in SMA_WINDOWS] + [
+            StreamingRSI(), StreamingMACD(), StreamingBollinger(), StreamingIchimoku(), StreamingStochastic()]
+        self.bars = 0
+        self.last_timestamp = None
+        self.last_bar = None  # [close, high, low] as last appended or revised
+
+    def append(self, close, high, low, timestamp=None):
+        for indicator in self.indicators:
+            indicator.append(close, high, low)
+        self.bars += 1
+        self.last_timestamp = None if timestamp is None else pd.Timestamp(timestamp).isoformat()
+        self.last_bar = [close, high, low]
+
+    def revise(self, close, high, low):
+        if not self.bars:
+            raise ValueError("revise() needs a bar to replace; append() one first")
+        for indicator in self.indicators:
+            indicator.revise(close, high, low)
+        self.last_bar = [close, high, low]
+
+    def values(self):
+        merged = {}
+        for indicator in self.indicators:
+            merged.update(indicator.values())
+        return {name: merged[name] for name in COLUMNS}
+
+    def previous_close(self):
+        return self.indicators[len(SMA_WINDOWS)].previous_close  # StreamingRSI tracks it
+
+
+_TYPES = {cls.__name__: cls for cls in (RollingWindow, RollingExtreme, Ema, Delay, StreamingSMA, StreamingRSI,
+                                        StreamingMACD, StreamingBollinger, StreamingStochastic,
+                                        StreamingIchimoku, IndicatorStream)}
+
+
+def _bar(hist, position):
+    row = hist.iloc[position]
+    return float(row['Close']), float(row['High']), float(row['Low'])
+
+
+def _same(a, b):
+    return all(x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+
+def sync(hist, stream=None):
+    """
+    stream brought up to hist's last bar: a changed latest bar is revised and newer bars
+    appended. A stream that doesn't line up with hist (no stream, its last bar missing, or
+    the bar before it changed, as after a split re-adjusts prices) is rebuilt from hist.
+    Returns (stream, bars appended or revised)
+    """
+    position = -1
+    if stream is not None and stream.last_timestamp is not None and not hist.empty:
+        position = hist.index.get_indexer([pd.Timestamp(stream.last_timestamp)])[0]
+        if position > 0 and not _same([float(hist['Close'].iloc[position - 1])], [stream.previous_close()]):
+            position = -1
+    if position < 0:
+        stream = IndicatorStream()
+        for timestamp, close, high, low in zip(hist.index, hist['Close'], hist['High'], hist['Low']):
+            stream.append(float(close), float(high), float(low), timestamp)
+        return stream, len(hist)
+
+    updated = 0
+    bar = _bar(hist, position)
+    if not _same(bar, stream.last_bar):
+        stream.revise(*bar)
+        updated += 1
+    for offset in range(position + 1, len(hist)):
+        stream.append(*_bar(hist, offset), hist.index[offset])
+        updated += 1
+    return stream, updated
+
+
+class IndicatorStateStore:
+    """symbol -> saved IndicatorStream, one JSON file each next to the history store"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(cache_dir(), INDICATORS_DIR)
+
+    def path_for(self, symbol):
+        return os.path.join(self.directory, symbol.upper() + ".json")
+
+    def load(self, symbol):
+        """Saved stream, None when there is none (or it can't be read)"""
+        try:
+            with open(self.path_for(symbol), 'r', encoding='utf-8') as file:
+                return StreamingState.from_dict(json.load(file))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, symbol, stream):
+        write_json_atomic(self.path_for(symbol), stream.to_dict())
+
+
+def stream_for(symbol, hist, store=None):
+    """The saved stream for symbol synced to hist (and saved again when it changed)"""
+    store = store or IndicatorStateStore()
+    stream, updated = sync(hist, store.load(symbol))
+    if updated:
+        store.save(symbol, stream)
+    return stream
+
+
+def main():
+    from market_data import default_provider
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('symbol')
+    parser.add_argument('--period', default='1y', help='history to stream (default: 1y)')
+    args = parser.parse_args()
+
+    hist = default_provider().fetch_history(args.symbol, args.period)
+    if hist.empty:
+        print(f"❌ No history for {args.symbol}")
+        return
+    store = IndicatorStateStore()
+    start = time.perf_counter()
+    stream = stream_for(args.symbol, hist, store)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"📈 {args.symbol.upper()}: {stream.bars} bars streamed, synced in {elapsed:.1f} ms ({store.path_for(args.symbol)})")
+    for name, value in stream.values().items():
+        print(f"   {COLUMNS[name]:<14} {value:12.4f}")
+
+
+if __name__ == "__main__":
+    main()
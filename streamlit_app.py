@@ -6,7 +6,6 @@ Built with Streamlit for easy web deployment
 
 import streamlit as st
 import pandas as pd
-import yfinance as yf
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
@@ -15,6 +14,18 @@ import numpy as np
 import requests
 from io import StringIO
 
+from stock_search import SearchSession, StockSearchIndex
+from circuit_breaker import CLOSED
+from fundamentals_cache import QUOTE_TTL_SECONDS
+from indicators import CHART_FIELDS, RECOMMENDATION_FIELDS, add_indicator_columns, graph_for
+from market_calendar import freshness_policy
+from market_data import default_provider
+from negative_cache import shared_negative_cache
+from revalidating_cache import RevalidatingCache, format_age
+from single_flight import SingleFlight
+from symbols import canonical_symbol
+import universe_snapshot
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Stock Analyzer - AI-Powered Stock Research",
@@ -255,8 +266,8 @@ def load_stock_data():
             ['TSLA', 'Tesla Inc'],
             ['NVDA', 'NVIDIA Corporation'],
             ['META', 'Meta Platforms Inc'],
-            ['BRK.A', 'Berkshire Hathaway Inc Class A'],
-            ['BRK.B', 'Berkshire Hathaway Inc Class B'],
+            ['BRK-A', 'Berkshire Hathaway Inc Class A'],
+            ['BRK-B', 'Berkshire Hathaway Inc Class B'],
             ['JPM', 'JPMorgan Chase & Co'],
             ['JNJ', 'Johnson & Johnson'],
             ['V', 'Visa Inc'],
@@ -299,168 +310,110 @@ def load_stock_data():
         ]
         return pd.DataFrame(default_stocks, columns=['ticker', 'company_name'])
 
-def search_stocks(query, stock_data, max_results=10):
+@st.cache_resource(max_entries=2)  # One entry per stock_data.csv version
+def _load_search_index(source_mtime_ns):
+    """Map the stock_data.csv snapshot (recompiled when the CSV or its popularity scores change)"""
+    try:
+        return universe_snapshot.load_search_index(universe_snapshot.DEFAULT_CSV_PATH)
+    except FileNotFoundError:
+        return StockSearchIndex.from_dataframe(load_stock_data())
+
+def load_search_index():
+    """Shared search index, reloaded only when stock_data.csv or stock_popularity.csv change on disk"""
+    try:
+        source_mtime_ns = universe_snapshot.source_mtime_ns(universe_snapshot.DEFAULT_CSV_PATH)
+    except OSError:
+        source_mtime_ns = None
+    return _load_search_index(source_mtime_ns)
+
+def search_stocks(query, search_index, max_results=10):
     """
     Search stocks by ticker or company name
     Returns filtered results similar to Finviz autocomplete
     """
-    if not query or len(query) < 1:
-        return []
-    
-    query = query.upper().strip()
-    results = []
-    
-    # Exact ticker matches first
-    exact_matches = stock_data[stock_data['ticker'].str.upper() == query]
-    for _, row in exact_matches.iterrows():
-        results.append({
-            'display': f"{row['ticker']} - {row['company_name']}",
-            'ticker': row['ticker'],
-            'company': row['company_name'],
-            'match_type': 'exact_ticker'
-        })
-    
-    # Company name exact word matches (e.g., "APPLE" should find "Apple Inc")
-    if len(results) < max_results:
-        company_exact_word = stock_data[
-            (stock_data['company_name'].str.upper().str.contains(r'\b' + query + r'\b', na=False, regex=True)) &
-            (~stock_data['ticker'].str.upper().isin([r['ticker'].upper() for r in results]))
-        ]
-        for _, row in company_exact_word.iterrows():
-            if len(results) >= max_results:
-                break
-            results.append({
-                'display': f"{row['ticker']} - {row['company_name']}",
-                'ticker': row['ticker'],
-                'company': row['company_name'],
-                'match_type': 'company_exact_word'
-            })
-    
-    # Ticker starts with query
-    if len(results) < max_results:
-        ticker_starts = stock_data[
-            (stock_data['ticker'].str.upper().str.startswith(query)) & 
-            (~stock_data['ticker'].str.upper().isin([r['ticker'].upper() for r in results]))
-        ]
-        for _, row in ticker_starts.iterrows():
-            if len(results) >= max_results:
-                break
-            results.append({
-                'display': f"{row['ticker']} - {row['company_name']}",
-                'ticker': row['ticker'],
-                'company': row['company_name'],
-                'match_type': 'ticker_starts'
-            })
-    
-    # Company name contains query
-    if len(results) < max_results:
-        company_contains = stock_data[
-            (stock_data['company_name'].str.upper().str.contains(query, na=False)) &
-            (~stock_data['ticker'].str.upper().isin([r['ticker'].upper() for r in results]))
-        ]
-        for _, row in company_contains.iterrows():
-            if len(results) >= max_results:
-                break
-            results.append({
-                'display': f"{row['ticker']} - {row['company_name']}",
-                'ticker': row['ticker'],
-                'company': row['company_name'],
-                'match_type': 'company_contains'
-            })
-    
-    # Ticker contains query (partial matches)
-    if len(results) < max_results:
-        ticker_contains = stock_data[
-            (stock_data['ticker'].str.upper().str.contains(query, na=False)) &
-            (~stock_data['ticker'].str.upper().isin([r['ticker'].upper() for r in results]))
-        ]
-        for _, row in ticker_contains.iterrows():
-            if len(results) >= max_results:
-                break
-            results.append({
-                'display': f"{row['ticker']} - {row['company_name']}",
-                'ticker': row['ticker'],
-                'company': row['company_name'],
-                'match_type': 'ticker_contains'
-            })
+    return search_index.search(query, max_results=max_results)
+
+@st.cache_resource
+def stock_data_flights():
+    """
+    Process-wide SingleFlight: sessions that miss the cache for the same ticker at once
+    share one upstream fetch (a module global would be recreated on every script rerun)
+    """
+    return SingleFlight()
+
+def _fetch_stock_data(ticker):
+    """One upstream fetch of a ticker's info and 1y history"""
+    # Known-bad symbols come back empty without a request (see negative_cache.py)
+    context = default_provider().analysis(ticker)
+    hist = context.history("1y")
     
-    return results[:max_results]
+    if hist.empty:
+        return None
+    info = context.info
+    
+    # Don't cache the stock object itself, just the data we need
+    return {
+        'info': dict(info),  # Convert to regular dict
+        'history': hist,
+        'current_price': float(hist['Close'].iloc[-1]),
+        'company_name': info.get('longName', f"{ticker} Corp"),
+        # Served from the local stores because Yahoo is failing (see circuit_breaker.py)
+        'degraded': context.degraded,
+        'as_of': context.degraded_as_of,
+    }
+
+def _copy_stock_data(data):
+    """Each session adds indicator columns to its history, so they mustn't share one frame"""
+    if data is None:
+        return None
+    return dict(data, info=dict(data['info']), history=data['history'].copy())
+
+def fetch_stock_data(ticker):
+    """_fetch_stock_data coalesced across sessions; every caller gets its own copy"""
+    return _copy_stock_data(stock_data_flights().do(ticker, _fetch_stock_data, ticker))
+
+# Stale-while-revalidate: past its expiry the last good result is shown at once, with its
+# age, while one background thread refreshes it; only data more than MAX_STALE_SECONDS
+# past expiry makes the page wait for Yahoo again
+STALE_WHILE_REVALIDATE = True
+MAX_STALE_SECONDS = 30 * 60
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_stock_data(ticker):
+@st.cache_resource
+def stock_data_cache():
+    """
+    Process-wide revalidating cache of _fetch_stock_data results; degraded results are
+    shown but not kept, so live data replaces them as soon as Yahoo answers again
+    """
+    return RevalidatingCache(_fetch_stock_data, QUOTE_TTL_SECONDS, MAX_STALE_SECONDS,
+                             flights=stock_data_flights(), max_entries=512,
+                             cacheable=lambda data: data is not None and not data['degraded'])
+
+def get_stock_data_revalidating(ticker):
+    """get_stock_data in stale-while-revalidate mode: (data, age in seconds when stale else None)"""
+    try:
+        cached = stock_data_cache().get(ticker)
+    except Exception as e:
+        st.error(f"Error fetching data for {ticker}: {str(e)}")
+        return None, None
+    return _copy_stock_data(cached.value), (cached.age if cached.stale else None)
+
+# Expiry comes from freshness_key (5 minutes while the market trades, until the next open
+# once it's closed); the ttl only evicts entries nobody has asked for in a day
+@st.cache_data(ttl=24 * 60 * 60, max_entries=512)
+def get_stock_data(ticker, freshness_key=None):
     """Fetch comprehensive stock data using yfinance"""
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        hist = stock.history(period="1y")
-        
-        if hist.empty:
-            return None
-            
-        # Don't cache the stock object itself, just the data we need
-        return {
-            'info': dict(info),  # Convert to regular dict
-            'history': hist,
-            'current_price': float(hist['Close'].iloc[-1]),
-            'company_name': info.get('longName', f"{ticker} Corp")
-        }
+        return fetch_stock_data(ticker)
     except Exception as e:
         st.error(f"Error fetching data for {ticker}: {str(e)}")
         return None
 
 def calculate_technical_indicators(hist):
-    """Calculate technical indicators"""
-    # Moving averages
-    hist['SMA_9'] = hist['Close'].rolling(window=9).mean()
-    hist['SMA_50'] = hist['Close'].rolling(window=50).mean()
-    hist['SMA_200'] = hist['Close'].rolling(window=200).mean()
-    
-    # RSI
-    delta = hist['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    hist['RSI'] = 100 - (100 / (1 + rs))
-    
-    # MACD
-    exp1 = hist['Close'].ewm(span=12).mean()
-    exp2 = hist['Close'].ewm(span=26).mean()
-    hist['MACD'] = exp1 - exp2
-    hist['MACD_Signal'] = hist['MACD'].ewm(span=9).mean()
-    
-    # Bollinger Bands
-    hist['BB_Middle'] = hist['Close'].rolling(window=20).mean()
-    bb_std = hist['Close'].rolling(window=20).std()
-    hist['BB_Upper'] = hist['BB_Middle'] + (bb_std * 2)
-    hist['BB_Lower'] = hist['BB_Middle'] - (bb_std * 2)
-    
-    # Ichimoku Cloud
-    high_9 = hist['High'].rolling(window=9).max()
-    low_9 = hist['Low'].rolling(window=9).min()
-    hist['Tenkan_sen'] = (high_9 + low_9) / 2
-    
-    high_26 = hist['High'].rolling(window=26).max()
-    low_26 = hist['Low'].rolling(window=26).min()
-    hist['Kijun_sen'] = (high_26 + low_26) / 2
-    
-    hist['Senkou_span_A'] = ((hist['Tenkan_sen'] + hist['Kijun_sen']) / 2).shift(26)
-    
-    high_52 = hist['High'].rolling(window=52).max()
-    low_52 = hist['Low'].rolling(window=52).min()
-    hist['Senkou_span_B'] = ((high_52 + low_52) / 2).shift(26)
-    
-    hist['Chikou_span'] = hist['Close'].shift(-26)
-    
-    # Stochastic Oscillator (5-day period as requested)
-    # %K (Fast Stochastic) - 5 period
-    lowest_low_5 = hist['Low'].rolling(window=5).min()
-    highest_high_5 = hist['High'].rolling(window=5).max()
-    hist['Stoch_K'] = 100 * ((hist['Close'] - lowest_low_5) / (highest_high_5 - lowest_low_5))
-    
-    # %D (Slow Stochastic) - 3 period SMA of %K
-    hist['Stoch_D'] = hist['Stoch_K'].rolling(window=3).mean()
-    
-    return hist
+    """
+    Copy of hist with every indicator column (SMA, RSI, MACD, Bollinger, Ichimoku, Stochastic);
+    the page itself reads indicators lazily through graph_for()
+    """
+    return add_indicator_columns(hist)
 
 def calculate_intrinsic_value(info, current_price):
     """Calculate intrinsic value using multiple methods"""
@@ -523,18 +476,18 @@ def calculate_intrinsic_value(info, current_price):
     except:
         return current_price
 
-def get_recommendation(hist, info, current_price, intrinsic_value):
-    """Generate buy/sell/hold recommendation"""
+def get_recommendation(latest, info, current_price, intrinsic_value):
+    """Generate buy/sell/hold recommendation from the latest indicator values (RECOMMENDATION_FIELDS)"""
     try:
         # Get latest values
-        rsi = hist['RSI'].iloc[-1]
-        sma_9 = hist['SMA_9'].iloc[-1]
-        sma_50 = hist['SMA_50'].iloc[-1]
-        sma_200 = hist['SMA_200'].iloc[-1]
-        macd = hist['MACD'].iloc[-1]
-        macd_signal = hist['MACD_Signal'].iloc[-1]
-        stoch_k = hist['Stoch_K'].iloc[-1]
-        stoch_d = hist['Stoch_D'].iloc[-1]
+        rsi = latest['rsi']
+        sma_9 = latest['sma_9']
+        sma_50 = latest['sma_50']
+        sma_200 = latest['sma_200']
+        macd = latest['macd']
+        macd_signal = latest['macd_signal']
+        stoch_k = latest['stoch_k']
+        stoch_d = latest['stoch_d']
         
         # Score calculation
         score = 0
@@ -825,7 +778,7 @@ def main():
     st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666;">AI-Powered Stock Research & Analysis Tool</p>', unsafe_allow_html=True)
     
     # Load stock data
-    stock_data = load_stock_data()
+    search_index = load_search_index()
     
     # Sidebar
     with st.sidebar:
@@ -842,10 +795,7 @@ def main():
         dropdown_options = []
         for ticker in popular_tickers:
             # Find company name in stock data
-            company_name = ticker  # fallback
-            matching_row = stock_data[stock_data['ticker'] == ticker]
-            if not matching_row.empty:
-                company_name = matching_row.iloc[0]['company_name']
+            company_name = search_index.company_name(ticker, ticker)
             dropdown_options.append(f"{ticker} - {company_name}")
         
         # Stock ticker selection
@@ -884,21 +834,14 @@ def main():
         
         if search_input and len(search_input.strip()) > 0:
             # Simple search - find matches in ticker or company name
-            query = search_input.strip().upper()
-            matches = []
-            
-            for _, row in stock_data.iterrows():
-                ticker_match = query in row['ticker'].upper()
-                company_match = query in row['company_name'].upper()
-                
-                if ticker_match or company_match:
-                    matches.append({
-                        'ticker': row['ticker'],
-                        'company': row['company_name']
-                    })
+            # The session narrows the previous query's candidates as the user keeps typing
+            session = st.session_state.get('search_session')
+            if session is None or session.index is not search_index:
+                session = SearchSession(search_index)
+                st.session_state.search_session = session
             
             # Limit to first 8 matches
-            matches = matches[:8]
+            matches = session.search(search_input, max_results=8)
             
             if matches:
                 st.markdown("**� Possible matches:**")
@@ -919,9 +862,28 @@ def main():
                         st.session_state.selected_ticker = ticker
                         st.rerun()
             elif len(search_input.strip()) > 2:
+                # Offer typo corrections before trying an unknown symbol upstream
+                suggestions = search_index.fuzzy_search(search_input, max_results=5)
+                
                 # Check if it looks like a valid ticker
                 cleaned_search = clean_ticker(search_input)
-                if validate_ticker(cleaned_search):
+                if suggestions:
+                    st.markdown("**🔍 Did you mean:**")
+                    
+                    for i, suggestion in enumerate(suggestions):
+                        display_text = suggestion['display']
+                        if len(display_text) > 50:
+                            display_text = display_text[:47] + "..."
+                        
+                        if st.button(
+                            display_text,
+                            key=f"fuzzy_{i}_{suggestion['ticker']}",
+                            use_container_width=True
+                        ):
+                            ticker = suggestion['ticker']
+                            st.session_state.selected_ticker = ticker
+                            st.rerun()
+                elif validate_ticker(cleaned_search):
                     st.info(f"💡 **{cleaned_search}** looks like a ticker symbol")
                     if st.button(f"Analyze {cleaned_search}", use_container_width=True):
                         ticker = cleaned_search
@@ -935,6 +897,9 @@ def main():
             ticker = dropdown_ticker
             st.session_state.selected_ticker = dropdown_ticker
         
+        # Fetch with the provider's spelling (BRK.B -> BRK-B, BTCUSD -> BTC-USD)
+        ticker = canonical_symbol(ticker)
+
         # Display current selection
         if ticker:
             st.markdown("---")
@@ -947,11 +912,8 @@ def main():
         
         if ticker:
             # Get company name for context
-            try:
-                temp_stock = yf.Ticker(ticker)
-                company_name = temp_stock.info.get('longName', ticker)
-            except:
-                company_name = ticker
+            # Name from the local universe; the main content's get_stock_data is the only fetch
+            company_name = search_index.company_name(ticker, ticker)
             
             # Simple, reliable copy solution
             analysis_text = f"Analyze {ticker} ({company_name}) stock ticker for smart investing decisions"
@@ -1009,8 +971,28 @@ def main():
     # Main content
     if ticker:
         # Fetch stock data
+        stale_age = None
         with st.spinner(f'Fetching data for {ticker}...'):
-            stock_data_obj = get_stock_data(ticker)
+            if STALE_WHILE_REVALIDATE:
+                stock_data_obj, stale_age = get_stock_data_revalidating(ticker)
+            else:
+                # Degraded results fetched while the breaker was open are keyed apart from live ones
+                breaker = default_provider().breaker
+                live = breaker is None or breaker.state == CLOSED
+                stock_data_obj = get_stock_data(ticker, (freshness_policy().cache_key(ticker, QUOTE_TTL_SECONDS), live))
+        
+        if stock_data_obj and stale_age is not None:
+            st.caption(f"🕒 Showing data from {format_age(stale_age)} ago; refreshing in the background.")
+        
+        # While Yahoo is failing the breaker answers at once and the last stored data is shown
+        breaker = default_provider().breaker
+        if stock_data_obj and stock_data_obj['degraded']:
+            as_of = stock_data_obj['as_of']
+            age = f" from {format_age(datetime.now().timestamp() - as_of)} ago" if as_of else ""
+            status = breaker.describe() if breaker is not None else "Live data is unavailable"
+            st.warning(f"⚡ {status}. Showing cached data{age}.")
+        elif breaker is not None and breaker.state != CLOSED:
+            st.warning(f"⚡ {breaker.describe()}.")
         
         if stock_data_obj:
             info = stock_data_obj['info']
@@ -1018,14 +1000,14 @@ def main():
             current_price = stock_data_obj['current_price']
             company_name = stock_data_obj['company_name']
             
-            # Calculate technical indicators
-            hist = calculate_technical_indicators(hist)
+            # Technical indicators are evaluated lazily: each view below pays only for what it reads
+            indicators = graph_for(hist)
             
             # Calculate intrinsic value
             intrinsic_value = calculate_intrinsic_value(info, current_price)
             
             # Get recommendation
-            recommendation, rec_color, signals, score = get_recommendation(hist, info, current_price, intrinsic_value)
+            recommendation, rec_color, signals, score = get_recommendation(indicators.latest(RECOMMENDATION_FIELDS), info, current_price, intrinsic_value)
             
             # Stock header card
             st.markdown(f"""
@@ -1071,7 +1053,7 @@ def main():
                 )
             
             with col4:
-                rsi = hist['RSI'].iloc[-1]
+                rsi = indicators.last('rsi')
                 st.metric(
                     "RSI (14)",
                     f"{rsi:.1f}"
@@ -1081,26 +1063,26 @@ def main():
             st.header("📊 Technical Analysis")
             
             # Price chart
-            price_chart = create_price_chart(hist, ticker)
+            price_chart = create_price_chart(indicators.add_columns(hist, CHART_FIELDS['price']), ticker)
             st.plotly_chart(price_chart, use_container_width=True)
             
             # Indicator charts
             col1, col2 = st.columns(2)
             
             with col1:
-                rsi_chart = create_indicators_chart(hist)
+                rsi_chart = create_indicators_chart(indicators.add_columns(hist, CHART_FIELDS['rsi']))
                 st.plotly_chart(rsi_chart, use_container_width=True)
             
             with col2:
-                macd_chart = create_macd_chart(hist)
+                macd_chart = create_macd_chart(indicators.add_columns(hist, CHART_FIELDS['macd']))
                 st.plotly_chart(macd_chart, use_container_width=True)
             
             # Stochastic chart (smaller, full width)
-            stochastic_chart = create_stochastic_chart(hist)
+            stochastic_chart = create_stochastic_chart(indicators.add_columns(hist, CHART_FIELDS['stochastic']))
             st.plotly_chart(stochastic_chart, use_container_width=True)
             
             # Ichimoku Cloud chart (full width)
-            ichimoku_chart = create_ichimoku_chart(hist, ticker)
+            ichimoku_chart = create_ichimoku_chart(indicators.add_columns(hist, CHART_FIELDS['ichimoku']), ticker)
             st.plotly_chart(ichimoku_chart, use_container_width=True)
             
             # Analysis section
@@ -1160,6 +1142,10 @@ def main():
         
         else:
             st.error(f"Could not fetch data for ticker: {ticker}. Please check the symbol and try again.")
+            bad_entry = shared_negative_cache().get(ticker)
+            if bad_entry:
+                st.caption(f"🚫 {ticker} is cached as having no data ({bad_entry['reason']}); "
+                           f"{shared_negative_cache().avoided_requests} repeat requests skipped so far.")
     
     else:
         # Show default content when no valid ticker is selected
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Symbol Canonicalization
+Maps every spelling of a symbol to the one Yahoo Finance actually serves.
+
+The universe mixes BRK.B (old defaults), BRK-B (fetch_all_tickers.py) and BTC-USD, and
+a wrong form makes Yahoo answer with an empty history after a full round trip. Yahoo's
+conventions are:
+  - share classes use a hyphen:          BRK.B, BRK/B, BRK B -> BRK-B
+  - exchange suffixes keep their dot:    CVV.TO, VOD.L, 7203.T
+  - crypto pairs are COIN-FIAT:          BTCUSD, BTC/USD, XBT-USD -> BTC-USD
+  - a few well-known index names:        SPX -> ^GSPC, VIX -> ^VIX
+
+canonical_symbol() is applied before every fetch. canonicalize_universe() is the
+vectorized version the ticker fetch scripts run over the whole universe at build time.
+
+Usage: python symbols.py [stock_data.csv]   (canonicalizes the file in place)
+"""
+
+import re
+import string
+import sys
+from functools import lru_cache
+
+# Dot suffixes Yahoo uses for non-US listings; these must keep their dot
+EXCHANGE_SUFFIXES = {
+    'TO', 'V', 'CN', 'NE',                     # Canada
+    'L', 'IL', 'AS', 'PA', 'DE', 'F', 'MI', 'MC', 'SW', 'BR', 'LS', 'VI', 'IR',
+    'ST', 'OL', 'CO', 'HE', 'WA', 'PR', 'AT', 'IS',
+    'T', 'HK', 'SS', 'SZ', 'KS', 'KQ', 'TW', 'TWO', 'SI', 'NS', 'BO', 'JK', 'BK', 'KL',
+    'AX', 'NZ', 'SA', 'MX', 'BA', 'SN', 'JO', 'TA', 'SR', 'QA',
+}
+
+# Share class letters: any single letter that isn't an exchange suffix above
+SHARE_CLASSES = set(string.ascii_uppercase) - EXCHANGE_SUFFIXES
+
+# Crypto bases and the fiat quotes Yahoo lists them against
+CRYPTO_BASES = {'BTC', 'ETH', 'SOL', 'XRP', 'ADA', 'DOGE', 'LTC', 'BCH', 'DOT', 'AVAX',
+                'LINK', 'MATIC', 'SHIB', 'BNB', 'XLM', 'UNI', 'ATOM', 'ETC', 'TRX', 'USDT', 'USDC'}
+CRYPTO_QUOTES = {'USD', 'EUR', 'GBP', 'CAD', 'JPY', 'AUD'}
+
+# Explicit aliases -> provider symbol. Bare "BTC" is deliberately absent: it's a listed ETF
+SYMBOL_ALIASES = {
+    'XBT-USD': 'BTC-USD',
+    'XBTUSD': 'BTC-USD',
+    'BITCOIN': 'BTC-USD',
+    'ETHEREUM': 'ETH-USD',
+    'SPX': '^GSPC',
+    'GSPC': '^GSPC',
+    'NDX': '^NDX',
+    'DJI': '^DJI',
+    'DJIA': '^DJI',
+    'VIX': '^VIX',
+    'RUT': '^RUT',
+}
+
+_SEPARATORS = re.compile(r'\s*[./ ]\s*|\s*-\s*')
+_CRYPTO_PATTERN = re.compile(
+    r'^(' + '|'.join(sorted(CRYPTO_BASES, key=len, reverse=True)) + r')[-/. ]?('
+    + '|'.join(sorted(CRYPTO_QUOTES)) + r')$')
+
+
+@lru_cache(maxsize=4096)
+def canonical_symbol(symbol):
+    """Provider (Yahoo) symbol for any alias; unknown shapes come back upper-cased"""
+    if not symbol:
+        return ""
+    symbol = str(symbol).strip().upper()
+
+    alias = SYMBOL_ALIASES.get(symbol)
+    if alias:
+        return alias
+
+    match = _CRYPTO_PATTERN.match(symbol)
+    if match:
+        return f"{match.group(1)}-{match.group(2)}"
+
+    # Indices, currencies (EURUSD=X) and futures (GC=F) are already provider symbols
+    if symbol.startswith('^') or '=' in symbol:
+        return symbol
+
+    parts = [part for part in _SEPARATORS.split(symbol) if part]
+    if len(parts) == 2:
+        base, suffix = parts
+        if suffix in EXCHANGE_SUFFIXES:
+            return f"{base}.{suffix}"
+        if suffix in SHARE_CLASSES:
+            return f"{base}-{suffix}"
+    return symbol
+
+
+def canonicalize_series(symbols):
+    """
+    Vectorized canonical_symbol over a pandas Series of symbols
+    Pure string ops on the whole column; only explicit aliases go through a lookup
+    """
+    symbols = symbols.astype(str).str.strip().str.upper().replace(SYMBOL_ALIASES)
+
+    crypto = symbols.str.extract(_CRYPTO_PATTERN)
+    is_crypto = crypto[0].notna()
+    canonical = symbols.where(~is_crypto, crypto[0] + '-' + crypto[1])
+
+    # BASE<sep>SUFFIX with one separator: exchange suffixes take '.', classes take '-'
+    pieces = canonical.str.extract(r'^([^./ -]+)\s*[./ -]\s*([^./ -]+)$')
+    is_provider = canonical.str.startswith('^') | canonical.str.contains('=', regex=False)
+    is_pair = pieces[0].notna() & ~is_crypto & ~is_provider
+    is_exchange = is_pair & pieces[1].isin(EXCHANGE_SUFFIXES)
+    is_class = is_pair & pieces[1].isin(SHARE_CLASSES)
+    canonical = canonical.where(~is_exchange, pieces[0] + '.' + pieces[1])
+    canonical = canonical.where(~is_class, pieces[0] + '-' + pieces[1])
+
+    return canonical
+
+
+def _is_placeholder_name(original, canonical, company):
+    """Fetch-script fallbacks like "BRK-B Corporation" / "SPY Fund" carry no information"""
+    first_word = company.str.strip().str.split(' ', n=1).str[0].str.upper()
+    return (first_word == original) | (first_word == canonical) | (company.str.strip() == '')
+
+
+def canonicalize_universe(df, ticker_column='ticker', company_column='company_name'):
+    """
+    Canonicalize a ticker/company DataFrame and drop the duplicates that creates
+    When two spellings collapse into one symbol, a real company name beats a
+    placeholder, then the first row wins. Result is sorted by ticker.
+    """
+    df = df.copy()
+    original = df[ticker_column].astype(str).str.strip().str.upper()
+    df[company_column] = df[company_column].fillna('').astype(str)
+    df[ticker_column] = canonicalize_series(original)
+
+    df['_placeholder'] = _is_placeholder_name(original, df[ticker_column], df[company_column])
+    df = df.sort_values([ticker_column, '_placeholder'], kind='stable')
+    df = df.drop_duplicates(subset=ticker_column, keep='first')
+    return df.drop(columns='_placeholder').reset_index(drop=True)
+
+
+def canonicalize_rows(rows):
+    """canonicalize_universe for the fetch scripts' (ticker, company) row lists"""
+    if not rows:
+        return []
+    import pandas as pd  # Build-time only; the apps just need canonical_symbol()
+    df = pd.DataFrame([(row[0], row[1]) for row in rows], columns=['ticker', 'company_name'])
+    df = canonicalize_universe(df)
+    return list(df.itertuples(index=False, name=None))
+
+
+def main():
+    import pandas as pd
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "stock_data.csv"
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    canonical = canonicalize_universe(df)
+
+    changed = sorted(set(df['ticker'].str.upper()) - set(canonical['ticker']))
+    canonical.to_csv(csv_path, index=False, lineterminator='\r\n')  # Same line endings as csv.writer
+    print(f"🔤 {len(df)} rows -> {len(canonical)} canonical symbols in {csv_path}")
+    if changed:
+        print(f"   Rewritten or merged: {', '.join(changed)}")
+
+
+if __name__ == "__main__":
+    main()
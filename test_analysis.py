@@ -5,19 +5,15 @@ import sys
 import os
 sys.path.append(os.path.dirname(__file__))
 
-from gpt_chat_gui import StockAnalyzerGUI
-import tkinter as tk
+from stock_search import TickerResolver
+from test_stock_search import load_stock_data
 from datetime import datetime
 
 def test_analysis_functionality():
     """Test the analysis functionality without running the GUI"""
     
-    # Create a dummy root (we won't show it)
-    root = tk.Tk()
-    root.withdraw()  # Hide the window
-    
-    # Create the app instance
-    app = StockAnalyzerGUI(root)
+    # Same resolver the GUI builds from stock_data.csv
+    resolver = TickerResolver.from_records(load_stock_data())
     
     # Test ticker resolution
     print("Testing ticker resolution:")
@@ -26,8 +22,8 @@ def test_analysis_functionality():
     test_inputs = ['T', 'AT&T', 'TMUS', 'T-MOBILE', 'TMOBILE', 'UUUU', 'ENERGY FUELS', 'AAPL', 'TESLA', 'MSFT']
     
     for input_text in test_inputs:
-        resolved_ticker = app.find_ticker_from_company_name(input_text)
-        company_name = app.get_company_name_from_ticker(resolved_ticker)
+        resolved_ticker = resolver.resolve(input_text)
+        company_name = resolver.company_name(resolved_ticker, f"Unknown Company ({resolved_ticker})")
         print(f"Input: {input_text:8} -> Ticker: {resolved_ticker:6} -> Company: {company_name}")
     
     # Test the analysis header format
@@ -35,7 +31,7 @@ def test_analysis_functionality():
     print("-" * 40)
     
     ticker = 'T'
-    company_name = app.get_company_name_from_ticker(ticker)
+    company_name = resolver.company_name(ticker)
     current_price = 23.45  # Example price
     
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -45,9 +41,6 @@ def test_analysis_functionality():
     print(f"Stock info header: 📊 {ticker} ({company_name}) - ${current_price:.2f} | Updated: {timestamp}")
     
     print("\nTest completed successfully!")
-    
-    # Clean up
-    root.destroy()
 
 if __name__ == "__main__":
     test_analysis_functionality()
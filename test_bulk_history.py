@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Test bulk history downloads: chunking, the panel, store and negative cache"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pandas as pd
+
+from bench_bulk_history import SimulatedBulkYahoo
+from bulk_history import BulkHistoryDownloader, ChunkDownloadError, download_each, to_panel
+from circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from history_store import HistoryStore, slice_period
+from market_data import YahooProvider, is_degraded
+from negative_cache import NegativeCache
+
+def make_downloader(directory, upstream, **kwargs):
+    store = HistoryStore(os.path.join(directory, 'history'))
+    negative = NegativeCache(os.path.join(directory, 'negative.json'))
+    return BulkHistoryDownloader(upstream, store=store, negative_cache=negative, **kwargs)
+
+def test_chunks_panel_and_store():
+    """250 symbols in chunks of 100 = 3 chunks of per-symbol requests; every symbol lands in the store"""
+    directory = tempfile.mkdtemp()
+    try:
+        upstream = SimulatedBulkYahoo(years=2)
+        symbols = [f"SYM{i}" for i in range(250)]
+        downloader = make_downloader(directory, upstream.download_chunk, chunk_size=100)
+
+        panel = downloader.download(symbols + ['sym0'], '1y')  # duplicates fold into one
+        assert sorted(len(chunk) for chunk in upstream.chunks) == [50, 100, 100] and len(upstream.calls) == 250
+        assert list(panel.columns[:7]) == ['Symbol', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+        assert list(panel['Symbol'].unique()) == symbols
+        expected = slice_period(upstream.bars('SYM7'), '1y')
+        rows = panel[panel['Symbol'] == 'SYM7']
+        assert np.allclose(rows['Close'].to_numpy(), expected['Close'].to_numpy())
+
+        stored = downloader.store.load('SYM7')
+        assert len(stored) == len(expected) and stored.attrs['covered_from'] != 'max'
+
+        # Everything is fresh now: no requests the second time
+        again = downloader.download(symbols, '6mo')
+        assert len(upstream.chunks) == 3 and downloader.from_store == 250
+        assert again['Symbol'].nunique() == 250
+        assert to_panel({}).empty
+        print("✅ Chunked requests, a tidy panel, and a warm store on the second call")
+    finally:
+        shutil.rmtree(directory)
+
+def test_parallelism_is_bounded():
+    directory = tempfile.mkdtemp()
+    try:
+        upstream = SimulatedBulkYahoo(latency_ms=50, years=2)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def tracked(symbols, period):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                return upstream.download_chunk(symbols, period)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        downloader = make_downloader(directory, tracked, chunk_size=10, max_workers=3)
+        downloader.download([f"SYM{i}" for i in range(90)], '1y')
+        assert downloader.requests == 9 and peak[0] == 3
+        print("✅ 9 chunks, at most 3 in flight")
+    finally:
+        shutil.rmtree(directory)
+
+def test_empty_symbols_and_failed_requests():
+    """Symbols with no bars go into the negative cache; a failed request doesn't"""
+    directory = tempfile.mkdtemp()
+    try:
+        upstream = SimulatedBulkYahoo(years=2)
+
+        def partial(symbols, period):
+            histories = upstream.download_chunk(symbols, period)
+            histories['NOPE'] = pd.DataFrame()
+            return histories
+
+        downloader = make_downloader(directory, partial)
+        panel = downloader.download(['AAPL', 'NOPE'], '1y')
+        assert list(panel['Symbol'].unique()) == ['AAPL']
+        assert downloader.negative_cache.get('NOPE') is not None
+
+        downloader.download(['NOPE'], '1y')
+        assert downloader.skipped == 1 and len(upstream.chunks) == 1
+
+        def broken(symbols, period):
+            raise ConnectionError("timed out")
+
+        downloader = make_downloader(directory, broken)
+        assert downloader.download(['MSFT'], '1y').empty
+        assert downloader.negative_cache.get('MSFT') is None
+        assert len(downloader.errors) == 1 and isinstance(downloader.errors[0], ConnectionError)
+
+        # AAPL is stored (stale now): a failed request serves it, marked degraded
+        downloader = BulkHistoryDownloader(broken, store=HistoryStore(os.path.join(directory, 'history'),
+                                                                      refresh_seconds=0),
+                                           negative_cache=NegativeCache(os.path.join(directory, 'negative.json')))
+        histories = downloader.histories(['AAPL', 'MSFT'], '6mo')
+        assert list(histories) == ['AAPL'] and downloader.degraded == 1
+        assert is_degraded(histories['AAPL']) and histories['AAPL'].attrs['as_of'] is not None
+        assert len(histories['AAPL']) == len(slice_period(upstream.bars('AAPL'), '6mo'))
+        print("✅ Empty symbols are remembered, failed requests are not and fall back to the store")
+    finally:
+        shutil.rmtree(directory)
+
+def test_download_each_tells_missing_symbols_from_outages():
+    from yfinance.exceptions import YFPricesMissingError, YFTzMissingError
+    bars = pd.DataFrame({'Close': [1.0]})
+
+    def fetch(symbol):
+        if symbol == 'GONE':
+            raise YFTzMissingError(symbol)
+        if symbol == 'NOPE':
+            raise YFPricesMissingError(symbol, '')
+        if symbol == 'DOWN':
+            raise ConnectionError("timed out")
+        return bars
+
+    histories = download_each(['AAPL', 'GONE', 'NOPE'], fetch)
+    assert list(histories) == ['AAPL', 'GONE', 'NOPE'] and histories['NOPE'].empty
+    try:
+        download_each(['AAPL', 'DOWN', 'MSFT'], fetch)
+        assert False, "an outage must not look like missing data"
+    except ChunkDownloadError as error:
+        assert error.symbol == 'DOWN' and isinstance(error.error, ConnectionError)
+        assert list(error.histories) == ['AAPL']  # MSFT was never asked for
+    print("✅ Missing symbols come back empty; any other error stops the chunk")
+
+def test_requests_within_a_chunk_run_concurrently():
+    """download_each() keeps threads requests in flight and starts no new ones after an outage"""
+    active, peak, started = [0], [0], []
+    lock = threading.Lock()
+
+    def fetch(symbol):
+        with lock:
+            started.append(symbol)
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            time.sleep(0.02)
+            if symbol == 'SYM5':
+                raise ConnectionError("timed out")
+            return pd.DataFrame({'Close': [1.0]})
+        finally:
+            with lock:
+                active[0] -= 1
+
+    symbols = [f"SYM{i}" for i in range(40)]
+    histories = download_each(symbols[10:22], fetch, threads=4)
+    assert list(histories) == symbols[10:22] and peak[0] == 4
+    started.clear()
+    try:
+        download_each(symbols, fetch, threads=4)
+        assert False, "the outage must fail the chunk"
+    except ChunkDownloadError as error:
+        assert error.symbol == 'SYM5' and 'SYM5' not in error.histories
+        assert len(started) < len(symbols) and set(error.histories) < set(started)
+    print("✅ 4 requests in flight per chunk; an outage stops the rest of the chunk")
+
+def test_outage_is_not_negative_cached():
+    """yfinance failing for every symbol trips the breaker and caches nothing as missing"""
+    import yfinance as yf
+    from yfinance.exceptions import YFPricesMissingError
+    directory = tempfile.mkdtemp()
+    history = yf.Ticker.history
+    down = [True]
+
+    def patched(ticker, period=None, **kwargs):
+        if down[0]:
+            raise ConnectionError("Yahoo is down")
+        if ticker.ticker == 'NOPE':
+            raise YFPricesMissingError(ticker.ticker, '')
+        return slice_period(SimulatedBulkYahoo(years=2).bars(ticker.ticker), period)
+
+    yf.Ticker.history = patched
+    try:
+        negative = NegativeCache(os.path.join(directory, 'negative.json'))
+        store = HistoryStore(os.path.join(directory, 'history'), refresh_seconds=0)
+        breaker = CircuitBreaker("Test", failure_threshold=2)
+        provider = YahooProvider(negative, store, breaker=breaker)
+
+        symbols = ['AAPL', 'MSFT', 'NVDA']
+        assert provider.fetch_histories(symbols) == {}
+        assert isinstance(breaker.last_error, ChunkDownloadError)
+        assert all(negative.get(symbol) is None for symbol in symbols)
+        provider.fetch_histories(symbols)
+        assert breaker.state == OPEN
+
+        # Back up: data flows, and only a symbol yfinance calls missing is remembered
+        down[0] = False
+        breaker.reset_seconds = 0
+        histories = provider.fetch_histories(symbols + ['NOPE'])
+        assert list(histories) == symbols and breaker.state == CLOSED
+        assert negative.get('NOPE') is not None and negative.get('AAPL') is None
+
+        # Down again: stored bars are served, marked degraded
+        down[0] = True
+        histories = provider.fetch_histories(symbols)
+        assert list(histories) == symbols and all(is_degraded(hist) for hist in histories.values())
+        print("✅ An outage trips the breaker and falls back to the store; nothing is cached as missing")
+    finally:
+        yf.Ticker.history = history
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    test_chunks_panel_and_store()
+    test_parallelism_is_bounded()
+    test_empty_symbols_and_failed_requests()
+    test_download_each_tells_missing_symbols_from_outages()
+    test_requests_within_a_chunk_run_concurrently()
+    test_outage_is_not_negative_cached()
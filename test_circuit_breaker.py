@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Test the circuit breaker and the provider's cached fallback while Yahoo is down"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+sys.path.append(os.path.dirname(__file__))
+
+from bench_history_store import SimulatedYahoo
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from fundamentals_cache import FundamentalsCache
+from history_store import HistoryStore
+from market_calendar import FreshnessPolicy
+from market_data import BREAKER_RETRIES, BREAKER_TIMEOUT_SECONDS, YahooProvider
+from negative_cache import NegativeCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class FlakyUpstream(SimulatedYahoo):
+    """SimulatedYahoo that can be switched off; counts the calls that reached it"""
+
+    def __init__(self):
+        super().__init__()
+        self.down = False
+        self.attempts = 0
+
+    def ticker(self, symbol):
+        upstream = self
+
+        class Ticker:
+            def history(self, period=None, start=None, raise_errors=False):
+                upstream.attempts += 1
+                if upstream.down:
+                    raise ConnectionError("Yahoo is down")
+                return upstream.download(symbol, period=period, start=start)
+
+            @property
+            def info(self):
+                upstream.attempts += 1
+                if upstream.down:
+                    raise ConnectionError("Yahoo is down")
+                return {'longName': f"{symbol} Inc", 'currentPrice': 100.0, 'forwardPE': 20.0}
+
+        return Ticker()
+
+class FlakyProvider(YahooProvider):
+    def __init__(self, upstream, directory, breaker):
+        super().__init__(NegativeCache(os.path.join(directory, 'negative.json')),
+                         HistoryStore(os.path.join(directory, 'history'), refresh_seconds=0),
+                         FundamentalsCache(os.path.join(directory, 'fundamentals'),
+                                           ttls={'quote': 0, 'fundamentals': 0},
+                                           policy=FreshnessPolicy(market_hours=False)),
+                         breaker=breaker)
+        self.upstream = upstream
+
+    def _ticker(self, symbol):
+        return self.upstream.ticker(symbol)
+
+def failing():
+    raise ConnectionError("timed out")
+
+def test_trips_after_consecutive_failures_then_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker("Test", failure_threshold=3, reset_seconds=30, clock=clock)
+    assert breaker.call(lambda: 'ok') == 'ok'
+    for _ in range(2):
+        try:
+            breaker.call(failing)
+        except ConnectionError:
+            pass
+    assert breaker.state == CLOSED
+    assert breaker.call(lambda: 'ok') == 'ok'  # success resets the count
+
+    for _ in range(3):
+        try:
+            breaker.call(failing)
+        except ConnectionError:
+            pass
+    assert breaker.state == OPEN and breaker.trips == 1
+
+    calls = []
+    try:
+        breaker.call(calls.append, 'x')
+        assert False, "an open breaker must not call through"
+    except CircuitOpenError as error:
+        assert calls == [] and error.retry_in == 30
+    assert "checking again in 30s" in breaker.describe()
+
+    # After the timeout one probe goes through; a failed probe reopens at once
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    try:
+        breaker.call(failing)
+    except ConnectionError:
+        pass
+    assert breaker.state == OPEN and breaker.trips == 2
+
+    clock.now += 30
+    assert breaker.call(lambda: 'back') == 'back'
+    assert breaker.state == CLOSED and "connected" in breaker.describe()
+    print("✅ Closed -> open after 3 failures -> half-open probe -> closed")
+
+def test_only_one_probe_at_a_time():
+    clock = FakeClock()
+    breaker = CircuitBreaker("Test", failure_threshold=1, reset_seconds=10, clock=clock)
+    try:
+        breaker.call(failing)
+    except ConnectionError:
+        pass
+    clock.now += 10
+
+    def probe():
+        # While the probe is in flight, everyone else still fails fast
+        try:
+            breaker.call(lambda: 'second')
+            return 'let through'
+        except CircuitOpenError:
+            return 'rejected'
+
+    assert breaker.call(probe) == 'rejected'
+    assert breaker.state == CLOSED and breaker.rejected == 1
+    print("✅ Half-open admits a single probe")
+
+def test_stale_calls_do_not_end_the_probe():
+    """A call that started while closed and finishes during half-open leaves the probe in charge"""
+    clock = FakeClock()
+    breaker = CircuitBreaker("Test", failure_threshold=1, reset_seconds=10, clock=clock)
+    stale_started, release_stale = threading.Event(), threading.Event()
+    probe_started, release_probe = threading.Event(), threading.Event()
+
+    def stale():
+        stale_started.set()
+        release_stale.wait(5)
+        return 'late'
+
+    def probe():
+        probe_started.set()
+        release_probe.wait(5)
+        return 'probe'
+
+    in_flight = threading.Thread(target=breaker.call, args=(stale,))
+    in_flight.start()
+    stale_started.wait(5)
+    try:
+        breaker.call(failing)
+    except ConnectionError:
+        pass
+    clock.now += 10
+    prober = threading.Thread(target=breaker.call, args=(probe,))
+    prober.start()
+    probe_started.wait(5)
+
+    release_stale.set()
+    in_flight.join(5)
+    assert breaker.state == HALF_OPEN
+    try:
+        breaker.call(lambda: 'second')
+        assert False, "a second probe must not get through"
+    except CircuitOpenError:
+        pass
+
+    release_probe.set()
+    prober.join(5)
+    assert breaker.state == CLOSED and breaker.rejected == 1
+    print("✅ A late call finishing during half-open doesn't let a second probe through")
+
+def test_provider_serves_cached_data_while_open():
+    directory = tempfile.mkdtemp()
+    try:
+        clock = FakeClock()
+        upstream = FlakyUpstream()
+        provider = FlakyProvider(upstream, directory, CircuitBreaker("Yahoo Finance", 3, 30, clock))
+
+        live = provider.analysis('AAPL')
+        live_hist = live.history('1y')
+        assert live.info['longName'] == "AAPL Inc" and not live.degraded
+
+        # Yahoo goes down: stored data comes back marked degraded instead of an error
+        upstream.down = True
+        attempts = upstream.attempts
+        for _ in range(4):
+            context = provider.analysis('AAPL')
+            hist = context.history('1y')
+            assert context.info['forwardPE'] == 20.0
+            assert context.degraded and context.degraded_as_of is not None
+            assert len(hist) == len(live_hist)
+        assert provider.breaker.state == OPEN
+        assert upstream.attempts - attempts <= 3  # later calls never reached Yahoo
+
+        # Nothing stored for this symbol: fail fast with the breaker's reason
+        try:
+            provider.analysis('MSFT').history('1y')
+            assert False, "expected the open breaker's error"
+        except CircuitOpenError as error:
+            assert "Yahoo Finance is unavailable" in str(error)
+
+        # Yahoo recovers: the probe goes through and data is live again
+        upstream.down = False
+        clock.now += 30
+        context = provider.analysis('AAPL')
+        context.history('1y')
+        assert context.info and not context.degraded
+        assert provider.breaker.state == CLOSED
+        print("✅ Cached, degraded data while open; live data once the probe succeeds")
+    finally:
+        shutil.rmtree(directory)
+
+class NotFound(Exception):
+    """What yfinance raises for a symbol Yahoo doesn't know: an HTTP error carrying a 404"""
+
+    class response:
+        status_code = 404
+
+def test_unknown_symbols_are_not_outages():
+    directory = tempfile.mkdtemp()
+    try:
+        upstream = FlakyUpstream()
+        provider = FlakyProvider(upstream, directory, CircuitBreaker("Yahoo Finance", 3, 30, FakeClock()))
+
+        class Missing:
+            def history(self, period=None, start=None):
+                raise NotFound("404 Not Found")
+
+            @property
+            def info(self):
+                raise NotFound("404 Not Found")
+
+        provider._ticker = lambda symbol: Missing()
+        for _ in range(5):
+            assert not provider.fetch_info('NOPE')
+            assert provider.fetch_history('NOPE', '1y').empty
+        assert provider.breaker.state == CLOSED
+
+        session = YahooProvider._session(provider)
+        assert (session.retries, session.timeout) == (BREAKER_RETRIES, BREAKER_TIMEOUT_SECONDS)
+        print("✅ Unknown symbols stay out of the breaker; guarded calls use a short retry budget")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    test_trips_after_consecutive_failures_then_probes()
+    test_only_one_probe_at_a_time()
+    test_stale_calls_do_not_end_the_probe()
+    test_provider_serves_cached_data_while_open()
+    test_unknown_symbols_are_not_outages()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Test the per-field-group fundamentals cache"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from fundamentals_cache import FundamentalsCache, field_group, quote_from_fast_info, split_info
+from market_calendar import FreshnessPolicy
+
+INFO = {
+    'currentPrice': 190.5, 'regularMarketPrice': 190.5, 'marketCap': 2.9e12,
+    'forwardPE': 28.1, 'trailingPE': 30.2, 'bookValue': 4.4, 'totalRevenue': 3.9e11, 'dividendYield': float('nan'),
+    'sector': 'Technology', 'industry': 'Consumer Electronics', 'longName': 'Apple Inc.',
+    'longBusinessSummary': 'Apple designs...' * 50, 'fullTimeEmployees': 161000,
+}
+
+class CountingYahoo:
+    def __init__(self):
+        self.info_calls = 0
+        self.quote_calls = 0
+        self.price = 190.5
+
+    def fetch_info(self, symbol):
+        self.info_calls += 1
+        return dict(INFO, currentPrice=self.price, regularMarketPrice=self.price)
+
+    def fetch_quote(self, symbol):
+        self.quote_calls += 1
+        return {'currentPrice': self.price, 'regularMarketPrice': self.price}
+
+def test_field_groups():
+    assert field_group('currentPrice') == 'quote'
+    assert field_group('sector') == 'profile'
+    assert field_group('forwardPE') == 'fundamentals'
+    assert field_group('someFieldYahooAddsLater') == 'fundamentals'
+    groups = split_info(INFO)
+    assert set(groups['quote']) == {'currentPrice', 'regularMarketPrice', 'marketCap'}
+    assert 'longBusinessSummary' in groups['profile'] and 'bookValue' in groups['fundamentals']
+    print("✅ Fields split into quote / fundamentals / profile groups")
+
+def test_only_expired_groups_are_refetched():
+    """Warm hits are free, an expired quote costs a quote, expired fundamentals the full payload"""
+    directory = tempfile.mkdtemp()
+    try:
+        cache = FundamentalsCache(directory, ttls={'quote': 0.05}, policy=FreshnessPolicy(market_hours=False))
+        yahoo = CountingYahoo()
+
+        info = cache.info('aapl', yahoo.fetch_info, yahoo.fetch_quote)
+        assert info['sector'] == 'Technology' and info['forwardPE'] == 28.1
+        assert info['dividendYield'] is None  # NaN doesn't survive JSON
+        assert (yahoo.info_calls, yahoo.quote_calls) == (1, 0)
+
+        assert cache.info('AAPL', yahoo.fetch_info, yahoo.fetch_quote) == info
+        assert (yahoo.info_calls, yahoo.quote_calls, cache.hits) == (1, 0, 1)
+
+        time.sleep(0.1)
+        yahoo.price = 200.0
+        info = cache.info('AAPL', yahoo.fetch_info, yahoo.fetch_quote)
+        assert info['currentPrice'] == 200.0 and info['sector'] == 'Technology'
+        assert info['marketCap'] == 2.9e12  # quote fields the quote didn't carry are kept
+        assert (yahoo.info_calls, yahoo.quote_calls) == (1, 1)
+
+        # Expired fundamentals need the full payload, which refreshes every group
+        cache.ttls['fundamentals'] = 0
+        cache.info('AAPL', yahoo.fetch_info, yahoo.fetch_quote)
+        assert (yahoo.info_calls, yahoo.quote_calls) == (2, 1)
+        assert set(cache.ages('AAPL')) == {'quote', 'fundamentals', 'profile'}
+        print("✅ Only expired field groups are refetched")
+    finally:
+        shutil.rmtree(directory)
+
+def test_empty_info_is_not_cached():
+    directory = tempfile.mkdtemp()
+    try:
+        cache = FundamentalsCache(directory)
+        assert cache.info('ZZZZ', lambda symbol: {}) == {}
+        assert cache.load('ZZZZ') == {}
+        print("✅ Unknown symbols aren't cached")
+    finally:
+        shutil.rmtree(directory)
+
+def test_quote_from_fast_info():
+    class FakeFastInfo(dict):
+        def __getitem__(self, key):
+            if key == 'marketCap':
+                raise KeyError(key)  # yfinance raises for values it can't compute
+            return dict.__getitem__(self, key)
+    quote = quote_from_fast_info(FakeFastInfo(lastPrice=101.0, dayHigh=102.0, yearLow=float('nan'), marketCap=1))
+    assert quote == {'currentPrice': 101.0, 'regularMarketPrice': 101.0, 'dayHigh': 102.0,
+                     'regularMarketDayHigh': 102.0}
+    print("✅ fast_info maps onto the info quote fields")
+
+if __name__ == "__main__":
+    test_field_groups()
+    test_only_expired_groups_are_refetched()
+    test_empty_info_is_not_cached()
+    test_quote_from_fast_info()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Test the on-disk history store: cold fetch, warm hits, delta appends"""
+
+import os
+import shutil
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+import pandas as pd
+
+from bench_history_store import SimulatedYahoo
+from history_store import HistoryStore, slice_period
+
+def make_store(refresh_seconds=300):
+    directory = tempfile.mkdtemp()
+    return directory, HistoryStore(directory, refresh_seconds=refresh_seconds)
+
+def test_cold_then_warm_then_delta():
+    """Warm reads cost nothing, stale reads cost one delta request for the last bar on"""
+    directory, store = make_store()
+    try:
+        upstream = SimulatedYahoo()
+        full = upstream.download('AAPL', period='1y')
+        upstream.calls.clear()
+
+        hist = store.history('AAPL', '1y', upstream.download)
+        pd.testing.assert_frame_equal(hist, full, check_freq=False)
+        assert upstream.calls == [('AAPL', '1y', None)]
+
+        # Shorter periods inside the stored range are hits too
+        hist = store.history('AAPL', '6mo', upstream.download)
+        assert len(upstream.calls) == 1 and store.hits == 1
+        assert hist.index[-1] == full.index[-1] and len(hist) < len(full)
+
+        # Stale: only the bars from the last stored date on are requested
+        store.refresh_seconds = 0
+        last_date = full.index[-1]
+        upstream._frames['AAPL'].loc[last_date, 'Close'] = 123.0  # the partial day settled
+        hist = store.history('AAPL', '1y', upstream.download)
+        assert upstream.calls[-1] == ('AAPL', None, str(last_date.date()))
+        assert store.delta_fetches == 1
+        assert hist['Close'].iloc[-1] == 123.0 and len(hist) == len(full)
+        print("✅ Cold fetch, warm hit, then a one-bar delta")
+    finally:
+        shutil.rmtree(directory)
+
+def test_delta_appends_new_bars():
+    directory, store = make_store(refresh_seconds=0)
+    try:
+        upstream = SimulatedYahoo()
+        bars = upstream.bars('MSFT')
+        upstream._frames['MSFT'] = bars.iloc[:-3]  # the store first sees history three days ago
+        store.history('MSFT', '1y', upstream.download)
+
+        upstream._frames['MSFT'] = bars
+        bars_before = upstream.bars_sent
+        hist = store.history('MSFT', '1y', upstream.download)
+        assert upstream.bars_sent - bars_before == 4  # last stored bar + three new ones
+        pd.testing.assert_frame_equal(hist, slice_period(bars, '1y'), check_freq=False)
+        assert len(store.load('MSFT')) == len(slice_period(bars, '1y'))
+        print("✅ New bars are appended to the stored history")
+    finally:
+        shutil.rmtree(directory)
+
+def test_longer_period_and_corporate_actions_refetch():
+    directory, store = make_store(refresh_seconds=0)
+    try:
+        upstream = SimulatedYahoo()
+        store.history('T', '6mo', upstream.download)
+        store.history('T', '2y', upstream.download)
+        assert [call[1] for call in upstream.calls] == ['6mo', '2y']
+        assert store.load('T').attrs['covered_from'] <= str(pd.Timestamp.now().date())
+
+        # A split in the delta re-adjusts everything: refetch the whole stored range
+        bars = upstream.bars('T')
+        upstream._frames['T'] = pd.concat([bars, bars.iloc[-1:].set_axis(
+            [bars.index[-1] + pd.Timedelta(days=1)])])
+        upstream._frames['T'].iloc[-1, upstream._frames['T'].columns.get_loc('Stock Splits')] = 2.0
+        store.history('T', '1y', upstream.download)
+        assert upstream.calls[-1][2] == store.load('T').attrs['covered_from']
+        assert store.full_fetches == 3 and store.delta_fetches == 1
+        print("✅ Longer periods and splits trigger full fetches")
+    finally:
+        shutil.rmtree(directory)
+
+def test_unknown_symbols_and_corrupt_files():
+    directory, store = make_store()
+    try:
+        empty = lambda symbol, period=None, start=None: pd.DataFrame()
+        assert store.history('ZZZZ', '1y', empty).empty
+        assert store.load('ZZZZ') is None  # nothing stored for empty answers
+
+        with open(store.path_for('AAPL'), 'w') as file:
+            file.write("not a parquet file")
+        upstream = SimulatedYahoo()
+        assert not store.history('AAPL', '1y', upstream.download).empty
+        assert len(upstream.calls) == 1
+        assert store.symbols() == ['AAPL']
+        print("✅ Empty answers aren't stored and corrupt files are refetched")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    test_cold_then_warm_then_delta()
+    test_delta_appends_new_bars()
+    test_longer_period_and_corporate_actions_refetch()
+    test_unknown_symbols_and_corrupt_files()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Test the shared HTTP transport: AIMD token bucket, retries with jitter, Retry-After"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import requests
+from requests.adapters import BaseAdapter
+
+from http_pool import AdaptiveRateLimiter, RateLimitedSession, backoff_delay, retry_after_seconds
+
+class FakeClock:
+    """time.monotonic / time.sleep pair where sleeping just moves the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class ScriptedAdapter(BaseAdapter):
+    """Answers requests from a list of status codes (or exceptions), recording each"""
+
+    def __init__(self, script, headers=None):
+        super().__init__()
+        self.script = list(script)
+        self.headers = headers or {}
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append((request.url, kwargs.get('timeout')))
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response.headers.update(self.headers if outcome != 200 else {})
+        response.url = request.url
+        response.request = request
+        response._content = b'ok'
+        return response
+
+    def close(self):
+        pass
+
+def make_session(script, headers=None, retries=3):
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+    slept = []
+    session = RateLimitedSession(retries=retries, limiter_for=lambda host: limiter, sleep=slept.append)
+    adapter = ScriptedAdapter(script, headers)
+    session.mount('https://', adapter)
+    return session, adapter, limiter, slept
+
+def test_token_bucket_paces_after_the_burst():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(rate=4, burst=2, increase=0, clock=clock, sleep=clock.sleep)
+    waits = [limiter.acquire() for _ in range(6)]
+    assert waits[:2] == [0.0, 0.0]               # the burst
+    assert all(abs(wait - 0.25) < 1e-9 for wait in waits[2:])  # then 4 per second
+    assert abs(clock.now - 1.0) < 1e-9
+    print("✅ Burst, then one token every 1/rate seconds")
+
+def test_aimd_backs_off_and_ramps_up():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(rate=8, increase=0.5, min_rate=1, max_rate=10, clock=clock, sleep=clock.sleep)
+    limiter.on_throttle()
+    limiter.on_throttle()  # same burst of 429s: counted once
+    assert limiter.rate == 4 and limiter.throttles == 1
+    clock.now += 2
+    limiter.on_throttle()
+    assert limiter.rate == 2
+    for _ in range(20):
+        limiter.on_success()
+    assert limiter.rate == 10  # additive increase, capped at max_rate
+    for _ in range(10):
+        clock.now += 2
+        limiter.on_throttle()
+    assert limiter.rate == 1   # floored at min_rate
+    print("✅ Halves on throttling, climbs back linearly on success")
+
+def test_retry_after_pauses_the_host():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(rate=10, burst=5, clock=clock, sleep=clock.sleep)
+    limiter.on_throttle(retry_after=3)
+    assert limiter.acquire() >= 3
+    print("✅ Retry-After holds every caller of the host back")
+
+def test_limiter_converges_to_the_upstream_limit():
+    """An upstream that allows 20 req/s: AIMD ends up oscillating just under it"""
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(rate=2, burst=1, max_rate=100, clock=clock, sleep=clock.sleep)
+    allowed, window = 20, []
+    served = 0
+    while clock.now < 60:
+        limiter.acquire()
+        window = [t for t in window if t > clock.now - 1] + [clock.now]
+        if len(window) > allowed:
+            limiter.on_throttle()
+        else:
+            limiter.on_success()
+            if clock.now >= 30:
+                served += 1
+    throughput = served / (clock.now - 30)
+    assert 0.5 * allowed < throughput <= allowed, throughput
+    print(f"✅ Settles at {throughput:.1f} req/s against a 20 req/s limit (fixed sleep 0.1s: 10)")
+
+def test_session_retries_throttled_and_failed_requests():
+    session, adapter, limiter, slept = make_session([429, 503, requests.ConnectionError("reset"), 200])
+    response = session.get('https://query2.finance.yahoo.com/v8/finance/chart/AAPL')
+    assert response.status_code == 200 and response.text == 'ok'
+    assert len(adapter.sent) == 4 and session.retried == 3
+    assert adapter.sent[0][1] == session.timeout  # a default timeout, so nothing hangs forever
+    assert len(slept) == 3 and limiter.throttles >= 1
+    print("✅ 429, 503 and a dropped connection are retried")
+
+def test_session_gives_up_and_returns_the_last_answer():
+    session, adapter, limiter, slept = make_session([500, 500, 500], retries=2)
+    response = session.get('https://api.nasdaq.com/api/screener/stocks')
+    assert response.status_code == 500 and session.failures == 1 and len(adapter.sent) == 3
+
+    session, adapter, limiter, slept = make_session([404])
+    assert session.get('https://www.sec.gov/missing').status_code == 404
+    assert len(adapter.sent) == 1 and session.retried == 0  # client errors aren't retried
+    print("✅ Persistent failures are returned after the retry budget; 404 isn't retried")
+
+def test_retry_after_header_and_jitter():
+    session, adapter, limiter, slept = make_session([429, 200], headers={'Retry-After': '2'})
+    session.get('https://query1.finance.yahoo.com/')
+    assert limiter.waited >= 2
+
+    response = requests.Response()
+    response.headers['Retry-After'] = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    assert retry_after_seconds(response) == 0.0  # dates in the past mean "now"
+    delays = [backoff_delay(3) for _ in range(200)]
+    assert all(0 <= delay <= 4.0 for delay in delays) and len(set(delays)) > 100
+    print("✅ Retry-After is honoured and backoff is jittered")
+
+if __name__ == "__main__":
+    test_token_bucket_paces_after_the_burst()
+    test_aimd_backs_off_and_ramps_up()
+    test_retry_after_pauses_the_host()
+    test_limiter_converges_to_the_upstream_limit()
+    test_session_retries_throttled_and_failed_requests()
+    test_session_gives_up_and_returns_the_last_answer()
+    test_retry_after_header_and_jitter()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Test the NumPy indicator engine against the pandas implementation it replaced"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pandas as pd
+
+from bench_indicators import pandas_indicators, synthetic_bars
+from indicators import (CHART_FIELDS, COLUMNS, NODES, RECOMMENDATION_FIELDS, IndicatorGraph, add_indicator_columns,
+                        bars_needed, compute, ewm_mean, from_history, graph_for)
+from rolling_extrema import rolling_extremes
+
+def assert_matches_pandas(hist):
+    expected = pandas_indicators(hist.copy())
+    result = from_history(hist)
+    for name, column in COLUMNS.items():
+        np.testing.assert_allclose(getattr(result, name), expected[column].to_numpy(), rtol=1e-9, atol=1e-9,
+                                   equal_nan=True, err_msg=column)
+
+def test_matches_pandas_on_long_and_short_series():
+    for bars in (7560, 252, 60, 30, 10, 1):
+        assert_matches_pandas(synthetic_bars(bars, seed=bars))
+    print("✅ Every indicator matches pandas, warm-up NaNs included, from 1 to 7560 bars")
+
+def test_flat_prices_and_gaps():
+    """Flat stretches (0/0 in RSI and Stochastic) and missing closes behave like pandas"""
+    hist = synthetic_bars(300, seed=3)
+    hist.iloc[100:130, hist.columns.get_indexer(['High', 'Low', 'Close'])] = 50.0
+    assert_matches_pandas(hist)
+    hist.iloc[200, hist.columns.get_indexer(['Close'])] = np.nan
+    expected = pandas_indicators(hist.copy())
+    result = from_history(hist)
+    for name in ('macd', 'macd_signal', 'sma_9', 'bb_upper', 'stoch_k', 'stoch_d', 'rsi'):
+        np.testing.assert_allclose(getattr(result, name), expected[COLUMNS[name]].to_numpy(), rtol=1e-9,
+                                   atol=1e-9, equal_nan=True, err_msg=name)
+    print("✅ Flat prices and a missing close give the same NaNs and values as pandas")
+
+def test_leading_nans_are_gaps_unless_listing_dates():
+    """One series matches pandas, whose RSI counts leading NaNs as zero gain and loss;
+    only a graph with listing_dates (what IndicatorPanel builds) starts RSI at the first close"""
+    hist = synthetic_bars(300, seed=6)
+    hist.iloc[:40, hist.columns.get_indexer(['Open', 'High', 'Low', 'Close'])] = np.nan
+    assert_matches_pandas(hist)
+    assert graph_for(hist).latest(('rsi',))['rsi'] == pandas_indicators(hist.copy())['RSI'].iloc[-1]
+
+    listed = IndicatorGraph(hist['Close'], hist['High'], hist['Low'], listing_dates=True)
+    alone = from_history(hist.iloc[40:])
+    np.testing.assert_allclose(listed['rsi'][40:], alone.rsi, rtol=1e-9, equal_nan=True)
+    assert np.isnan(listed['rsi'][:40]).all()
+    assert not np.isnan(from_history(hist).rsi[40:53]).all()  # pandas: RSI from zero-padded windows
+    assert np.isnan(listed['rsi'][40:53]).all()
+    print("✅ Leading NaNs follow pandas for one series and mark a listing only when asked")
+
+def test_building_blocks():
+    rng = np.random.default_rng(11)
+    values = rng.normal(0, 1, 5000).cumsum()
+    series = pd.Series(values)
+    for span in (9, 12, 26, 200):
+        np.testing.assert_allclose(ewm_mean(values, span), series.ewm(span=span).mean().to_numpy(), rtol=1e-10)
+    extremes = rolling_extremes(values, (3, 7, 64, 100), np.maximum)
+    for window, result in extremes.items():
+        np.testing.assert_array_equal(result, series.rolling(window).max().to_numpy())
+    print("✅ Blocked EWM and doubling-ladder rolling max match pandas")
+
+def test_columns_and_struct():
+    hist = synthetic_bars(252)
+    with_columns = add_indicator_columns(hist)
+    assert list(with_columns.columns) == list(hist.columns) + list(COLUMNS.values())
+    assert 'RSI' not in hist.columns  # the input frame is left alone
+    again = add_indicator_columns(with_columns)  # recomputing replaces, never duplicates
+    assert list(again.columns) == list(with_columns.columns)
+
+    result = compute(hist['Close'].tolist(), hist['High'], hist['Low'].to_numpy())
+    assert result.sma_9.dtype == np.float64 and result.sma_9.flags['C_CONTIGUOUS']
+    assert result.last('rsi') == with_columns['RSI'].iloc[-1]
+    print("✅ Columns are added in one step; the struct holds contiguous float64 arrays")
+
+def test_graph_evaluates_only_what_is_read():
+    graph = graph_for(synthetic_bars(500))
+    graph['macd_signal']
+    assert graph.evaluated == ['ema_fast', 'ema_slow', 'macd', 'macd_signal']
+    graph['macd']  # memoized: nothing new
+    assert len(graph.evaluated) == 4
+
+    hist = synthetic_bars(300)
+    graph = graph_for(hist)
+    rsi_only = graph.add_columns(hist, CHART_FIELDS['rsi'])
+    assert list(rsi_only.columns) == list(hist.columns) + ['RSI']
+    assert not any(name.startswith(('sma', 'highest', 'lowest', 'ema')) for name in graph.evaluated)
+    try:
+        graph['vwap']
+        assert False, "unknown indicators must be rejected"
+    except KeyError:
+        pass
+    assert set(NODES) >= set(COLUMNS)
+    print("✅ Asking for one indicator or chart computes only its dependencies, once")
+
+def test_latest_reads_only_trailing_bars():
+    hist = synthetic_bars(7560)
+    hist.iloc[7400, hist.columns.get_indexer(['Close'])] = np.nan  # inside every window's tail
+    full = from_history(hist)
+    graph = graph_for(hist)
+    latest = graph.latest()
+    for name in COLUMNS:
+        np.testing.assert_allclose(latest[name], getattr(full, name)[-1], rtol=1e-12, atol=1e-12, equal_nan=True,
+                                   err_msg=name)
+    # Last values came from a short tail, not the 30-year series
+    assert graph.evaluated == [] and len(graph._tail) == max(bars_needed(name) for name in COLUMNS) < 1000
+
+    graph = graph_for(hist)
+    graph.latest(RECOMMENDATION_FIELDS)
+    assert 'senkou_span_b' not in graph._tail.evaluated
+    assert bars_needed('sma_200') == 200 and bars_needed('rsi') == 15 and bars_needed('stoch_d') == 7
+
+    assert np.isnan(graph_for(synthetic_bars(30)).last('sma_50'))
+    assert np.isnan(graph_for(hist.iloc[:0]).last('rsi'))
+    print("✅ latest() matches the full series from the few hundred bars that decide it")
+
+if __name__ == "__main__":
+    test_matches_pandas_on_long_and_short_series()
+    test_flat_prices_and_gaps()
+    test_leading_nans_are_gaps_unless_listing_dates()
+    test_building_blocks()
+    test_columns_and_struct()
+    test_graph_evaluates_only_what_is_read()
+    test_latest_reads_only_trailing_bars()
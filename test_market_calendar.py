@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Test NYSE sessions, holidays and the market-aware freshness policy"""
+
+import os
+import sys
+from datetime import date, datetime
+sys.path.append(os.path.dirname(__file__))
+
+from market_calendar import (MARKET_TZ, FreshnessPolicy, is_market_open, is_trading_day, next_session,
+                             nyse_early_closes, nyse_holidays, trades_around_the_clock)
+
+def at(year, month, day, hour=12, minute=0):
+    return datetime(year, month, day, hour, minute, tzinfo=MARKET_TZ)
+
+def test_holidays_match_the_published_nyse_calendar():
+    assert nyse_holidays(2025) == {
+        date(2025, 1, 1), date(2025, 1, 9), date(2025, 1, 20), date(2025, 2, 17), date(2025, 4, 18),
+        date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4), date(2025, 9, 1), date(2025, 11, 27),
+        date(2025, 12, 25)}
+    assert nyse_early_closes(2025) == {date(2025, 7, 3), date(2025, 11, 28), date(2025, 12, 24)}
+
+    # Observed-date shifting
+    assert date(2026, 7, 3) in nyse_holidays(2026)          # July 4th on a Saturday
+    assert date(2026, 7, 2) not in nyse_early_closes(2026)
+    assert date(2023, 1, 2) in nyse_holidays(2023)          # New Year's on a Sunday
+    assert date(2021, 12, 31) not in nyse_holidays(2021)    # ...but not back into the old year
+    assert date(2021, 6, 18) not in nyse_holidays(2021)     # Juneteenth starts in 2022
+    assert date(2024, 3, 29) in nyse_holidays(2024)         # Good Friday
+    assert not is_trading_day(date(2025, 10, 18)) and is_trading_day(date(2025, 10, 17))
+    print("✅ Holidays and early closes match the NYSE calendar")
+
+def test_sessions():
+    assert is_market_open(at(2025, 10, 17, 15, 59))
+    assert not is_market_open(at(2025, 10, 17, 16, 0))
+    assert not is_market_open(at(2025, 10, 18))
+    assert not is_market_open(at(2025, 11, 28, 13, 30))     # early close
+    opens, closes = next_session(at(2025, 10, 17, 17))
+    assert (opens, closes) == (at(2025, 10, 20, 9, 30), at(2025, 10, 20, 16))
+    print("✅ Sessions open and close on time")
+
+def test_freshness_follows_the_market():
+    policy = FreshnessPolicy()
+    ttl = 300
+
+    # Open: the plain TTL
+    fetched = at(2025, 10, 17, 11).timestamp()
+    assert policy.expires_at('AAPL', fetched, ttl) == fetched + ttl
+
+    # Near the close: never past the settle time of the final bar
+    fetched = at(2025, 10, 17, 16, 18).timestamp()
+    assert policy.expires_at('AAPL', fetched, ttl) == at(2025, 10, 17, 16, 20).timestamp()
+
+    # Friday evening, weekend, and holiday fetches stay fresh until the next open
+    for moment in (at(2025, 10, 17, 18), at(2025, 10, 18), at(2025, 10, 20, 8)):
+        assert policy.expires_at('AAPL', moment.timestamp(), ttl) == at(2025, 10, 20, 9, 30).timestamp()
+    assert policy.expires_at('MSFT', at(2025, 12, 24, 14).timestamp(), ttl) == at(2025, 12, 26, 9, 30).timestamp()
+
+    # Crypto trades 24/7; zero TTLs and market_hours=False are plain TTLs
+    saturday = at(2025, 10, 18).timestamp()
+    assert trades_around_the_clock('btcusd') and not trades_around_the_clock('BTC')
+    assert policy.expires_at('BTC-USD', saturday, ttl) == saturday + ttl
+    assert policy.expires_at('AAPL', saturday, 0) == saturday
+    assert FreshnessPolicy(market_hours=False).expires_at('AAPL', saturday, ttl) == saturday + ttl
+    assert not policy.is_fresh('AAPL', saturday, ttl, now=at(2025, 10, 20, 9, 31).timestamp())
+    print("✅ Expiry follows sessions, weekends and holidays")
+
+def test_cache_key_is_stable_while_closed():
+    policy = FreshnessPolicy()
+    weekend = [policy.cache_key('AAPL', 300, now=moment.timestamp())
+               for moment in (at(2025, 10, 18, 1), at(2025, 10, 18, 12), at(2025, 10, 19, 23))]
+    assert len(set(weekend)) == 1
+    trading = {policy.cache_key('AAPL', 300, now=at(2025, 10, 20, 10, minute).timestamp()) for minute in range(0, 30)}
+    assert len(trading) == 6
+    assert len({policy.cache_key('BTC-USD', 300, now=at(2025, 10, 18, 10, minute).timestamp())
+                for minute in range(0, 30)}) == 6
+    print("✅ Cache keys only roll over when the data can change")
+
+if __name__ == "__main__":
+    test_holidays_match_the_published_nyse_calendar()
+    test_sessions()
+    test_freshness_follows_the_market()
+    test_cache_key_is_stable_while_closed()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Test that an analysis context fetches each dataset once and slices shorter periods"""
+
+import os
+import shutil
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pandas as pd
+
+from history_store import longest_period, period_start
+from market_data import AnalysisContext, MarketDataProvider, YahooProvider
+from negative_cache import NegativeCache
+
+class CountingProvider(MarketDataProvider):
+    """Synthetic daily bars for any period, counting every upstream call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def fetch_info(self, symbol):
+        self.calls.append(('info', symbol))
+        return {'longName': f"{symbol} Test Corp", 'forwardPE': 20.0}
+
+    def fetch_history(self, symbol, period="1y"):
+        self.calls.append(('history', symbol, period))
+        now = pd.Timestamp.now(tz='America/New_York').normalize()
+        start = period_start(period, now) if period != 'max' else now - pd.DateOffset(years=20)
+        index = pd.bdate_range(start, now, tz='America/New_York')
+        close = np.linspace(100.0, 200.0, len(index))
+        return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                             'Volume': np.full(len(index), 1000)}, index=index)
+
+def test_longest_period():
+    assert longest_period(['6mo', '1y']) == '1y'
+    assert longest_period(['1mo', '5d', '3mo']) == '3mo'
+    assert longest_period(['1y', 'max']) == 'max'
+    print("✅ Periods rank by calendar span")
+
+def test_analysis_plus_charts_cost_one_info_and_one_history_call():
+    """The GUI's 1y analysis, intrinsic value and 6mo charts share one context"""
+    provider = CountingProvider()
+    context = provider.analysis('aapl', periods=('1y', '6mo'))
+
+    year = context.history('1y')
+    assert context.info['forwardPE'] == 20.0          # analysis
+    assert context.info['longName'] == "AAPL Test Corp"  # intrinsic value
+    half = context.history('6mo')                       # charts
+    assert provider.calls == [('history', 'AAPL', '1y'), ('info', 'AAPL')]
+
+    # The 6mo slice is exactly the tail of the year the provider would have served for 6mo
+    expected = provider.fetch_history('AAPL', '6mo')
+    assert half.index[0] == expected.index[0]
+    assert half.index[-1] == year.index[-1]
+    assert len(half) < len(year)
+
+    # Handed-out frames are the caller's to modify
+    year['SMA_9'] = 0.0
+    assert 'SMA_9' not in context.history('1y').columns
+    print("✅ Analysis + intrinsic value + charts = 1 info call + 1 history call")
+
+def test_longer_request_refetches_once():
+    provider = CountingProvider()
+    context = provider.analysis('MSFT')
+    context.history('6mo')
+    context.history('2y')
+    context.history('1y')
+    context.history('3mo')
+    assert [call[2] for call in provider.calls] == ['6mo', '2y']
+    print("✅ A longer period refetches once and then covers the shorter ones")
+
+def test_yahoo_provider_short_circuits_known_bad_symbols():
+    """No upstream call at all for a symbol in the negative cache"""
+    directory = tempfile.mkdtemp()
+    try:
+        negative_cache = NegativeCache(os.path.join(directory, "negative.json"))
+        negative_cache.record_failure('ZZZZ')
+        provider = YahooProvider(negative_cache)
+        context = AnalysisContext(provider, 'zzzz')
+        assert context.history('1y').empty
+        assert context.info == {}
+        assert provider.history_requests == 0 and provider.info_requests == 0
+        assert negative_cache.avoided_requests == 2
+        print("✅ Known-bad symbols never reach Yahoo")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    test_longest_period()
+    test_analysis_plus_charts_cost_one_info_and_one_history_call()
+    test_longer_request_refetches_once()
+    test_yahoo_provider_short_circuits_known_bad_symbols()
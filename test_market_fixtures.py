@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Test recording market data to fixtures and replaying it offline"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(__file__))
+
+import pandas as pd
+
+from bench_history_store import SimulatedYahoo
+from market_data import MarketDataProvider
+from market_fixtures import (FIXTURES_DIR_VARIABLE, LATENCY_VARIABLE, MARKET_DATA_VARIABLE, FixtureStore,
+                             RecordingProvider, ReplayProvider, provider_from_environment)
+
+class SimulatedProvider(MarketDataProvider):
+    """Live-provider stand-in backed by SimulatedYahoo"""
+
+    def __init__(self):
+        self.upstream = SimulatedYahoo(years=3)
+
+    def fetch_info(self, symbol):
+        return {'longName': f"{symbol} Inc", 'forwardPE': 18.5, 'beta': float('nan'), 'sector': 'Technology'}
+
+    def fetch_history(self, symbol, period='1y'):
+        return self.upstream.download(symbol, period=period)
+
+def test_record_then_replay():
+    directory = tempfile.mkdtemp()
+    try:
+        live = SimulatedProvider()
+        recorder = RecordingProvider(live, FixtureStore(directory))
+        context = recorder.analysis('aapl', periods=('2y', '1y'))
+        recorded = context.history('2y')
+        assert context.info['longName'] == "AAPL Inc"
+
+        replay = ReplayProvider(FixtureStore(directory))
+        hist = replay.fetch_history('AAPL', '2y')
+        pd.testing.assert_frame_equal(hist, recorded, check_freq=False)
+        # Shorter periods are slices of the recording
+        assert hist.index[-1] == replay.fetch_history('AAPL', '6mo').index[-1]
+        year = replay.fetch_history('AAPL', '1y')
+        assert year.index[0] >= (recorded.index[-1] - pd.DateOffset(years=1)).normalize()
+        assert year.index[-1] == recorded.index[-1] and len(year) < len(recorded)
+
+        info = replay.fetch_info('AAPL')
+        assert info['forwardPE'] == 18.5 and info['beta'] is None  # NaN isn't JSON
+        assert os.path.exists(os.path.join(directory, 'info', 'AAPL.json'))
+        print("✅ Recorded info and history replay identically")
+    finally:
+        shutil.rmtree(directory)
+
+def test_replay_periods_count_back_from_the_recording():
+    """A fixture recorded long ago still answers '6mo' with six months of bars"""
+    directory = tempfile.mkdtemp()
+    try:
+        old = SimulatedYahoo(years=3).bars('MSFT')
+        old = old.loc[old.index < old.index[-1] - pd.DateOffset(years=1)]  # recorded a year ago
+        store = FixtureStore(directory)
+        store.save_history('MSFT', old, 'max')
+        hist = ReplayProvider(store).fetch_history('MSFT', '6mo')
+        assert hist.index[-1] == old.index[-1]
+        assert 120 <= len(hist) <= 135
+        print("✅ Replayed periods end at the last recorded bar")
+    finally:
+        shutil.rmtree(directory)
+
+def test_missing_symbols_latency_and_environment():
+    directory = tempfile.mkdtemp()
+    saved = {name: os.environ.get(name) for name in (MARKET_DATA_VARIABLE, FIXTURES_DIR_VARIABLE, LATENCY_VARIABLE)}
+    try:
+        os.environ[MARKET_DATA_VARIABLE] = 'replay'
+        os.environ[FIXTURES_DIR_VARIABLE] = directory
+        os.environ[LATENCY_VARIABLE] = '30'
+        provider = provider_from_environment()
+        assert isinstance(provider, ReplayProvider) and provider.store.directory == directory
+
+        start = time.perf_counter()
+        assert provider.fetch_history('NOPE', '1y').empty and provider.fetch_info('NOPE') == {}
+        assert time.perf_counter() - start >= 0.06 and provider.misses == 2
+
+        os.environ[MARKET_DATA_VARIABLE] = 'record'
+        assert isinstance(provider_from_environment(), RecordingProvider)
+        os.environ[MARKET_DATA_VARIABLE] = 'bogus'
+        try:
+            provider_from_environment()
+            assert False, "an unknown mode must be rejected"
+        except ValueError:
+            pass
+        print("✅ STOCKAI_MARKET_DATA selects replay/record; misses are empty, latency is added")
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_replay_periods_count_back_from_the_recording()
+    test_missing_symbols_latency_and_environment()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Test the shared negative cache for symbols with no data"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from negative_cache import CACHE_DIR_VARIABLE, NEGATIVE_CACHE_FILE, NegativeCache, cache_dir
+
+def test_failures_short_circuit_and_count_avoided_requests():
+    """A recorded failure makes later lookups hit, under any alias of the symbol"""
+    directory = tempfile.mkdtemp()
+    try:
+        cache = NegativeCache(os.path.join(directory, NEGATIVE_CACHE_FILE))
+        assert not cache.is_known_bad('ZZZZ')
+        assert cache.avoided_requests == 0
+
+        cache.record_failure('zzzz', "empty 1y history")
+        cache.record_failure('brk.z', "empty 1y history")
+        assert cache.is_known_bad('ZZZZ')
+        assert cache.is_known_bad(' zzzz ')
+        assert cache.is_known_bad('BRK-Z')
+        assert not cache.is_known_bad('AAPL')
+        assert cache.avoided_requests == 3
+        assert cache.get('ZZZZ')['reason'] == "empty 1y history"
+        assert cache.avoided_requests == 3  # get() only peeks
+
+        cache.forget('ZZZZ')
+        assert not cache.is_known_bad('ZZZZ')
+        assert cache.stats() == {'known_bad': 1, 'avoided_requests': 3}
+        print("✅ Known-bad symbols short-circuit and are counted")
+    finally:
+        shutil.rmtree(directory)
+
+def test_entries_expire():
+    directory = tempfile.mkdtemp()
+    try:
+        cache = NegativeCache(os.path.join(directory, NEGATIVE_CACHE_FILE), ttl=0.05)
+        cache.record_failure('ZZZZ')
+        cache.record_failure('YYYY', ttl=60)
+        assert cache.is_known_bad('ZZZZ')
+        time.sleep(0.1)
+        assert not cache.is_known_bad('ZZZZ')
+        assert cache.is_known_bad('YYYY')
+
+        # Expired entries are dropped the next time the file is written
+        cache.record_failure('XXXX')
+        with open(cache.path, encoding='utf-8') as file:
+            assert sorted(json.load(file)) == ['XXXX', 'YYYY']
+        print("✅ Entries expire after their TTL")
+    finally:
+        shutil.rmtree(directory)
+
+def test_cache_is_shared_through_the_file():
+    """One process's failure is another's hit; a corrupt file is treated as empty"""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "nested", NEGATIVE_CACHE_FILE)
+        streamlit_side = NegativeCache(path)
+        gui_side = NegativeCache(path)
+        assert not gui_side.is_known_bad('ZZZZ')
+
+        streamlit_side.record_failure('ZZZZ')
+        assert gui_side.is_known_bad('ZZZZ')
+
+        # Both writers merge rather than overwrite each other
+        gui_side.record_failure('YYYY')
+        assert sorted(streamlit_side.known_bad()) == ['YYYY', 'ZZZZ']
+
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("{not json")
+        assert not NegativeCache(path).is_known_bad('ZZZZ')
+        NegativeCache(path).record_failure('WWWW')
+        assert sorted(gui_side.known_bad()) == ['WWWW']
+        print("✅ The cache file is shared and survives corruption")
+    finally:
+        shutil.rmtree(directory)
+
+def test_cache_dir_follows_environment():
+    previous = os.environ.get(CACHE_DIR_VARIABLE)
+    try:
+        os.environ[CACHE_DIR_VARIABLE] = "/tmp/stockai-cache"
+        assert cache_dir() == "/tmp/stockai-cache"
+        assert NegativeCache().path == os.path.join("/tmp/stockai-cache", NEGATIVE_CACHE_FILE)
+        del os.environ[CACHE_DIR_VARIABLE]
+        assert cache_dir() == os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+        print("✅ STOCKAI_CACHE_DIR moves the cache folder")
+    finally:
+        if previous is not None:
+            os.environ[CACHE_DIR_VARIABLE] = previous
+        else:
+            os.environ.pop(CACHE_DIR_VARIABLE, None)
+
+if __name__ == "__main__":
+    test_failures_short_circuit_and_count_avoided_requests()
+    test_entries_expire()
+    test_cache_is_shared_through_the_file()
+    test_cache_dir_follows_environment()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Test panel (symbols x days) indicators against each symbol computed on its own"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from bench_indicators import synthetic_bars
+from bench_panel_indicators import symbol_history, synthetic_panel
+from bulk_history import to_panel
+from indicators import COLUMNS, IndicatorGraph, IndicatorPanel, ewm_mean, from_history, rolling_mean, rolling_std, shift
+
+def assert_matches_alone(panel, close, high, low):
+    arrays = panel.arrays()
+    latest = panel.latest()
+    for row, symbol in enumerate(panel.symbols):
+        hist = symbol_history(close, high, low, symbol)
+        alone = from_history(hist)
+        listed = len(panel.dates) - len(hist)
+        for name, column in COLUMNS.items():
+            if name != 'chikou_span':  # a close shifted back: it may reach before the listing
+                assert np.isnan(arrays[name][row, :listed]).all(), f"{symbol} {name} before listing"
+            np.testing.assert_allclose(arrays[name][row, listed:], getattr(alone, name), rtol=1e-9, atol=1e-9,
+                                       equal_nan=True, err_msg=f"{symbol} {name}")
+            np.testing.assert_allclose(latest.loc[symbol, column], arrays[name][row, -1], rtol=1e-12, atol=1e-12,
+                                       equal_nan=True, err_msg=f"{symbol} latest {name}")
+
+def test_panel_matches_each_symbol_alone():
+    """Staggered listings, a gap, a flat stretch and a symbol with no bars, across several blocks"""
+    close, high, low = synthetic_panel(40, 300, listed_late=0.5, seed=4)
+    close.iloc[:, 3] = high.iloc[:, 3] = low.iloc[:, 3] = np.nan            # never traded
+    for frame in (close, high, low):
+        frame.iloc[:295, 5] = np.nan                                        # listed five bars ago
+        frame.iloc[100:140, 6] = 50.0                                       # flat: 0/0 in RSI and Stochastic
+    close.iloc[200, 7] = np.nan                                             # one missing close
+    block = indicators.PANEL_BLOCK
+    indicators.PANEL_BLOCK = 16
+    try:
+        assert_matches_alone(IndicatorPanel(close, high, low), close, high, low)
+    finally:
+        indicators.PANEL_BLOCK = block
+    print("✅ Every symbol's indicators equal its own series', listing dates and gaps included")
+
+def test_long_panel_and_tail():
+    """to_panel() output works directly; latest() on long histories reads only their tails"""
+    histories = {symbol: synthetic_bars(bars, seed=bars) for symbol, bars in (('MSFT', 1500), ('AAPL', 1200),
+                                                                              ('NEW', 40))}
+    panel = IndicatorPanel.from_long(to_panel(histories))
+    assert list(panel.symbols) == ['AAPL', 'MSFT', 'NEW'] and len(panel.dates) == 1500
+    rsi = panel['rsi']
+    assert list(rsi.columns) == list(panel.symbols) and rsi.index.equals(panel.dates)
+    np.testing.assert_allclose(rsi['AAPL'].dropna().to_numpy(), pd.Series(from_history(histories['AAPL']).rsi).dropna())
+
+    latest = panel.latest(('rsi', 'sma_50', 'macd_signal'))
+    assert list(latest.columns) == ['RSI', 'SMA_50', 'MACD_Signal']
+    for symbol, hist in histories.items():
+        alone = IndicatorGraph(hist['Close'], hist['High'], hist['Low'])
+        for name, column in (('rsi', 'RSI'), ('sma_50', 'SMA_50'), ('macd_signal', 'MACD_Signal')):
+            np.testing.assert_allclose(latest.loc[symbol, column], alone.last(name), rtol=1e-9, equal_nan=True)
+    assert np.isnan(latest.loc['NEW', 'SMA_50'])  # 40 bars: no 50-bar average yet
+    try:
+        panel['vwap']
+        assert False, "unknown indicators must be rejected"
+    except KeyError:
+        pass
+    print("✅ Long panels pivot into the engine; last values match each symbol's own graph")
+
+def test_kernels_work_along_the_last_axis():
+    rng = np.random.default_rng(2)
+    values = rng.normal(0, 1, (6, 400)).cumsum(axis=-1)
+    values[1, :150] = np.nan   # listed late
+    values[2, 90] = np.nan     # a gap
+    for row in range(len(values)):
+        series = pd.Series(values[row])
+        np.testing.assert_allclose(ewm_mean(values, 26)[row], series.ewm(span=26).mean(), rtol=1e-10)
+        for window in (3, 20, 200):
+            np.testing.assert_allclose(rolling_mean(values, window)[row], series.rolling(window).mean(), rtol=1e-9,
+                                       atol=1e-12)
+        np.testing.assert_allclose(rolling_std(values, 20)[row], series.rolling(20).std(), rtol=1e-9, atol=1e-12)
+        np.testing.assert_array_equal(shift(values, 26)[row], series.shift(26))
+    print("✅ EWM, rolling mean/std and shift work row by row on 2-D input")
+
+if __name__ == "__main__":
+    test_panel_matches_each_symbol_alone()
+    test_long_panel_and_tail()
+    test_kernels_work_along_the_last_axis()
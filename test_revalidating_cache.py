@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test stale-while-revalidate: stale hits return at once and refresh in the background"""
+
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from market_calendar import FreshnessPolicy
+from revalidating_cache import RevalidatingCache, format_age
+
+class SlowUpstream:
+    def __init__(self, latency=0.2):
+        self.latency = latency
+        self.calls = 0
+        self.version = 1
+        self.fail = False
+        self.lock = threading.Lock()
+
+    def fetch(self, key):
+        time.sleep(self.latency)
+        with self.lock:
+            self.calls += 1
+            if self.fail:
+                raise ConnectionError("upstream down")
+            return f"{key} v{self.version}"
+
+def make_cache(upstream, ttl=0.3, max_stale=1.0):
+    return RevalidatingCache(upstream.fetch, ttl, max_stale, policy=FreshnessPolicy(market_hours=False))
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def wait_for_refresh(cache, key, timeout=2.0):
+    deadline = time.time() + timeout
+    while cache.refreshing(key) and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_stale_values_are_served_immediately():
+    upstream = SlowUpstream()
+    cache = make_cache(upstream)
+
+    cached, elapsed = timed(lambda: cache.get('AAPL'))  # cold: blocks
+    assert cached.value == 'AAPL v1' and not cached.stale and elapsed >= 0.2
+
+    cached, elapsed = timed(lambda: cache.get('AAPL'))  # fresh hit
+    assert cached.value == 'AAPL v1' and elapsed < 0.05
+
+    time.sleep(0.35)
+    upstream.version = 2
+    latencies = []
+    for _ in range(10):  # every caller during the refresh gets the stale value at once
+        cached, elapsed = timed(lambda: cache.get('AAPL'))
+        latencies.append(elapsed)
+        assert cached.value == 'AAPL v1' and cached.stale and cached.age >= 0.35
+    assert max(latencies) < 0.05
+
+    wait_for_refresh(cache, 'AAPL')
+    assert upstream.calls == 2  # one background refresh for all ten stale hits
+    cached = cache.get('AAPL')
+    assert cached.value == 'AAPL v2' and not cached.stale
+    assert (cache.blocking_fetches, cache.stale_hits, cache.background_refreshes) == (1, 10, 1)
+    print(f"✅ Stale hits served in {max(latencies) * 1000:.1f} ms max while one refresh ran")
+
+def test_too_stale_blocks():
+    upstream = SlowUpstream()
+    cache = make_cache(upstream, ttl=0.1, max_stale=0.2)
+    cache.get('AAPL')
+    time.sleep(0.4)
+    upstream.version = 2
+    cached, elapsed = timed(lambda: cache.get('AAPL'))
+    assert cached.value == 'AAPL v2' and not cached.stale and elapsed >= 0.2
+    print("✅ Values past the staleness bound block on a fresh fetch")
+
+def test_failed_refresh_keeps_serving_stale():
+    upstream = SlowUpstream(latency=0.05)
+    cache = make_cache(upstream, ttl=0.1, max_stale=5.0)
+    cache.get('AAPL')
+    time.sleep(0.15)
+    upstream.fail = True
+    assert cache.get('AAPL').value == 'AAPL v1'
+    wait_for_refresh(cache, 'AAPL')
+    assert cache.refresh_errors == 1 and isinstance(cache.last_error, ConnectionError)
+    assert cache.get('AAPL').value == 'AAPL v1'  # and a new refresh is attempted
+    print("✅ A failed background refresh keeps the stale value")
+
+def test_uncacheable_values_are_returned_but_not_kept():
+    """Degraded (cached-fallback) results mustn't pass for fresh ones"""
+    upstream = SlowUpstream(latency=0.0)
+    cache = RevalidatingCache(upstream.fetch, 60, 60, policy=FreshnessPolicy(market_hours=False),
+                              cacheable=lambda value: value.endswith('v2'))
+    assert cache.get('AAPL').value == 'AAPL v1'
+    assert cache.get('AAPL').value == 'AAPL v1' and upstream.calls == 2  # not kept: fetched again
+    upstream.version = 2
+    cache.get('AAPL')
+    assert cache.get('AAPL').value == 'AAPL v2' and upstream.calls == 3
+    print("✅ cacheable() decides what is kept")
+
+def test_entries_are_bounded():
+    """Least recently read keys go past max_entries; too-stale values are dropped, not kept"""
+    upstream = SlowUpstream(latency=0.0)
+    cache = RevalidatingCache(upstream.fetch, 0.1, 0.2, policy=FreshnessPolicy(market_hours=False), max_entries=3)
+    for key in ('AAPL', 'MSFT', 'NVDA'):
+        cache.get(key)
+    cache.get('AAPL')  # read again: now the most recent
+    cache.get('TSLA')
+    assert len(cache) == 3 and cache.evictions == 1
+    calls = upstream.calls
+    cache.get('AAPL')
+    assert upstream.calls == calls  # still cached
+    cache.get('MSFT')
+    assert upstream.calls == calls + 1  # evicted as the least recently read
+    time.sleep(0.35)
+    cache.get('AAPL')  # past max_stale: every entry is dropped, this one refetched
+    assert len(cache) == 1 and upstream.calls == calls + 2
+    print("✅ The cache keeps at most max_entries keys and drops values too stale to serve")
+
+def test_format_age():
+    assert [format_age(s) for s in (5, 125, 7200, 172800)] == ['5s', '2 min', '2.0 h', '2.0 days']
+
+if __name__ == "__main__":
+    test_stale_values_are_served_immediately()
+    test_too_stale_blocks()
+    test_failed_refresh_keeps_serving_stale()
+    test_uncacheable_values_are_returned_but_not_kept()
+    test_entries_are_bounded()
+    test_format_age()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Test the rolling extrema kernel against pandas on series and panels"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pandas as pd
+
+from rolling_extrema import rolling_extremes, rolling_highs_lows, rolling_max, rolling_min, widen_extremes
+
+def test_every_window_matches_pandas():
+    rng = np.random.default_rng(21)
+    values = rng.normal(0, 1, 1000).cumsum()
+    values[[10, 400, 401]] = np.nan
+    series = pd.Series(values)
+    windows = (1, 2, 3, 5, 9, 26, 52, 63, 128, 999, 1000, 1001)
+    highs = rolling_extremes(values, windows, np.maximum)
+    lows = rolling_extremes(values, windows, np.minimum)
+    assert sorted(highs) == sorted(windows)
+    for window in windows:
+        np.testing.assert_array_equal(highs[window], series.rolling(window).max().to_numpy())
+        np.testing.assert_array_equal(lows[window], series.rolling(window).min().to_numpy())
+    np.testing.assert_array_equal(rolling_max(values, 26), highs[26])
+    np.testing.assert_array_equal(rolling_min(values.tolist(), 26), lows[26])
+    print("✅ Every window size, NaN gaps included, matches pandas exactly")
+
+def test_panels_roll_along_the_last_axis():
+    rng = np.random.default_rng(4)
+    high = rng.normal(0, 1, (7, 300)).cumsum(axis=1)
+    low = high - 1
+    highs, lows = rolling_highs_lows(high, low)
+    assert highs[52].shape == (7, 300)
+    frame_high, frame_low = pd.DataFrame(high.T), pd.DataFrame(low.T)
+    for window in (5, 9, 26, 52):
+        np.testing.assert_array_equal(highs[window], frame_high.rolling(window).max().to_numpy().T)
+        np.testing.assert_array_equal(lows[window], frame_low.rolling(window).min().to_numpy().T)
+    print("✅ A symbols x days panel gives each row's rolling extremes")
+
+def test_widening_a_shorter_window():
+    rng = np.random.default_rng(8)
+    values = rng.normal(0, 1, (3, 200)).cumsum(axis=1)
+    values[1, 60] = np.nan
+    highs = rolling_extremes(values, (1, 5, 9, 26, 52, 200), np.maximum)
+    for window, target in ((5, 9), (9, 26), (26, 52), (1, 26), (5, 5), (52, 200)):
+        np.testing.assert_array_equal(widen_extremes(highs[window], window, target, np.maximum), highs[target])
+    assert np.isnan(widen_extremes(highs[26], 26, 52, np.maximum)[..., :51]).all()
+    try:
+        widen_extremes(highs[9], 9, 5, np.maximum)
+        assert False, "narrowing must be rejected"
+    except ValueError:
+        pass
+    print("✅ Widened extremes equal the longer window's, computed from scratch")
+
+def test_rejects_empty_windows():
+    try:
+        rolling_extremes(np.arange(5.0), (0,), np.maximum)
+        assert False, "a zero-length window must be rejected"
+    except ValueError:
+        pass
+    assert np.isnan(rolling_max(np.array([]), 3)).all()
+    print("✅ Windows below 1 raise; empty input gives empty output")
+
+if __name__ == "__main__":
+    test_every_window_matches_pandas()
+    test_panels_roll_along_the_last_axis()
+    test_widening_a_shorter_window()
+    test_rejects_empty_windows()
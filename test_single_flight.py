@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test single-flight coalescing, including a load test of simultaneous Streamlit sessions"""
+
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(__file__))
+
+from market_data import set_default_provider
+from single_flight import SingleFlight
+from test_market_data import CountingProvider
+
+class SlowProvider(CountingProvider):
+    """CountingProvider with an upstream round trip, so concurrent misses overlap"""
+
+    def __init__(self, latency=0.2):
+        CountingProvider.__init__(self)
+        self.latency = latency
+        self._lock = threading.Lock()
+
+    def fetch_info(self, symbol):
+        time.sleep(self.latency)
+        with self._lock:
+            return CountingProvider.fetch_info(self, symbol)
+
+    def fetch_history(self, symbol, period="1y"):
+        time.sleep(self.latency)
+        with self._lock:
+            return CountingProvider.fetch_history(self, symbol, period)
+
+def run_concurrently(count, function):
+    """Start count threads on a barrier so they all call function at once"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+    errors = []
+
+    def worker(slot):
+        barrier.wait()
+        try:
+            results[slot] = function(slot)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    executions = []
+
+    def fetch(key):
+        executions.append(key)
+        time.sleep(0.1)
+        return {'key': key}
+
+    results, errors = run_concurrently(20, lambda slot: flights.do('AAPL', fetch, 'AAPL'))
+    assert not errors
+    assert executions == ['AAPL']
+    assert all(result is results[0] for result in results)
+    assert (flights.calls, flights.shared, flights.in_flight()) == (1, 19, 0)
+
+    # Released afterwards: the next call runs again; other keys never wait on each other
+    flights.do('AAPL', fetch, 'AAPL')
+    results, errors = run_concurrently(4, lambda slot: flights.do(slot % 2, fetch, slot % 2))
+    assert executions.count('AAPL') == 2 and sorted(executions[2:]) == [0, 1]
+    print("✅ Concurrent calls for a key run once")
+
+def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise ConnectionError("upstream down")
+
+    results, errors = run_concurrently(5, lambda slot: flights.do('AAPL', fail))
+    assert len(errors) == 5 and all(isinstance(error, ConnectionError) for error in errors)
+    assert flights.calls == 1 and flights.in_flight() == 0
+    print("✅ A failed call fails every waiter, then the key is released")
+
+def test_simultaneous_sessions_make_one_upstream_call(sessions=25):
+    """
+    Load test: N sessions open AAPL at once through the real get_stock_data
+    Half of them straddle a freshness-key rollover, so st.cache_data sees two different
+    keys and can't coalesce them itself; the single-flight layer still makes one fetch
+    """
+    import streamlit_app
+
+    provider = SlowProvider()
+    previous = set_default_provider(provider)
+    try:
+        streamlit_app.get_stock_data.clear()
+        started = time.perf_counter()
+        results, errors = run_concurrently(
+            sessions, lambda slot: streamlit_app.get_stock_data('AAPL', freshness_key=slot % 2))
+        elapsed = time.perf_counter() - started
+    finally:
+        set_default_provider(previous)
+        streamlit_app.get_stock_data.clear()
+
+    assert not errors
+    assert all(result and result['current_price'] == 200.0 for result in results)
+    assert provider.calls == [('history', 'AAPL', '1y'), ('info', 'AAPL')]
+    # Every session got its own history frame to add indicator columns to
+    assert len({id(result['history']) for result in results}) == sessions
+    print(f"✅ {sessions} simultaneous sessions -> 1 history + 1 info call in {elapsed * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_execution()
+    test_errors_reach_every_waiter()
+    test_simultaneous_sessions_make_one_upstream_call(int(sys.argv[1]) if len(sys.argv) > 1 else 25)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Test the shared search index against the original linear-scan ranking"""
+
+import csv
+import os
+import random
+import re
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from stock_search import SearchSession, StockSearchIndex, TickerResolver
+from universe import SearchResult, Universe, UniverseEntry
+
+def load_stock_data():
+    """Load stock data from CSV file"""
+    stock_data = []
+    csv_path = os.path.join(os.path.dirname(__file__), "stock_data.csv")
+    with open(csv_path, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            stock_data.append({
+                'ticker': row['ticker'].upper(),
+                'company': row['company_name']
+            })
+    return stock_data
+
+def linear_search(query, stock_data, max_results=8, popularity=None):
+    """Reference implementation: the five tiers as full scans, most popular first"""
+    query = query.upper().strip()
+    if not query:
+        return []
+    if popularity:
+        stock_data = sorted(stock_data, key=lambda s: -popularity.get(s['ticker'].upper(), 0.0))
+    word_pattern = re.compile(r'\b' + re.escape(query) + r'\b')
+    tiers = [
+        ('exact_ticker', lambda s: s['ticker'].upper() == query),
+        ('company_exact_word', lambda s: word_pattern.search(s['company'].upper())),
+        ('ticker_starts', lambda s: s['ticker'].upper().startswith(query)),
+        ('company_contains', lambda s: query in s['company'].upper()),
+        ('ticker_contains', lambda s: query in s['ticker'].upper()),
+    ]
+    results = []
+    seen = set()
+    for match_type, matches in tiers:
+        for stock in stock_data:
+            if len(results) >= max_results:
+                return results
+            if stock['ticker'].upper() not in seen and matches(stock):
+                seen.add(stock['ticker'].upper())
+                results.append((stock['ticker'], match_type))
+    return results
+
+def test_index_matches_linear_scan():
+    """Every query returns the same tickers and tiers as the linear scan"""
+    stock_data = load_stock_data()
+    index = StockSearchIndex.from_records(stock_data)
+
+    queries = ['A', 'AA', 'T', 'APPLE', 'APP', 'MICRO', 'AT&T', 'BANK OF', 'COCA',
+               'INC', 'CORP', 'URANIUM', 'BTC', 'BRK', 'ETF', 'X', 'ZZZZ', 'ENERGY FUELS']
+    queries += [chr(c) + chr(d) for c in range(ord('A'), ord('Z') + 1) for d in (ord('A'), ord('E'), ord('R'))]
+
+    for query in queries:
+        expected = linear_search(query, stock_data)
+        actual = [(r['ticker'], r['match_type']) for r in index.search(query, max_results=8)
+                  if r['match_type'] != 'fuzzy']
+        assert actual == expected, f"{query}: {actual} != {expected}"
+
+    print(f"✅ {len(queries)} queries match the linear-scan ranking")
+
+def test_popularity_ranks_inside_each_tier():
+    """With popularity scores each tier returns its top-k by score, ties in file order"""
+    stock_data = load_stock_data()
+    rng = random.Random(7)
+    popularity = {s['ticker']: rng.choice([0.0, 9.5, 10.0, 11.25, 12.5]) for s in stock_data}
+    index = StockSearchIndex.from_records(stock_data, popularity)
+
+    queries = ['A', 'T', 'AA', 'MICRO', 'INC', 'BANK OF', 'ENERGY', 'CORP', 'U', 'X', 'APPLE', 'ZZZZ']
+    for query in queries:
+        for max_results in (3, 8):
+            expected = linear_search(query, stock_data, max_results, popularity)
+            actual = [(r['ticker'], r['match_type']) for r in index.search(query, max_results=max_results)
+                      if r['match_type'] != 'fuzzy']
+            assert actual == expected, f"{query}: {actual} != {expected}"
+
+    # Market-cap style scores put the household names first
+    popularity = {'AAPL': 12.5, 'AMZN': 12.3, 'AMD': 11.4}
+    index = StockSearchIndex.from_records(stock_data, popularity)
+    assert [r['ticker'] for r in index.search('AM', max_results=3)] == ['AMZN', 'AMD', 'AMAT']
+
+    session = SearchSession(index)
+    assert [entry['ticker'] for entry in session.search('A')][:3] == ['AAPL', 'AMZN', 'AMD']
+    assert index.universe[index.rank_order[0]]['score'] == 12.5
+    print("✅ Tiers ranked by popularity score")
+
+def test_tier_examples():
+    """Spot-check the tier each well-known query lands in"""
+    index = StockSearchIndex.from_records(load_stock_data())
+
+    first = index.search('AAPL')[0]
+    assert first['ticker'] == 'AAPL' and first['match_type'] == 'exact_ticker'
+
+    first = index.search('apple')[0]
+    assert first['ticker'] == 'AAPL' and first['match_type'] == 'company_exact_word'
+    assert first['display'] == 'AAPL - Apple Inc'
+
+    assert index.search('') == []
+    assert index.search('   ') == []
+    assert len(index.search('A', max_results=3)) == 3
+
+def test_search_session_narrows_and_memoizes():
+    """Typing APPLE costs one full scan plus four narrowings; backspacing is free"""
+    stock_data = load_stock_data()
+    session = SearchSession(StockSearchIndex.from_records(stock_data))
+
+    for i in range(1, len('APPLE') + 1):
+        query = 'APPLE'[:i]
+        expected = [(s['ticker'], s['company']) for s in stock_data
+                    if query in s['ticker'].upper() or query in s['company'].upper()][:8]
+        actual = [(entry['ticker'], entry['company']) for entry in session.search(query.lower())]
+        assert actual == expected, query
+
+    assert session.full_scans == 1
+    assert session.narrowings == 4
+
+    # Backspace through the cached prefixes
+    for query in ['APPL', 'APP', 'AP']:
+        session.search(query)
+    assert session.memo_hits == 3
+    assert session.full_scans == 1
+
+    # A query that doesn't extend the previous one scans again
+    session.search('MICRO')
+    assert session.full_scans == 2
+    print("✅ APPLE typed with 1 full scan, 4 narrowings, 3 memo hits on backspace")
+
+def test_search_session_memo_is_bounded():
+    """The LRU never grows past its size"""
+    session = SearchSession(StockSearchIndex.from_records(load_stock_data()), memo_size=4)
+    for query in ['A', 'B', 'C', 'D', 'E', 'F']:
+        session.search(query)
+    assert len(session._memo) == 4
+    session.search('A')
+    assert session.memo_hits == 0
+
+def test_fuzzy_tier_corrects_typos():
+    """Misspelled tickers and company names land in the fuzzy tier"""
+    index = StockSearchIndex.from_records(load_stock_data())
+
+    for query, ticker in [('MICROSFT', 'MSFT'), ('NVIDA', 'NVDA'), ('AMAZN', 'AMZN'), ('TSLAA', 'TSLA')]:
+        results = index.search(query, max_results=8)
+        assert results and results[0]['ticker'] == ticker, query
+        assert results[0]['match_type'] == 'fuzzy'
+
+    # Exact tiers still come first; fuzzy only fills the remaining slots
+    results = index.search('APPL', max_results=8)
+    assert results[0]['ticker'] == 'AAPL'
+    assert all(r['match_type'] == 'fuzzy' for r in results[1:])
+
+    assert index.fuzzy_search('QWXZQWXZ') == []
+    assert index.fuzzy_search('AB') == []
+    print("✅ Typos resolved by the trigram fuzzy tier")
+
+def test_universe_behaves_like_the_old_dicts():
+    """The columnar universe reads like the old list of {'ticker', 'company'} dicts"""
+    stock_data = load_stock_data()
+    universe = StockSearchIndex.from_records(stock_data).universe
+
+    assert isinstance(universe, Universe)
+    assert len(universe) == len(stock_data)
+    assert [(entry['ticker'], entry['company']) for entry in universe] == \
+        [(stock['ticker'], stock['company']) for stock in stock_data]
+    assert universe[0]['ticker'] == stock_data[0]['ticker']
+    assert universe[-1].get('company') == stock_data[-1]['company']
+    assert universe[:2] == [dict(stock, score=0.0) for stock in stock_data[:2]]
+
+    entry = universe[0]
+    assert isinstance(entry, UniverseEntry)
+    assert not hasattr(entry, '__dict__')
+    try:
+        entry.ticker = 'NOPE'
+        assert False, "entries are read-only"
+    except AttributeError:
+        pass
+
+    result = StockSearchIndex.from_records(stock_data).search('AAPL')[0]
+    assert isinstance(result, SearchResult)
+    assert result == {'display': 'AAPL - Apple Inc', 'ticker': 'AAPL', 'company': 'Apple Inc',
+                      'match_type': 'exact_ticker', 'icon': '🎯'}
+    assert result['display'] == 'AAPL - Apple Inc' and result.get('missing') is None
+
+def linear_find_ticker(company_input, stock_data):
+    """Reference implementation: the GUI's original find_ticker_from_company_name"""
+    company_input = company_input.upper().strip()
+    for stock in stock_data:
+        if stock['ticker'] == company_input:
+            return company_input
+    best_match = ""
+    best_score = 0
+    for stock in stock_data:
+        company_name = stock['company'].upper()
+        if company_name == company_input:
+            return stock['ticker']
+        input_words = company_input.split()
+        company_words = company_name.split()
+        matches = sum(1 for word in input_words if any(w.startswith(word) for w in company_words))
+        score = matches / len(input_words) if input_words else 0
+        if score > best_score and score > 0.5:
+            best_score = score
+            best_match = stock['ticker']
+    return best_match if best_match else company_input
+
+def test_ticker_resolver_matches_linear_scan():
+    """The indexed resolver returns what the old >50% word-prefix scan returned"""
+    stock_data = load_stock_data()
+    resolver = TickerResolver.from_records(stock_data)
+
+    inputs = ['T', 'AT&T', 'TMUS', 'T-MOBILE', 'TMOBILE', 'UUUU', 'ENERGY FUELS', 'AAPL', 'TESLA',
+              'MSFT', 'apple', 'Apple Inc', 'bank of', 'BANK OF AMERICA', 'micro', 'coca cola',
+              'general', 'GENERAL MOTORS', 'inc inc', 'the', 'zzz', '', '  ', 'energy', 'berkshire',
+              'BRK-B', 'united states', 'american express co', 'a b c', 'nvidia corp']
+    inputs += [s['company'] for s in stock_data[::37]]
+    inputs += [' '.join(s['company'].split()[:2])[:6] for s in stock_data[::53]]
+
+    for company_input in inputs:
+        expected = linear_find_ticker(company_input, stock_data)
+        assert resolver.resolve(company_input) == expected, company_input
+
+    assert resolver.company_name('aapl') == 'Apple Inc'
+    assert resolver.company_name('NOPE') is None
+    assert resolver.company_name('NOPE', 'Unknown Company (NOPE)') == 'Unknown Company (NOPE)'
+    print(f"✅ {len(inputs)} company-name inputs resolve like the linear scan")
+
+if __name__ == "__main__":
+    test_index_matches_linear_scan()
+    test_popularity_ranks_inside_each_tier()
+    test_tier_examples()
+    test_search_session_narrows_and_memoizes()
+    test_search_session_memo_is_bounded()
+    test_fuzzy_tier_corrects_typos()
+    test_universe_behaves_like_the_old_dicts()
+    test_ticker_resolver_matches_linear_scan()
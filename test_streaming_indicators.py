@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Test streaming indicators against the batch engine, revisions, serialization and syncing"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+from bench_indicators import synthetic_bars
+from indicators import COLUMNS, from_history
+from streaming_indicators import IndicatorStateStore, IndicatorStream, StreamingState, stream_for, sync
+
+def assert_matches_batch(stream_values, batch, position):
+    for name in COLUMNS:
+        expected = np.nan if name == 'chikou_span' else getattr(batch, name)[position]
+        np.testing.assert_allclose(stream_values[name], expected, rtol=1e-9, atol=1e-9, equal_nan=True,
+                                   err_msg=f"{name} at bar {position}")
+
+def awkward_bars():
+    """Bars with a flat stretch (0/0 in RSI and Stochastic) and a missing close"""
+    hist = synthetic_bars(600, seed=5)
+    hist.iloc[100:130, hist.columns.get_indexer(['High', 'Low', 'Close'])] = 50.0
+    hist.iloc[300, hist.columns.get_indexer(['Close'])] = np.nan
+    return hist
+
+def test_every_bar_matches_batch():
+    hist = awkward_bars()
+    batch = from_history(hist)
+    stream = IndicatorStream()
+    for position, (timestamp, close, high, low) in enumerate(zip(hist.index, hist['Close'], hist['High'], hist['Low'])):
+        stream.append(close, high, low, timestamp)
+        assert_matches_batch(stream.values(), batch, position)
+    print("✅ Streaming values equal the batch engine on every bar")
+
+def test_revisions_and_serialization():
+    """Intraday ticks revise the latest bar; state survives a JSON round trip mid-stream"""
+    hist = awkward_bars()
+    batch = from_history(hist)
+    stream = IndicatorStream()
+    for position, (close, high, low) in enumerate(zip(hist['Close'], hist['High'], hist['Low'])):
+        stream.append(close * 1.03, high * 1.05, low * 0.9)  # first tick of the day
+        stream.revise(close * 0.98, high, low * 0.95)
+        stream.revise(close, high, low)                       # the close
+        if position in (60, 301):
+            stream = StreamingState.from_dict(json.loads(json.dumps(stream.to_dict())))
+        assert_matches_batch(stream.values(), batch, position)
+    print("✅ Revised bars and restored state still match the batch engine")
+
+def test_sync_and_state_store():
+    directory = tempfile.mkdtemp()
+    try:
+        store = IndicatorStateStore(directory)
+        hist = synthetic_bars(400, seed=9)
+        stream = stream_for('aapl', hist.iloc[:-5], store)
+        assert stream.bars == 395 and os.path.exists(os.path.join(directory, 'AAPL.json'))
+
+        # Next refresh: the partial last bar changed and five bars arrived
+        moved = hist.copy()
+        moved.iloc[394, moved.columns.get_indexer(['Close'])] += 1.0
+        stream, updated = sync(moved, store.load('AAPL'))
+        assert updated == 6 and stream.bars == 400
+        assert_matches_batch(stream.values(), from_history(moved), len(moved) - 1)
+
+        # A split re-adjusts the whole history: rebuilt rather than appended to
+        adjusted = moved.copy()
+        adjusted[['Close', 'High', 'Low']] /= 2
+        stream, updated = sync(adjusted, stream)
+        assert updated == len(adjusted) and stream.bars == len(adjusted)
+        assert_matches_batch(stream.values(), from_history(adjusted), len(adjusted) - 1)
+
+        assert sync(adjusted, stream)[1] == 0  # up to date: nothing to do
+        print("✅ Saved state syncs by revising/appending and rebuilds after re-adjustment")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    test_every_bar_matches_batch()
+    test_revisions_and_serialization()
+    test_sync_and_state_store()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Test symbol canonicalization: scalar, vectorized and through search/resolve"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import pandas as pd
+
+from stock_search import SearchSession, StockSearchIndex, TickerResolver
+from symbols import canonical_symbol, canonicalize_rows, canonicalize_series, canonicalize_universe
+
+CASES = {
+    'BRK.B': 'BRK-B', 'brk/b': 'BRK-B', 'BRK B': 'BRK-B', 'BRK-B': 'BRK-B', 'BF.B': 'BF-B',
+    'HEI.A': 'HEI-A', 'AAPL': 'AAPL', ' msft ': 'MSFT', 'T': 'T',
+    'CVV.TO': 'CVV.TO', 'VOD.L': 'VOD.L', '7203.T': '7203.T', 'SHOP TO': 'SHOP.TO', '0700.HK': '0700.HK',
+    'BTCUSD': 'BTC-USD', 'btc/usd': 'BTC-USD', 'ETH-USD': 'ETH-USD', 'XBT-USD': 'BTC-USD',
+    'DOGEEUR': 'DOGE-EUR', 'BTC': 'BTC', 'ETH': 'ETH',
+    'SPX': '^GSPC', 'VIX': '^VIX', '^GSPC': '^GSPC', 'EURUSD=X': 'EURUSD=X', 'GC=F': 'GC=F',
+    'A.B.C': 'A.B.C', '': '',
+}
+
+def test_canonical_symbol_examples():
+    """Share classes take '-', exchange suffixes keep '.', crypto is COIN-FIAT"""
+    for alias, expected in CASES.items():
+        assert canonical_symbol(alias) == expected, alias
+    print(f"✅ {len(CASES)} aliases canonicalize as expected")
+
+def test_series_matches_scalar():
+    """The vectorized canonicalizer agrees with canonical_symbol on every case"""
+    aliases = [alias for alias in CASES if alias]
+    vectorized = canonicalize_series(pd.Series(aliases)).tolist()
+    assert vectorized == [canonical_symbol(alias) for alias in aliases]
+    print("✅ canonicalize_series matches canonical_symbol")
+
+def test_universe_merges_aliases_preferring_real_names():
+    """Spellings that collapse into one symbol keep the real company name"""
+    df = pd.DataFrame({
+        'ticker': ['BRK.B', 'BRK-B', 'MSFT', 'ALB', 'ALB', 'btcusd'],
+        'company_name': ['BRK-B Corporation', 'Berkshire Hathaway Inc Class B', 'Microsoft Corporation',
+                         'ALB Corporation', 'Albemarle Corporation', 'Bitcoin USD'],
+    })
+    canonical = canonicalize_universe(df)
+    assert list(canonical.itertuples(index=False, name=None)) == [
+        ('ALB', 'Albemarle Corporation'),
+        ('BRK-B', 'Berkshire Hathaway Inc Class B'),
+        ('BTC-USD', 'Bitcoin USD'),
+        ('MSFT', 'Microsoft Corporation'),
+    ]
+    assert canonicalize_rows([['BRK.A', 'Berkshire Hathaway Inc Class A']]) == [
+        ('BRK-A', 'Berkshire Hathaway Inc Class A')]
+    assert canonicalize_rows([]) == []
+    print("✅ Universe aliases merge into one row with the real name")
+
+def test_search_and_resolve_accept_aliases():
+    """Typing an alias finds the provider symbol"""
+    records = [('BRK-B', 'Berkshire Hathaway Inc Class B'), ('BTC-USD', 'Bitcoin USD'),
+               ('AAPL', 'Apple Inc')]
+    index = StockSearchIndex(records)
+    assert index.search('BRK.B')[0]['ticker'] == 'BRK-B'
+    assert index.search('BRK.B')[0]['match_type'] == 'exact_ticker'
+    assert index.search('btcusd')[0]['ticker'] == 'BTC-USD'
+    assert index.company_name('brk/b') == 'Berkshire Hathaway Inc Class B'
+    assert SearchSession(index).search('brk.b')[0]['ticker'] == 'BRK-B'
+
+    resolver = TickerResolver(index)
+    assert resolver.resolve('BRK.B') == 'BRK-B'
+    assert resolver.resolve('BTC/USD') == 'BTC-USD'
+    assert resolver.is_known_ticker('brk b')
+    assert resolver.company_name('BRK.B') == 'Berkshire Hathaway Inc Class B'
+    print("✅ Search and resolver accept aliases")
+
+if __name__ == "__main__":
+    test_canonical_symbol_examples()
+    test_series_matches_scalar()
+    test_universe_merges_aliases_preferring_real_names()
+    test_search_and_resolve_accept_aliases()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Test the memory-mapped universe snapshot against the in-memory index"""
+
+import os
+import shutil
+import sys
+import struct
+import tempfile
+import time
+sys.path.append(os.path.dirname(__file__))
+
+import universe_snapshot
+from popularity import load_popularity, market_cap_score, parse_market_cap, popularity_path_for, save_popularity
+from stock_search import StockSearchIndex, TickerResolver
+from universe_snapshot import (DEFAULT_CSV_PATH, UniverseSnapshot, compile_snapshot, load_search_index,
+                               load_snapshot, read_csv_records, snapshot_path_for)
+
+QUERIES = ['A', 'T', 'AAPL', 'apple', 'AT&T', 'BANK OF', 'COCA', 'BRK', 'URANIUM', 'ENERGY FUELS',
+           'MICROSFT', 'NVIDA', 'TSLAA', 'APPL', 'ZZZZ', 'ETF', 'INC']
+
+def make_csv_copy():
+    """A private copy of stock_data.csv so tests can touch and rewrite it"""
+    directory = tempfile.mkdtemp()
+    csv_path = os.path.join(directory, "stock_data.csv")
+    shutil.copyfile(DEFAULT_CSV_PATH, csv_path)
+    return directory, csv_path
+
+def test_snapshot_index_matches_in_memory_index():
+    """Every tier, fuzzy included, and the resolver answer exactly as when built from the CSV"""
+    directory, csv_path = make_csv_copy()
+    try:
+        save_popularity({'AAPL': 3.4e12, 'AMZN': '1,900,000,000,000', 'AMD': '$250B', 'T': 1.6e11},
+                         popularity_path_for(csv_path))
+        popularity = load_popularity(popularity_path_for(csv_path))
+        expected = StockSearchIndex(read_csv_records(csv_path), popularity)
+        actual = load_search_index(csv_path)
+        assert actual.universe.scores == expected.universe.scores
+        assert list(actual.rank_order) == expected.rank_order
+        assert os.path.exists(snapshot_path_for(csv_path))
+
+        assert actual.tickers == expected.tickers
+        assert actual.companies == expected.companies
+        for query in QUERIES:
+            assert actual.search(query, max_results=8) == expected.search(query, max_results=8), query
+            assert actual.fuzzy_search(query) == expected.fuzzy_search(query), query
+
+        resolver = TickerResolver(actual)
+        for company_input in ['apple', 'T-MOBILE', 'ENERGY FUELS', 'bank of', 'TESLA', 'zzz']:
+            assert resolver.resolve(company_input) == TickerResolver(expected).resolve(company_input)
+
+        snapshot = UniverseSnapshot(snapshot_path_for(csv_path))
+        assert snapshot.company(0) == expected.companies[0]
+        assert snapshot.company(len(expected) - 1) == expected.companies[-1]
+        print(f"✅ Snapshot index matches the CSV-built index on {len(QUERIES)} queries")
+    finally:
+        shutil.rmtree(directory)
+
+def test_snapshot_rebuilds_when_csv_changes():
+    """A new mtime or new contents recompile the snapshot; an unchanged CSV reuses it"""
+    directory, csv_path = make_csv_copy()
+    try:
+        snapshot_path = compile_snapshot(csv_path)
+        first = load_snapshot(csv_path)
+        assert load_snapshot(csv_path).fingerprint == first.fingerprint
+
+        with open(csv_path, 'a', encoding='utf-8') as file:
+            file.write("ZZZQ,Zzzq Snapshot Test Corp\n")
+        stat = os.stat(csv_path)
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        index = load_search_index(csv_path)
+        assert index.search('ZZZQ')[0]['company'] == 'Zzzq Snapshot Test Corp'
+        assert UniverseSnapshot(snapshot_path).fingerprint != first.fingerprint
+
+        # Same contents, new mtime (e.g. a fresh checkout) still recompiles
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        assert load_snapshot(csv_path).fingerprint[0] == stat.st_mtime_ns + 2 * 10**9
+    finally:
+        shutil.rmtree(directory)
+
+def test_popularity_changes_rebuild_snapshot():
+    """Scores come from market caps, and a new stock_popularity.csv reorders the snapshot"""
+    assert parse_market_cap('2,345,678,000') == 2345678000
+    assert parse_market_cap('$1.5B') == 1.5e9
+    assert parse_market_cap('') is None and parse_market_cap('NA') is None
+    assert parse_market_cap(float('nan')) is None
+    assert market_cap_score(1e12) == 12.0 and market_cap_score(None) == 0.0
+
+    directory, csv_path = make_csv_copy()
+    try:
+        assert [r['ticker'] for r in load_search_index(csv_path).search('AM', max_results=2)] == ['AMAT', 'AMC']
+
+        save_popularity({'AMZN': 1.9e12}, popularity_path_for(csv_path))
+        assert [r['ticker'] for r in load_search_index(csv_path).search('AM', max_results=2)] == ['AMZN', 'AMAT']
+
+        # Later fetches merge into the file instead of replacing it
+        save_popularity({'AMD': 2.5e11}, popularity_path_for(csv_path))
+        assert set(load_popularity(popularity_path_for(csv_path))) == {'AMZN', 'AMD'}
+        assert [r['ticker'] for r in load_search_index(csv_path).search('AM', max_results=2)] == ['AMZN', 'AMD']
+    finally:
+        shutil.rmtree(directory)
+
+def test_corrupt_snapshot_is_recompiled():
+    """A truncated or foreign file in the snapshot slot is replaced, not trusted"""
+    directory, csv_path = make_csv_copy()
+    try:
+        with open(snapshot_path_for(csv_path), 'wb') as file:
+            file.write(b'not a snapshot')
+        index = load_search_index(csv_path)
+        assert index.search('AAPL')[0]['ticker'] == 'AAPL'
+    finally:
+        shutil.rmtree(directory)
+
+def test_uncompilable_csv_falls_back_to_memory():
+    """Encoding failures while compiling leave search working from the CSV"""
+    directory, csv_path = make_csv_copy()
+    compile_snapshot_ = universe_snapshot.compile_snapshot
+    try:
+        for error in (struct.error("argument out of range"),
+                      UnicodeEncodeError('ascii', '\u00e9', 0, 1, "ordinal not in range(128)")):
+            def failing(*args, error=error):
+                raise error
+            universe_snapshot.compile_snapshot = failing
+            assert load_snapshot(csv_path) is None
+            assert load_search_index(csv_path).search('AAPL')[0]['ticker'] == 'AAPL'
+    finally:
+        universe_snapshot.compile_snapshot = compile_snapshot_
+        shutil.rmtree(directory)
+
+def test_snapshot_load_is_fast():
+    """Loading the mapped snapshot beats parsing and indexing the CSV"""
+    directory, csv_path = make_csv_copy()
+    try:
+        compile_snapshot(csv_path)
+
+        start = time.perf_counter()
+        StockSearchIndex(read_csv_records(csv_path))
+        csv_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        load_search_index(csv_path).search('APPLE')
+        snapshot_ms = (time.perf_counter() - start) * 1000
+
+        print(f"⚡ CSV build {csv_ms:.1f} ms vs snapshot load {snapshot_ms:.1f} ms")
+        assert snapshot_ms < csv_ms
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    test_snapshot_index_matches_in_memory_index()
+    test_snapshot_rebuilds_when_csv_changes()
+    test_popularity_changes_rebuild_snapshot()
+    test_corrupt_snapshot_is_recompiled()
+    test_uncompilable_csv_falls_back_to_memory()
+    test_snapshot_load_is_fast()
@@ -0,0 +1,158 @@
+"""
+Stock Universe
+Columnar, read-only container for the ticker/company universe.
+
+Tickers, company names and their upper-cased search keys live in parallel arrays
+instead of one dict per symbol. Rows are handed out as slotted UniverseEntry records,
+and search hits as slotted SearchResult records, both of which still answer
+stock['ticker'] and .get() so code written against the old dicts keeps working.
+"""
+
+from collections.abc import Sequence
+
+# Search match tiers in ranking order, with the icon the GUI shows for each
+MATCH_TIERS = [
+    ('exact_ticker', '🎯'),
+    ('company_exact_word', '🎯'),
+    ('ticker_starts', '📈'),
+    ('company_contains', '🏢'),
+    ('ticker_contains', '📊'),
+    ('fuzzy', '🔍'),
+]
+MATCH_ICONS = dict(MATCH_TIERS)
+
+
+def _upper_keys(values):
+    """
+    Upper-cased search keys, sharing the original string when it's already upper case
+    (most tickers are), so the key column costs a pointer rather than a second string
+    """
+    return [value if key == value else key for value, key in zip(values, map(str.upper, values))]
+
+
+class _Record:
+    """Read-only record with dict-style access to its fields"""
+
+    __slots__ = ()
+    _fields = ()
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+    def keys(self):
+        return self._fields
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self._fields}
+
+    def __eq__(self, other):
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        if isinstance(other, _Record):
+            return self._fields == other._fields and self.as_dict() == other.as_dict()
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, field) for field in self._fields))
+
+    def __repr__(self):
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class UniverseEntry(_Record):
+    """One symbol: entry['ticker'], entry['company'], entry['score'] (popularity)"""
+
+    __slots__ = ('ticker', 'company', 'score')
+    _fields = ('ticker', 'company', 'score')
+
+    def __init__(self, ticker, company, score=0.0):
+        object.__setattr__(self, 'ticker', ticker)
+        object.__setattr__(self, 'company', company)
+        object.__setattr__(self, 'score', score)
+
+
+class SearchResult(_Record):
+    """
+    One autocomplete hit
+    display and icon are derived on access, so a hit only stores three references
+    """
+
+    __slots__ = ('ticker', 'company', 'match_type')
+    _fields = ('display', 'ticker', 'company', 'match_type', 'icon')
+
+    def __init__(self, ticker, company, match_type):
+        object.__setattr__(self, 'ticker', ticker)
+        object.__setattr__(self, 'company', company)
+        object.__setattr__(self, 'match_type', match_type)
+
+    @property
+    def display(self):
+        return f"{self.ticker} - {self.company}"
+
+    @property
+    def icon(self):
+        return MATCH_ICONS[self.match_type]
+
+
+class Universe(Sequence):
+    """
+    Parallel ticker/company/key/score columns exposed as a read-only sequence of entries
+    universe[i] builds a UniverseEntry on demand; hot loops read the columns directly
+    """
+
+    def __init__(self, tickers, companies, scores=None):
+        if len(tickers) != len(companies):
+            raise ValueError("tickers and companies must have the same length")
+        self.tickers = tickers
+        self.companies = companies
+        self.ticker_keys = _upper_keys(tickers)
+        self.company_keys = _upper_keys(companies)
+        self.scores = scores if scores is not None else [0.0] * len(tickers)
+        if len(self.scores) != len(tickers):
+            raise ValueError("scores must have one entry per ticker")
+
+    @classmethod
+    def from_records(cls, records, popularity=None):
+        """Build from (ticker, company) pairs, scored from a ticker -> popularity dict"""
+        tickers = []
+        companies = []
+        for ticker, company in records:
+            tickers.append(str(ticker).strip())
+            companies.append(str(company).strip() if company is not None else "")
+        universe = cls(tickers, companies)
+        if popularity:
+            universe.scores = [float(popularity.get(key, 0.0)) for key in universe.ticker_keys]
+        return universe
+
+    def rank_order(self):
+        """Rows from most to least popular; equal scores keep file order"""
+        scores = self.scores
+        if not any(scores):
+            return list(range(len(scores)))
+        return sorted(range(len(scores)), key=lambda row: -scores[row])
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        return UniverseEntry(self.tickers[row], self.companies[row], self.scores[row])
+
+    def __iter__(self):
+        return map(UniverseEntry, self.tickers, self.companies, self.scores)
+
+    def __repr__(self):
+        return f"Universe({len(self)} symbols)"
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Universe Snapshot
+Compiles stock_data.csv into a compact binary file that the apps memory-map at startup.
+
+The snapshot holds a sorted fixed-width ticker array, an offset-indexed company name
+blob, popularity scores and every prebuilt StockSearchIndex table (word postings,
+trigram index, company tokens). Loading it costs a few slices and one decode instead of
+parsing the CSV and re-tokenizing every company name. The header records the mtime,
+size and SHA-1 of the CSV (and its stock_popularity.csv), and the snapshot is recompiled
+automatically whenever any of them changes.
+
+Usage: python universe_snapshot.py [stock_data.csv]
+"""
+
+import bisect
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from popularity import load_popularity, popularity_path_for
+from stock_search import StockSearchIndex
+
+DEFAULT_CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stock_data.csv")
+SNAPSHOT_SUFFIX = ".snap"
+
+SNAPSHOT_MAGIC = b'STKSNAP\x00'
+SNAPSHOT_VERSION = 2
+
+# magic, version, row count, ticker width, csv mtime_ns, csv size, csv sha1, section count
+HEADER = struct.Struct('<8sIIIQQ20sI')
+# section name, offset, length
+SECTION = struct.Struct('<16sQQ')
+ALIGNMENT = 8
+
+
+def snapshot_path_for(csv_path):
+    """stock_data.csv -> stock_data.snap next to it"""
+    return os.path.splitext(csv_path)[0] + SNAPSHOT_SUFFIX
+
+
+def source_mtime_ns(csv_path):
+    """Latest mtime of the CSV and its popularity file"""
+    mtime_ns = os.stat(csv_path).st_mtime_ns
+    try:
+        mtime_ns = max(mtime_ns, os.stat(popularity_path_for(csv_path)).st_mtime_ns)
+    except OSError:
+        pass
+    return mtime_ns
+
+
+def csv_fingerprint(csv_path):
+    """(mtime_ns, size, sha1) of the source CSV together with its popularity file"""
+    digest = hashlib.sha1()
+    size = 0
+    for path in (csv_path, popularity_path_for(csv_path)):
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            if path == csv_path:
+                raise
+            data = b''
+        digest.update(data + b'\x00')
+        size += len(data)
+    return source_mtime_ns(csv_path), size, digest.digest()
+
+
+def read_csv_records(csv_path):
+    """(ticker, company) pairs from stock_data.csv, the same way the GUI reads it"""
+    records = []
+    with open(csv_path, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            # Newlines would split a row in the name blob
+            company = ' '.join((row.get('company_name') or '').split())
+            records.append((row['ticker'].upper().strip(), company))
+    return records
+
+
+class _StringTable:
+    """
+    Read-only sequence of strings stored as u32 offsets plus a UTF-8 blob
+    gap is the separator length between strings (the name blob is '\n'-joined)
+    """
+
+    def __init__(self, offsets, blob, gap=0):
+        self._offsets = offsets
+        self._blob = blob
+        self._gap = gap
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        start = self._offsets[position]
+        end = self._offsets[position + 1] - self._gap
+        return str(self._blob[start:end], 'utf-8')
+
+    def find(self, key):
+        """Position of key in a sorted table, or -1"""
+        position = bisect.bisect_left(self, key)
+        if position < len(self) and self[position] == key:
+            return position
+        return -1
+
+
+class _PostingsTable:
+    """
+    Key -> u32 list lookups over memory-mapped arrays
+    Behaves like the dict (.get) or list (indexing) it was serialized from
+    """
+
+    def __init__(self, keys, offsets, values):
+        self._keys = keys
+        self._offsets = offsets
+        self._values = values
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position):
+        return self._values[self._offsets[position]:self._offsets[position + 1]]
+
+    def get(self, key, default=None):
+        position = self._keys.find(key)
+        if position == -1:
+            return default
+        return self[position]
+
+
+class UniverseSnapshot:
+    """A memory-mapped snapshot file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"Truncated snapshot: {path}")
+        (magic, version, self.row_count, self.ticker_width, mtime_ns, size,
+         digest, section_count) = HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Not a version {SNAPSHOT_VERSION} snapshot: {path}")
+        self.fingerprint = (mtime_ns, size, digest)
+
+        self._sections = {}
+        for i in range(section_count):
+            name, offset, length = SECTION.unpack_from(self._map, HEADER.size + i * SECTION.size)
+            if offset + length > len(self._map):
+                raise ValueError(f"Truncated snapshot section {name!r}: {path}")
+            self._sections[name.rstrip(b'\x00').decode('ascii')] = self._view[offset:offset + length]
+
+    def _u32(self, name):
+        return self._sections[name].cast('I')
+
+    def _strings(self, name, gap=0):
+        return _StringTable(self._u32(name + '_off'), self._sections[name], gap)
+
+    def _postings(self, name, keys=None):
+        return _PostingsTable(keys, self._u32(name + '_off'), self._u32(name))
+
+    def is_fresh(self, fingerprint):
+        return self.fingerprint == fingerprint
+
+    def tickers(self):
+        """Tickers in file order (the stored array is sorted by ticker)"""
+        width = self.ticker_width
+        packed = str(self._sections['tickers'], 'ascii')
+        sorted_tickers = [packed[i:i + width].rstrip('\x00') for i in range(0, len(packed), width)]
+        tickers = [None] * self.row_count
+        for ticker, row in zip(sorted_tickers, self._u32('sorted_rows')):
+            tickers[row] = ticker
+        return tickers, sorted_tickers
+
+    def company(self, row):
+        """One company name by row, straight from the offset-indexed blob"""
+        return self._strings('names', gap=1)[row]
+
+    def companies(self):
+        """All company names in file order (one decode of the whole blob)"""
+        if self.row_count == 0:
+            return []
+        return str(self._sections['names'], 'utf-8').split('\n')
+
+    def search_index(self):
+        """A StockSearchIndex served from the mapped tables"""
+        tickers, sorted_tickers = self.tickers()
+        word_keys = self._strings('words')
+        gram_keys = self._strings('grams')
+        token_keys = self._strings('tokens')
+        tables = {
+            'scores': self._sections['scores'].cast('d').tolist(),
+            'rank_order': self._u32('rank_order'),
+            'sorted_keys': [ticker.upper() for ticker in sorted_tickers],
+            'sorted_rows': self._u32('sorted_rows'),
+            'word_rows': self._postings('word_rows', word_keys),
+            'fuzzy_terms': self._strings('terms'),
+            'fuzzy_term_rows': self._postings('term_rows'),
+            'trigram_terms': self._postings('gram_terms', gram_keys),
+            'tokens': token_keys,
+            'token_rows': self._postings('token_rows', token_keys),
+        }
+        return StockSearchIndex.from_tables(tickers, self.companies(), tables)
+
+
+def _string_sections(name, strings, separator=b''):
+    """
+    u32 offsets + UTF-8 blob sections for a list of strings
+    Offsets are string starts plus a final end sentinel, counted as if the blob
+    also had a trailing separator
+    """
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = array('I', [0])
+    for chunk in encoded:
+        offsets.append(offsets[-1] + len(chunk) + len(separator))
+    return [(name, separator.join(encoded)), (name + '_off', offsets.tobytes())]
+
+
+def _postings_sections(name, lists):
+    """u32 offsets + u32 values sections for a list of int lists"""
+    offsets = array('I', [0])
+    values = array('I')
+    for items in lists:
+        values.extend(items)
+        offsets.append(len(values))
+    return [(name, values.tobytes()), (name + '_off', offsets.tobytes())]
+
+
+def _build_sections(index):
+    """Serialize the index columns and tables into named byte sections"""
+    tables = index.tables()
+    sorted_rows = list(tables['sorted_rows'])
+    width = max((len(ticker.encode('ascii')) for ticker in index.tickers), default=1)
+    tickers = b''.join(index.tickers[row].encode('ascii').ljust(width, b'\x00') for row in sorted_rows)
+
+    words = sorted(tables['word_rows'])
+    grams = sorted(tables['trigram_terms'])
+
+    sections = [('tickers', tickers), ('sorted_rows', array('I', sorted_rows).tobytes())]
+    sections += [('scores', array('d', tables['scores']).tobytes()),
+                 ('rank_order', array('I', tables['rank_order']).tobytes())]
+    # '\n'-joined so companies() can decode and split the whole blob at once
+    sections += _string_sections('names', index.companies, separator=b'\n')
+    sections += _string_sections('words', words)
+    sections += _postings_sections('word_rows', [tables['word_rows'][word] for word in words])
+    sections += _string_sections('terms', tables['fuzzy_terms'])
+    sections += _postings_sections('term_rows', tables['fuzzy_term_rows'])
+    sections += _string_sections('grams', grams)
+    sections += _postings_sections('gram_terms', [tables['trigram_terms'][gram] for gram in grams])
+    sections += _string_sections('tokens', tables['tokens'])
+    sections += _postings_sections('token_rows', tables['token_rows'])
+    return width, sections
+
+
+def compile_snapshot(csv_path=DEFAULT_CSV_PATH, snapshot_path=None):
+    """Compile the CSV into a snapshot file (written atomically) and return its path"""
+    snapshot_path = snapshot_path or snapshot_path_for(csv_path)
+    fingerprint = csv_fingerprint(csv_path)
+    index = StockSearchIndex(read_csv_records(csv_path), load_popularity(popularity_path_for(csv_path)))
+    width, sections = _build_sections(index)
+
+    # Lay out header, section table, then 8-byte aligned sections
+    position = HEADER.size + SECTION.size * len(sections)
+    table = []
+    for name, data in sections:
+        position += -position % ALIGNMENT
+        table.append((name, position, len(data)))
+        position += len(data)
+
+    chunks = [HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(index), width,
+                          fingerprint[0], fingerprint[1], fingerprint[2], len(sections))]
+    chunks += [SECTION.pack(name.encode('ascii'), offset, length) for name, offset, length in table]
+    written = HEADER.size + SECTION.size * len(sections)
+    for (_, data), (_, offset, _) in zip(sections, table):
+        chunks.append(b'\x00' * (offset - written))
+        chunks.append(data)
+        written = offset + len(data)
+
+    # Write next to the target and rename, so readers never see a half-written file
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    fd, temp_path = tempfile.mkstemp(prefix='.snapshot-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(b''.join(chunks))
+        # mkstemp creates 0600; give the snapshot the CSV's permissions
+        os.chmod(temp_path, os.stat(csv_path).st_mode & 0o777)
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return snapshot_path
+
+
+def load_snapshot(csv_path=DEFAULT_CSV_PATH, snapshot_path=None):
+    """
+    Open the snapshot for a CSV, recompiling it first when it is missing, corrupt
+    or older than the CSV (by mtime, size or hash)
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(csv_path)
+    fingerprint = csv_fingerprint(csv_path)
+
+    # Snapshots are little-endian; other platforms just build the index in memory
+    if sys.byteorder == 'little':
+        try:
+            snapshot = UniverseSnapshot(snapshot_path)
+            if snapshot.is_fresh(fingerprint):
+                return snapshot
+        except (OSError, ValueError, KeyError):
+            pass
+
+        try:
+            compile_snapshot(csv_path, snapshot_path)
+            return UniverseSnapshot(snapshot_path)
+        except (OSError, ValueError, KeyError, struct.error):
+            # Read-only checkout, a file locked by another process, or a ticker or name the
+            # format can't encode: the caller builds the index in memory instead
+            pass
+    return None
+
+
+def load_search_index(csv_path=DEFAULT_CSV_PATH, snapshot_path=None):
+    """Query-ready StockSearchIndex for the CSV, served from its snapshot when possible"""
+    snapshot = load_snapshot(csv_path, snapshot_path)
+    if snapshot is not None:
+        return snapshot.search_index()
+    return StockSearchIndex(read_csv_records(csv_path), load_popularity(popularity_path_for(csv_path)))
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CSV_PATH
+    snapshot_path = snapshot_path_for(csv_path)
+
+    start = time.perf_counter()
+    compile_snapshot(csv_path, snapshot_path)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    index = StockSearchIndex(read_csv_records(csv_path), load_popularity(popularity_path_for(csv_path)))
+    csv_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    index = load_search_index(csv_path, snapshot_path)
+    index.search('APPLE')
+    load_ms = (time.perf_counter() - start) * 1000
+
+    print(f"📦 Compiled {len(index):,} symbols into {snapshot_path} "
+          f"({os.path.getsize(snapshot_path) / 1024:.1f} KB) in {compile_ms:.1f} ms")
+    print(f"🐢 CSV parse + index build: {csv_ms:.1f} ms")
+    print(f"⚡ Snapshot load + first query: {load_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()